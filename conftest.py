@@ -0,0 +1 @@
+# Raiz do projeto no sys.path, para os testes importarem `src.` como o main.py faz.
@@ -3,8 +3,26 @@ import hashlib
 import uuid
 import os
 import json
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import NamedTuple, Optional
+
+def _id_maquina():
+    """ID único da máquina (16 caracteres), derivado do MAC"""
+    mac = hex(uuid.getnode()).replace('0x', '').upper()
+    return hashlib.md5(mac.encode()).hexdigest()[:16].upper()
+
+def _chave_confere(chave_arquivo, id_maquina=None):
+    """A licença deve ser o Hash do ID da Máquina + Segredo."""
+    id_maquina = id_maquina or _id_maquina()
+    # SEGREDO DO DESENVOLVEDOR (Só você sabe isso)
+    segredo = "TITANIUM_2025_SECRET_KEY" 
+    
+    # Recalcula o que deveria ser a chave
+    chave_esperada = hashlib.sha256((id_maquina + segredo).encode()).hexdigest()[:20].upper()
+    
+    return chave_arquivo == chave_esperada
 
 class AuthManager:
     def __init__(self):
@@ -96,8 +114,7 @@ class AuthManager:
     
     def pegar_id_maquina(self):
         """Gera um ID único baseado na máquina"""
-        mac = hex(uuid.getnode()).replace('0x', '').upper()
-        return hashlib.md5(mac.encode()).hexdigest()[:16].upper() # Retorna 16 caracteres
+        return _id_maquina()
 
     def verificar_licenca(self):
         """
@@ -110,14 +127,7 @@ class AuthManager:
         with open("license.key", "r") as f:
             chave_arquivo = f.read().strip()
             
-        id_maquina = self.pegar_id_maquina()
-        # SEGREDO DO DESENVOLVEDOR (Só você sabe isso)
-        segredo = "TITANIUM_2025_SECRET_KEY" 
-        
-        # Recalcula o que deveria ser a chave
-        chave_esperada = hashlib.sha256((id_maquina + segredo).encode()).hexdigest()[:20].upper()
-        
-        return chave_arquivo == chave_esperada
+        return _chave_confere(chave_arquivo)
 
     def gerar_licenca_para_cliente(self, id_cliente):
         """
@@ -258,6 +268,7 @@ class AuthManager:
             with open("config/ativacao_profissional.json", "w", encoding="utf-8") as f:
                 json.dump(ativacao_data, f, indent=2, ensure_ascii=False)
             
+            ServicoLicenca().invalidar()
             return True, "Sistema ativado com sucesso!"
         else:
             return False, "Chave de ativação inválida."
@@ -389,4 +400,113 @@ class AuthManager:
             return True, "Pergunta de segurança configurada!"
         else:
             conn.close()
-            return False, "Usuário não encontrado."
\ No newline at end of file
+            return False, "Usuário não encontrado."
+
+class EstadoLicenca(NamedTuple):
+    licenca: str    # valid | trial | expired | invalid | error
+    trial: dict     # {"status", "dias_restantes"}; dias_restantes None = trial ainda não iniciado
+
+class LeituraTrial(NamedTuple):
+    data_inicio: Optional[datetime]  # None = config/trial.json ilegível
+    dias: int
+
+class ServicoLicenca:
+    """
+    Estado da licença e do trial compartilhado pelo processo inteiro.
+
+    license.key e config/trial.json só são lidos de novo quando o mtime ou o
+    tamanho deles muda; nas outras consultas custa um stat de cada arquivo.
+    Nunca abre o banco (diferente de AuthManager(), que roda as migrações),
+    então pode ser consultado a cada atualização do Dashboard.
+
+    Também nunca cria config/trial.json: quem inicia o trial é
+    AuthManager.verificar_trial_status(), no login. Sem o arquivo, o estado
+    é "trial" sem contagem de dias (dias_restantes None).
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """Singleton pattern: um único estado de licença por processo."""
+        if cls._instance is None:
+            cls._instance = super(ServicoLicenca, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, caminho_licenca: str = "license.key", caminho_trial: str = "config/trial.json"):
+        if self._initialized:
+            return
+
+        self.caminho_licenca = caminho_licenca
+        self.caminho_trial = caminho_trial
+        self._lock = threading.Lock()
+        self._id_maquina = None
+        self.invalidar()
+        self._initialized = True
+
+    def invalidar(self):
+        """Força a releitura dos arquivos na próxima consulta (ex.: logo depois de ativar)."""
+        self._assinatura_licenca = False  # False = nunca lido; None = arquivo não existe
+        self._assinatura_trial = False
+        self._chave_valida: Optional[bool] = None
+        self._trial: Optional[LeituraTrial] = None
+
+    def _assinatura(self, caminho):
+        try:
+            st = os.stat(caminho)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def estado(self) -> EstadoLicenca:
+        """Licença e trial atuais (relê só o arquivo que mudou)."""
+        with self._lock:
+            assinatura = self._assinatura(self.caminho_licenca)
+            if assinatura != self._assinatura_licenca:
+                self._assinatura_licenca = assinatura
+                self._chave_valida = self._ler_licenca() if assinatura else None
+
+            assinatura = self._assinatura(self.caminho_trial)
+            if assinatura != self._assinatura_trial:
+                self._assinatura_trial = assinatura
+                self._trial = self._ler_trial() if assinatura else None
+
+            # Os dias restantes dependem do relógio, não do arquivo: calculados a cada consulta
+            trial = self._status_trial()
+            if self._assinatura_licenca is None:
+                licenca = "trial" if trial["status"] == "trial_ativo" else "invalid"
+            elif self._chave_valida is None:
+                licenca = "error"
+            else:
+                licenca = "valid" if trial["status"] == "trial_ativo" or self._chave_valida else "expired"
+            return EstadoLicenca(licenca, trial)
+
+    def _ler_licenca(self) -> Optional[bool]:
+        try:
+            with open(self.caminho_licenca, "r") as f:
+                chave_arquivo = f.read().strip()
+        except OSError:
+            return None
+        if self._id_maquina is None:
+            self._id_maquina = _id_maquina()
+        return _chave_confere(chave_arquivo, self._id_maquina)
+
+    def _ler_trial(self) -> LeituraTrial:
+        try:
+            with open(self.caminho_trial, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return LeituraTrial(datetime.fromisoformat(data["data_inicio"]), data.get("trial_dias", 30))
+        except Exception:
+            return LeituraTrial(None, 0)
+
+    def _status_trial(self) -> dict:
+        if self._trial is None:
+            return {"status": "trial_ativo", "dias_restantes": None}
+        if self._trial.data_inicio is None:
+            return {"status": "erro", "dias_restantes": 0}
+
+        data_inicio, dias = self._trial
+        data_fim = data_inicio + timedelta(days=dias)
+        agora = datetime.now()
+        if agora <= data_fim:
+            return {"status": "trial_ativo", "dias_restantes": (data_fim - agora).days}
+        return {"status": "trial_expirado", "dias_restantes": 0}
@@ -1,11 +1,15 @@
 import os
 import json
 import pickle
-import hashlib
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from src.utils.hash_engine import HashEngine
+from src.utils.hash_cache import HashCache
+from src.utils.file_walker import percorrer_arquivos
+from src.utils.checkpoint import Checkpoint
+from src.utils.task_queue import TokenCancelamento, OperacaoCancelada
 
 class DriveManager:
     def __init__(self, logger_callback=None):
@@ -16,15 +20,13 @@ class DriveManager:
         self.arquivo_credenciais = "credentials.json"
         self.arquivo_token = "token.pickle"
         self.metadata_path = "logs/backup_history.json"
+        self.hash_engine = HashEngine(limite_por_dispositivo=2, cache=HashCache(logger_callback=self.log), algoritmo="sha256",
+                                      logger_callback=self.log)
 
     # --- HASHING E METADATA ---
     def _hash_file(self, filepath: str) -> str:
-        sha256_hash = hashlib.sha256()
         try:
-            with open(filepath, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
+            return self.hash_engine.hash_arquivo(filepath)
         except Exception:
             return None
 
@@ -36,8 +38,11 @@ class DriveManager:
 
     def _salvar_metadata(self, data: dict):
         os.makedirs(os.path.dirname(self.metadata_path), exist_ok=True)
-        with open(self.metadata_path, 'w', encoding='utf-8') as f:
+        # Grava num temporário e troca: o histórico nunca fica pela metade
+        temporario = self.metadata_path + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=4)
+        os.replace(temporario, self.metadata_path)
 
     # --- SETUP E CONEXÃO ---
     def configurar_json_texto(self, texto_json):
@@ -94,37 +99,58 @@ class DriveManager:
         return file.get('id')
 
     # --- FUNCIONALIDADES PRINCIPAIS ---
-    def fazer_backup_pasta(self, pasta_local, nome_destino_drive):
+    def fazer_backup_pasta(self, pasta_local, nome_destino_drive, cancelamento: TokenCancelamento = None):
+        """
+        Backup incremental: só envia arquivos novos ou alterados.
+        Pode ser cancelado entre arquivos. O histórico é gravado periodicamente e
+        os IDs das pastas já criadas no Drive ficam num checkpoint, então um backup
+        interrompido retoma sem reenviar nem recriar o que já foi feito.
+        """
         if not self.service and not self.conectar():
             return
 
         self.log(f"🚀 Iniciando Backup Incremental de: {pasta_local}")
         
         metadata = self._carregar_metadata()
-        backup_job_metadata = metadata.get(nome_destino_drive, {})
-        
-        root_drive_id = self._criar_pasta_se_nao_existe(nome_destino_drive, 'root')
-        mapa_pastas = {pasta_local: root_drive_id}
+        backup_job_metadata = metadata.setdefault(nome_destino_drive, {})
+
+        checkpoint = Checkpoint("backup", f"{os.path.abspath(pasta_local)}|{nome_destino_drive}")
+        estado = checkpoint.carregar()
+        if estado:
+            self.log("⏩ Retomando backup interrompido.")
+            mapa_pastas = estado["pastas"]
+        else:
+            root_drive_id = self._criar_pasta_se_nao_existe(nome_destino_drive, 'root')
+            # Chaves no mesmo formato de os.path.dirname(entry.path)
+            mapa_pastas = {os.path.dirname(os.path.join(pasta_local, "")): root_drive_id}
+            estado = {"pastas": mapa_pastas}
 
         total_enviados = 0
         total_atualizados = 0
         total_pulados = 0
 
-        for root, dirs, files in os.walk(pasta_local):
-            parent_id_atual = mapa_pastas.get(root)
-            if not parent_id_atual:
-                continue
+        # As pastas vêm antes do conteúdo delas, então o pai já existe no Drive
+        entradas = percorrer_arquivos(pasta_local, incluir_pastas=True, ordenar=True,
+                                      ao_erro=lambda e: self.log(f"⚠️ Sem acesso: {e}"))
+        try:
+            for entry in entradas:
+                if cancelamento:
+                    cancelamento.verificar()
+
+                parent_id_atual = mapa_pastas.get(os.path.dirname(entry.path))
+                if not parent_id_atual:
+                    continue
 
-            for d in sorted(dirs):
-                caminho_local_subpasta = os.path.join(root, d)
-                novo_id = self._criar_pasta_se_nao_existe(d, parent_id_atual)
-                mapa_pastas[caminho_local_subpasta] = novo_id
+                if entry.is_dir():
+                    if entry.path not in mapa_pastas:
+                        mapa_pastas[entry.path] = self._criar_pasta_se_nao_existe(entry.name, parent_id_atual)
+                    continue
 
-            for f in sorted(files):
-                caminho_abs = os.path.join(root, f)
+                f = entry.name
+                caminho_abs = entry.path
                 try:
                     file_hash = self._hash_file(caminho_abs)
-                    file_mtime = os.path.getmtime(caminho_abs)
+                    file_mtime = entry.stat().st_mtime
                     
                     metadata_arquivo = backup_job_metadata.get(caminho_abs)
                     
@@ -148,9 +174,20 @@ class DriveManager:
                     backup_job_metadata[caminho_abs] = {'hash': file_hash, 'mtime': file_mtime}
                 except Exception as e:
                     self.log(f"❌ Erro com o arquivo {f}: {e}")
+
+                # Checkpoint periódico: histórico + pastas já criadas no Drive
+                if checkpoint.salvar(estado):
+                    self._salvar_metadata(metadata)
+        except OperacaoCancelada:
+            checkpoint.salvar(estado, forcar=True)
+            self._salvar_metadata(metadata)
+            self.hash_engine.salvar_cache()
+            self.log("⏸️ Backup cancelado. O progresso foi salvo e será retomado no próximo backup.")
+            raise
         
-        metadata[nome_destino_drive] = backup_job_metadata
         self._salvar_metadata(metadata)
+        self.hash_engine.salvar_cache()
+        checkpoint.remover()
 
         self.log(f"✅ FIM DO BACKUP. Enviados: {total_enviados} | Atualizados: {total_atualizados} | Pulados: {total_pulados}")
 
@@ -24,6 +24,25 @@ class ImageTools:
             
         return os.path.join(output_dir, f"{base}{suffix}{ext}")
 
+    def hash_perceptual(self, input_path, tamanho_hash=8):
+        """
+        Calcula o dHash (hash de diferença) da imagem como inteiro de 64 bits.
+        Imagens iguais salvas em outro tamanho ou qualidade JPEG geram hashes
+        com poucos bits diferentes. Lança exceção se a imagem não abrir.
+        """
+        with Image.open(input_path) as img:
+            # Decodificação reduzida: no JPEG o draft evita descompactar a imagem inteira
+            img.draft("L", (tamanho_hash * 8, tamanho_hash * 8))
+            img = img.convert("L").resize((tamanho_hash + 1, tamanho_hash), Image.Resampling.BILINEAR)
+            pixels = list(img.getdata())
+
+        valor = 0
+        for linha in range(tamanho_hash):
+            base = linha * (tamanho_hash + 1)
+            for coluna in range(tamanho_hash):
+                valor = (valor << 1) | (pixels[base + coluna] > pixels[base + coluna + 1])
+        return valor
+
     def redimensionar_imagem(self, input_path, output_dir, width=None, height=None, percent=None, quality=90):
         """Redimensiona uma imagem, mantendo a proporção."""
         try:
@@ -2,6 +2,10 @@ import os
 import shutil
 import subprocess
 import platform
+from src.utils.hash_cache import HashCache
+from src.utils.file_walker import percorrer_arquivos
+from src.utils.checkpoint import Checkpoint
+from src.utils.task_queue import TokenCancelamento, OperacaoCancelada
 
 class SystemCleaner:
     def __init__(self, logger_callback=None):
@@ -10,7 +14,11 @@ class SystemCleaner:
         """
         self.log = logger_callback if logger_callback else print
 
-    def limpar_temporarios(self):
+    def limpar_temporarios(self, cancelamento: TokenCancelamento = None):
+        """
+        Apaga os arquivos das pastas temporárias. Pode ser cancelada entre arquivos;
+        as pastas já concluídas ficam num checkpoint e não são varridas de novo.
+        """
         self.log("--- Iniciando Limpeza de Temporários ---")
         
         # Lista de pastas para limpar
@@ -20,27 +28,45 @@ class SystemCleaner:
             os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'Prefetch') # Prefetch
         ]
 
-        bytes_removidos = 0
+        checkpoint = Checkpoint("limpeza", "|".join(p or "" for p in pastas))
+        estado = checkpoint.carregar() or {"pastas_concluidas": [], "bytes_removidos": 0}
+        if estado["pastas_concluidas"]:
+            self.log(f"Retomando limpeza anterior ({len(estado['pastas_concluidas'])} pastas já concluídas).")
 
-        for pasta in pastas:
-            if not os.path.exists(pasta):
-                continue
-            
-            self.log(f"Varrendo: {pasta}")
-            for root, dirs, files in os.walk(pasta):
-                for file in files:
-                    caminho_completo = os.path.join(root, file)
+        try:
+            for pasta in pastas:
+                if not pasta or not os.path.exists(pasta) or pasta in estado["pastas_concluidas"]:
+                    continue
+                
+                self.log(f"Varrendo: {pasta}")
+                for entry in percorrer_arquivos(pasta):
+                    if cancelamento:
+                        cancelamento.verificar()
                     try:
-                        tamanho = os.path.getsize(caminho_completo)
-                        os.remove(caminho_completo)
-                        bytes_removidos += tamanho
+                        tamanho = entry.stat().st_size
+                        os.remove(entry.path)
+                        estado["bytes_removidos"] += tamanho
                     except Exception:
                         # Arquivo em uso pelo Windows, ignora silenciosamente
                         pass
-        
-        mb_total = bytes_removidos / (1024 * 1024)
+                    checkpoint.salvar(estado)
+
+                estado["pastas_concluidas"].append(pasta)
+                checkpoint.salvar(estado, forcar=True)
+        except OperacaoCancelada:
+            checkpoint.salvar(estado, forcar=True)
+            self.log(f"⏸️ Limpeza cancelada. Liberado até aqui: {estado['bytes_removidos'] / (1024 * 1024):.2f} MB")
+            raise
+
+        checkpoint.remover()
+        mb_total = estado["bytes_removidos"] / (1024 * 1024)
         self.log(f"✅ Concluído. Liberado: {mb_total:.2f} MB")
 
+        # Aproveita para expurgar hashes de arquivos que não existem mais (um lote por limpeza)
+        removidos = HashCache().limpar_obsoletos()
+        if removidos:
+            self.log(f"🧹 Cache de hashes: {removidos} entradas obsoletas removidas.")
+
     def limpar_dns(self):
         self.log("--- Limpando Cache DNS ---")
         try:
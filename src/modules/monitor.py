@@ -0,0 +1,471 @@
+import os
+import json
+import time
+import threading
+import psutil
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+from src.utils.contador_pastas import ContadorPastas
+from src.utils.series_temporais import ArmazemMetricas
+from src.utils.monitor_volumes import MonitorVolumes, UsoVolume
+from src.utils.previsao_disco import PrevisorVolumes
+from src.utils.monitor_processos import MonitorProcessos, UsoProcesso
+from src.utils.verificacoes_saude import RegistroVerificacoes, VerificacaoSaude
+from src.modules.auth import EstadoLicenca, ServicoLicenca
+
+RESOLUCAO_AMOSTRAS = 10      # Segundos entre amostras de CPU/RAM/disco (resolução do gráfico de 1 h)
+INTERVALO_GRAVACAO = 300     # Segundos entre gravações do histórico no banco
+DIAS_ALERTA_PREVISAO = 7     # Avisa quando a tendência indica disco cheio em menos que isso
+
+class SnapshotMetricas(NamedTuple):
+    """
+    Retrato imutável das métricas do sistema num instante.
+    Produzido pela thread do ColetorMetricas e só lido pela interface.
+    Campos com None indicam que a coleta daquela métrica falhou.
+    """
+    momento: float                                     # time.time() da coleta
+    disco: Optional[UsoVolume]                         # Volume mais cheio: (% usado, GB livres, GB totais, ...)
+    temp: Optional[Tuple[float, int]]                  # (GB, quantidade de arquivos)
+    backup: Tuple[str, str]                            # (status, texto)
+    licenca: str                                       # valid | trial | expired | invalid | error
+    trial: dict                                        # {"status", "dias_restantes"}
+    memoria: Optional[float]                           # % de RAM usada
+    cpu: Optional[float]                               # % de CPU desde a amostra anterior
+    erros: Tuple[str, ...] = ()
+    coletado_em: float = 0.0                           # Momento em que algum resultado das verificações mudou
+    historico: Mapping = MappingProxyType({})          # {(métrica, janela): valores} para os gráficos
+    volumes: Tuple[UsoVolume, ...] = ()                # Todas as partições, da mais cheia para a mais vazia
+    processos_cpu: Tuple[UsoProcesso, ...] = ()        # Top N em CPU desde a amostra anterior
+    processos_memoria: Tuple[UsoProcesso, ...] = ()    # Top N em memória
+    verificacoes: Mapping = MappingProxyType({})       # {nome: ResultadoVerificacao} do score de saúde
+    previsoes: Mapping = MappingProxyType({})          # {ponto: PrevisaoVolume} tendência de cada volume
+
+# Cores usadas nos indicadores do Dashboard
+COR_OK = "#06d6a0"
+COR_ATENCAO = "#ffd60a"
+COR_CRITICO = "#ef233c"
+COR_BOM = "#4cc9f0"
+
+class ContextoAvaliacao:
+    """
+    Avaliação de um snapshot para um tick do Dashboard.
+
+    Score, indicadores, estatísticas e alertas são derivados do mesmo snapshot
+    e cada um é calculado uma única vez (cached_property); o card de saúde, o
+    card de resumo e os alertas compartilham esses resultados.
+    """
+
+    def __init__(self, snapshot: SnapshotMetricas):
+        self.snapshot = snapshot
+
+    @cached_property
+    def indicadores(self) -> Dict[str, Tuple[str, str, float]]:
+        """Por verificação registrada: (texto, cor, pontos descontados do score)."""
+        ind = {}
+        for nome, r in self.snapshot.verificacoes.items():
+            # Leitura atrasada: mostra o último valor conhecido, sinalizado
+            texto = f"{r.texto} ⏳" if r.atrasada and r.medido_em else r.texto
+            ind[nome] = (texto, r.cor, r.pontos)
+        return ind
+
+    @cached_property
+    def rotulos(self) -> Dict[str, str]:
+        """Rótulo de cada indicador no card de saúde."""
+        return {nome: r.rotulo for nome, r in self.snapshot.verificacoes.items()}
+
+    @cached_property
+    def saude(self) -> Tuple[int, str, str]:
+        """(score 0-100, texto, cor), proporcional aos pesos das verificações registradas."""
+        resultados = self.snapshot.verificacoes.values()
+        peso_total = sum(r.peso for r in resultados)
+        descontado = sum(r.pontos for r in resultados)
+        score = round(100 - 100 * descontado / peso_total) if peso_total else 100
+        if score >= 90:
+            return score, "Excelente", COR_OK
+        elif score >= 70:
+            return score, "Bom", COR_BOM
+        elif score >= 50:
+            return score, "Atenção Necessária", COR_ATENCAO
+        return score, "Crítico", COR_CRITICO
+
+    @cached_property
+    def estatisticas(self) -> List[dict]:
+        """Linhas do card de resumo: {"icon", "label", "value"}."""
+        s = self.snapshot
+        stats = []
+
+        if len(s.volumes) > 1:
+            for v in s.volumes:
+                stats.append({"icon": "🌐" if v.remoto else "💾", "label": f"Disco {v.ponto}",
+                              "value": f"{v.livre_gb:.1f} GB livre ({v.percentual:.0f}%){self._previsao(v.ponto)}"})
+        elif s.disco is not None:
+            stats.append({"icon": "💾", "label": "Espaço em Disco",
+                          "value": f"{s.disco[1]:.1f} GB livre{self._previsao(s.disco.ponto)}"})
+        else:
+            stats.append({"icon": "❓", "label": "Espaço em Disco", "value": "Erro ao capturar"})
+
+        if s.temp is not None:
+            stats.append({"icon": "🗑️", "label": "Arquivos Temp", "value": f"{s.temp[1]:,} arquivos ({s.temp[0]:.1f}GB)"})
+        else:
+            stats.append({"icon": "❓", "label": "Arquivos Temp", "value": "Erro ao capturar"})
+
+        if s.licenca == "valid":
+            stats.append({"icon": "✅", "label": "Licença", "value": "Ativa"})
+        elif s.licenca == "trial":
+            dias = s.trial['dias_restantes']
+            stats.append({"icon": "⏱️", "label": "Licença", "value": "Trial" if dias is None else f"Trial ({dias} dias)"})
+        else:
+            stats.append({"icon": "⚠️", "label": "Licença", "value": "Expirada"})
+
+        stats.append({"icon": "☁️", "label": "Backup", "value": s.backup[1]})
+
+        if s.memoria is not None:
+            stats.append({"icon": "🧠", "label": "Memória RAM", "value": f"{s.memoria}% usado"})
+        else:
+            stats.append({"icon": "❓", "label": "Memória RAM", "value": "Erro ao capturar"})
+
+        # Média desde a coleta anterior, sem bloquear
+        if s.cpu is not None:
+            stats.append({"icon": "⚡", "label": "CPU", "value": f"{s.cpu:.1f}% uso"})
+        else:
+            stats.append({"icon": "❓", "label": "CPU", "value": "Erro ao capturar"})
+
+        return stats
+
+    def _previsao(self, ponto: str) -> str:
+        """Sufixo com a data estimada de disco cheio (só quando está a menos de 30 dias)."""
+        previsao = self.snapshot.previsoes.get(ponto)
+        if previsao is None or previsao.dias_ate_encher is None or previsao.dias_ate_encher > 30:
+            return ""
+        return f" · cheio em ~{previsao.dias_ate_encher:.0f}d"
+
+    @cached_property
+    def alertas(self) -> List[Tuple[str, str, str, str]]:
+        """Alertas específicos: (título, descrição, texto do botão, ação)."""
+        s = self.snapshot
+        alertas = []
+
+        backup_status, backup_info = s.backup
+        if backup_status in ("critical", "error"):
+            alertas.append(("☁️ Backup Pendente", f"Status: {backup_info}. Proteja seus dados agora!",
+                            "Criar Backup", "backup"))
+
+        if s.disco is not None and s.disco[0] > 85:
+            cheios = [v for v in s.volumes if v.percentual > 85] or [s.disco]
+            nomes = ", ".join(v.ponto for v in cheios)
+            alertas.append(("💾 Espaço em Disco Baixo",
+                            f"{'Volume' if len(cheios) == 1 else 'Volumes'} {nomes} acima de 85% "
+                            f"(o mais cheio está em {s.disco[0]:.0f}%). Libere espaço.",
+                            "Limpar Agora", "manutencao"))
+
+        # Antes de chegar ao limite: volumes cuja tendência indica que vão encher em breve
+        ja_cheios = {v.ponto for v in s.volumes if v.percentual > 85}
+        for previsao in s.previsoes.values():
+            dias = previsao.dias_ate_encher
+            if dias is None or dias > DIAS_ALERTA_PREVISAO or previsao.ponto in ja_cheios:
+                continue
+            alertas.append((f"📈 Disco {previsao.ponto} Enchendo",
+                            f"No ritmo atual (+{previsao.gb_por_dia:.1f} GB/dia) o volume enche em "
+                            f"~{max(dias, 0):.0f} dias. Libere espaço antes.",
+                            "Limpar Agora", "manutencao"))
+
+        if s.temp is not None and s.temp[0] > 2:
+            alertas.append(("🗑️ Muitos Arquivos Temp",
+                            f"{s.temp[1]:,} arquivos temporários ocupando {s.temp[0]:.1f}GB.",
+                            "Limpar Temp", "manutencao"))
+
+        if s.licenca in ("expired", "invalid"):
+            alertas.append(("🔑 Licença Expirada", "Sua licença expirou. Ative para continuar usando.",
+                            "Ativar Agora", "licenca"))
+
+        return alertas
+
+# --- Verificações padrão do score de saúde ---
+# Cada avaliação recebe o valor da sonda (None se ela falhou) e retorna
+# (texto, cor, fração do peso descontada).
+
+def _avaliar_disco(volumes):
+    """Pelo volume mais cheio."""
+    disco = MonitorVolumes.mais_cheio(volumes or ())
+    if disco is None:
+        return "❓ Erro", "gray", 1 / 3
+    # Com mais de um volume, mostra qual está pesando
+    volume = f" ({disco.ponto})" if len(volumes) > 1 else ""
+    if disco[0] > 95:
+        return f"🔴 {disco[0]:.0f}%{volume}", COR_CRITICO, 1.0
+    elif disco[0] > 85:
+        return f"⚠️ {disco[0]:.0f}%{volume}", COR_ATENCAO, 0.5
+    return f"✅ {disco[0]:.0f}%{volume}", COR_OK, 0.0
+
+def _avaliar_backup(backup):
+    if backup is None or backup[0] == "error":
+        return "❓ Erro", "gray", 0.0
+    backup_status, backup_info = backup
+    if backup_status == "critical":
+        return f"🔴 {backup_info}", COR_CRITICO, 1.0
+    elif backup_status == "warning":
+        return f"⚠️ {backup_info}", COR_ATENCAO, 0.5
+    return f"✅ {backup_info}", COR_OK, 0.0
+
+def _avaliar_temp(temp):
+    if temp is None:
+        return "❓ Erro", "gray", 0.0
+    elif temp[0] > 5:
+        return f"🔴 {temp[0]:.1f}GB", COR_CRITICO, 1.0
+    elif temp[0] > 2:
+        return f"⚠️ {temp[0]:.1f}GB", COR_ATENCAO, 0.5
+    return f"✅ {temp[0]:.1f}GB", COR_OK, 0.0
+
+def _avaliar_licenca(estado):
+    licenca = estado.licenca if estado else "error"
+    if licenca == "valid":
+        return "✅ Ativa", COR_OK, 0.0
+    elif licenca == "trial":
+        return "⏱️ Trial", COR_ATENCAO, 0.0
+    return "🔴 Inválida", COR_CRITICO, 1.0
+
+class MonitorSistema:
+    """Leituras do estado do sistema usadas pelo Dashboard (disco, temporários, backup, licença)."""
+
+    def __init__(self, logger_callback=None):
+        self.log = logger_callback if logger_callback else print
+        # Totais por pasta entre coletas: só as pastas TEMP alteradas são relidas
+        self.contador_temp = ContadorPastas(filtro=self._is_temp_file, logger_callback=self.log)
+        # Cada partição com seu intervalo e cache; leituras lentas não travam a coleta
+        self.volumes = MonitorVolumes(logger_callback=self.log)
+        self.processos = MonitorProcessos()
+
+    def uso_disco(self) -> Tuple[UsoVolume, ...]:
+        """Uso de todas as partições montadas, da mais cheia para a mais vazia."""
+        return self.volumes.medir()
+
+    def top_processos(self) -> Tuple[Tuple[UsoProcesso, ...], Tuple[UsoProcesso, ...]]:
+        """Processos que mais usam CPU e memória: (top CPU, top memória)."""
+        return self.processos.amostrar()
+
+    def arquivos_temporarios(self):
+        """
+        Tamanho (GB) e quantidade de arquivos temporários (ver _is_temp_file)
+        nas pastas TEMP, incluindo subpastas.
+        """
+        raizes = [str(p) for p in self._caminhos_temp() if p.exists()]
+        total_size, file_count = self.contador_temp.medir(raizes)
+        return total_size / (1024**3), file_count
+
+    def _caminhos_temp(self):
+        """Obtém caminhos de arquivos temporários baseados no sistema"""
+        temp_paths = []
+        temp_env = os.environ.get('TEMP', '')
+        if temp_env:
+            temp_paths.append(Path(temp_env))
+        if os.name == 'nt':
+            windir = os.environ.get('WINDIR', '')
+            if windir:
+                temp_paths.append(Path(windir) / "Temp")
+        else:
+            temp_paths.append(Path("/tmp"))
+        return temp_paths
+
+    @staticmethod
+    def _is_temp_file(file_name):
+        """Verifica se é realmente um arquivo temporário (só pelo nome, sem stat)"""
+        temp_extensions = ['.tmp', '.temp', '.cache', '.log']
+        temp_names = ['temp', 'tmp', 'cache']
+
+        stem, suffix = os.path.splitext(file_name)
+
+        # Verifica extensão
+        if suffix.lower() in temp_extensions:
+            return True
+
+        # Verifica nome
+        name_lower = stem.lower()
+        return any(temp_name in name_lower for temp_name in temp_names)
+
+    def status_backup(self):
+        """(status, texto) do último backup registrado em logs/backup_history.json."""
+        backup_log = Path("logs/backup_history.json")
+        if not backup_log.exists():
+            return "critical", "Nunca feito"
+
+        try:
+            with open(backup_log, "r", encoding="utf-8") as f:
+                history_data = json.load(f)
+
+            # Formato antigo (lista): converte para dicionário
+            if not isinstance(history_data, dict):
+                history_data = {"history": history_data, "last_check": datetime.now().isoformat()}
+                with open(backup_log, "w") as f:
+                    json.dump(history_data, f, indent=2)
+
+            if not history_data.get("history"):
+                return "warning", "Sem histórico"
+
+            last_backup = datetime.fromisoformat(history_data["history"][-1]["timestamp"])
+            days_ago = (datetime.now() - last_backup).days
+            if days_ago > 14:
+                return "critical", f"Há {days_ago}d"
+            elif days_ago > 7:
+                return "warning", f"Há {days_ago}d"
+            return "ok", f"Há {days_ago}d"
+        except Exception as e:
+            self.log(f"Erro ao ler log de backup: {e}")
+            return "error", "Erro de leitura"
+
+    def estado_licenca(self) -> EstadoLicenca:
+        """Licença (valid | trial | expired | invalid | error) e trial, do serviço em cache."""
+        return ServicoLicenca().estado()
+
+class ColetorMetricas:
+    """
+    Thread em segundo plano que coleta as métricas e publica um SnapshotMetricas.
+
+    A cada RESOLUCAO_AMOSTRAS segundos amostra CPU, RAM, disco e processos
+    (baratos) e grava no histórico. As verificações do score de saúde (disco,
+    backup, temporários, licença e outras registradas) rodam em paralelo, cada
+    uma no seu intervalo e orçamento de tempo; uma verificação lenta aparece
+    como atrasada em vez de segurar a coleta.
+
+    Nada aqui toca na interface: o Dashboard só lê `snapshot` no seu after().
+    A troca do snapshot é uma simples atribuição de referência, então a leitura
+    não precisa de lock e nunca vê um retrato pela metade.
+    """
+
+    def __init__(self, intervalo: float = 60.0, monitor: MonitorSistema = None, armazem: ArmazemMetricas = None):
+        # Intervalo de referência das verificações: 60 = intervalos declarados; menor = mais frequente
+        self.intervalo = intervalo
+        self._erros = []
+        self.monitor = monitor if monitor else MonitorSistema(logger_callback=self._erros.append)
+        self.armazem = armazem if armazem else ArmazemMetricas(("cpu", "memoria", "disco"),
+                                                               logger_callback=self._erros.append)
+        self.verificacoes = RegistroVerificacoes(logger_callback=self._erros.append)
+        self.previsor = PrevisorVolumes(logger_callback=self._erros.append)
+        self._registrar_verificacoes_padrao()
+        self.snapshot: Optional[SnapshotMetricas] = None
+        self._versao_verificacoes = None
+        self._coletado_em = 0.0
+
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _registrar_verificacoes_padrao(self):
+        m = self.monitor
+        for verificacao in (
+            # O disco já é lido a cada amostra; a verificação só avalia a última leitura
+            VerificacaoSaude("disco", "💾 Espaço em Disco", lambda: m.volumes.ultima_medicao, _avaliar_disco,
+                             peso=30, intervalo=RESOLUCAO_AMOSTRAS, orcamento=1.0),
+            VerificacaoSaude("backup", "☁️ Status Backup", m.status_backup, _avaliar_backup,
+                             peso=30, intervalo=60.0, orcamento=2.0),
+            VerificacaoSaude("temp", "🗑️ Arquivos Temp", m.arquivos_temporarios, _avaliar_temp,
+                             peso=20, intervalo=60.0, orcamento=5.0),
+            VerificacaoSaude("licenca", "🔑 Licença", m.estado_licenca, _avaliar_licenca,
+                             peso=20, intervalo=60.0, orcamento=1.0),
+        ):
+            self.registrar_verificacao(verificacao)
+
+    def registrar_verificacao(self, verificacao: VerificacaoSaude):
+        """Acrescenta uma verificação ao score de saúde (ex.: SMART, atualizações pendentes)."""
+        self.verificacoes.registrar(verificacao)
+
+    def iniciar(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="ColetorMetricas", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._acordar.set()
+
+    def atualizar_agora(self):
+        """Roda todas as verificações na próxima passada (ex.: depois de uma limpeza ou backup)."""
+        self._acordar.set()
+
+    def _executar(self):
+        psutil.cpu_percent(interval=None)  # 1ª leitura só define a referência da próxima
+        proxima_gravacao = time.monotonic() + INTERVALO_GRAVACAO
+        forcar = True
+
+        while not self._parar.is_set():
+            try:
+                agora = time.time()
+                amostra = self.amostrar()
+                self.armazem.registrar(agora, amostra)
+                self.previsor.registrar(agora, amostra["_volumes"])
+                self.snapshot = self.coletar(amostra, forcar=forcar)
+
+                if time.monotonic() >= proxima_gravacao:
+                    self.armazem.salvar()
+                    self.previsor.salvar()
+                    proxima_gravacao = time.monotonic() + INTERVALO_GRAVACAO
+            except Exception as e:
+                self._erros.append(f"Erro na coleta de métricas: {e}")
+
+            forcar = self._acordar.wait(RESOLUCAO_AMOSTRAS)
+            self._acordar.clear()
+
+        self.armazem.salvar()
+        self.previsor.salvar()
+
+    def _medir(self, descricao, funcao, *args):
+        try:
+            return funcao(*args)
+        except Exception as e:
+            self._erros.append(f"Erro ao capturar {descricao}: {e}")
+            return None
+
+    def amostrar(self) -> Dict[str, Optional[float]]:
+        """Leituras rápidas de cada amostra: % de CPU, RAM e disco (histórico) e top de processos."""
+        memoria = self._medir("memória", psutil.virtual_memory)
+        volumes = self._medir("disco", self.monitor.uso_disco) or ()
+        disco = self.monitor.volumes.mais_cheio(volumes)
+        processos_cpu, processos_memoria = self._medir("processos", self.monitor.top_processos) or ((), ())
+        return {
+            # Sem intervalo: mede o uso desde a amostra anterior, sem bloquear
+            "cpu": self._medir("CPU", psutil.cpu_percent, None),
+            "memoria": memoria.percent if memoria else None,
+            "disco": disco[0] if disco else None,
+            "_disco": disco,
+            "_volumes": volumes,
+            "_processos": (processos_cpu, processos_memoria),
+        }
+
+    def coletar(self, amostra: Dict[str, Optional[float]] = None, forcar: bool = True) -> SnapshotMetricas:
+        """Roda as verificações vencidas (todas, se forcar) e monta o snapshot."""
+        amostra = amostra or self.amostrar()
+        resultados = self.verificacoes.executar(forcar=forcar, escala=self.intervalo / 60.0)
+        agora = time.time()
+        if self.verificacoes.versao != self._versao_verificacoes:
+            self._versao_verificacoes = self.verificacoes.versao
+            self._coletado_em = agora
+
+        def valor(nome):
+            resultado = resultados.get(nome)
+            return resultado.valor if resultado else None
+
+        licenca = valor("licenca") or EstadoLicenca("error", {"status": "erro", "dias_restantes": 0})
+        erros = tuple(self._erros)
+        del self._erros[:len(erros)]  # Outras threads (verificações) podem estar acrescentando
+        return SnapshotMetricas(
+            momento=agora,
+            disco=amostra["_disco"],
+            volumes=amostra["_volumes"],
+            processos_cpu=amostra["_processos"][0],
+            processos_memoria=amostra["_processos"][1],
+            temp=valor("temp"),
+            backup=valor("backup") or ("error", "Erro de leitura"),
+            licenca=licenca.licenca,
+            trial=licenca.trial,
+            memoria=amostra["memoria"],
+            cpu=amostra["cpu"],
+            erros=erros,
+            coletado_em=self._coletado_em,
+            historico=self.armazem.historico(agora),
+            verificacoes=resultados,
+            previsoes=MappingProxyType(self.previsor.prever(amostra["_volumes"])),
+        )
@@ -1,54 +1,221 @@
 import os
+import time
 import base64
+import struct
+import threading
 import pyzipper
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from src.utils.file_walker import percorrer_arquivos
+from src.utils.checkpoint import Checkpoint
+from src.utils.task_queue import TokenCancelamento, OperacaoCancelada
+from src.utils.pipeline_ordenado import processar_em_ordem, trabalhadores_padrao
+from src.utils.compressao_cofre import PRESETS_COFRE, preparar_membro, gravar_membro
+
+# --- Formato .enc v2 ---
+# Cabeçalho: mágico | versão | iterações PBKDF2 | tamanho do bloco | salt | prefixo do nonce
+# Depois, blocos AES-256-GCM de `tamanho do bloco` bytes (o último pode ser menor),
+# cada um com 16 bytes de tag. O nonce de cada bloco é prefixo + índice (8 bytes), e o
+# cabeçalho + a marca de "último bloco" entram como dados autenticados: trocar,
+# repetir, remover ou truncar blocos faz a descriptografia falhar.
+# (v1 = salt de 16 bytes + token Fernet do arquivo inteiro; só lido, nunca mais gerado.)
+#
+# --- Formato .enc v3 (lote) ---
+# Igual ao v2, com mais um salt de 16 bytes no cabeçalho (antes do prefixo). O salt
+# principal e as iterações geram a chave mestra (PBKDF2), a mesma para todo o lote; o
+# salt do arquivo gera, por HKDF, a chave AES só daquele arquivo. Cada arquivo continua
+# abrindo sozinho com a senha, mas o PBKDF2 roda uma vez por lote, não por arquivo.
+MAGICO_ENC = b"TENC"
+VERSAO_ENC = 2
+VERSAO_ENC_LOTE = 3
+FORMATO_CABECALHO = ">4sBII16s4s"
+FORMATO_CABECALHO_LOTE = ">4sBII16s16s4s"
+TAMANHO_CABECALHO = struct.calcsize(FORMATO_CABECALHO)
+TAMANHO_CABECALHO_LOTE = struct.calcsize(FORMATO_CABECALHO_LOTE)
+INFO_HKDF = b"TitaniumSuite .enc v3"
+TAMANHO_TAG = 16
+TAMANHO_BLOCO = 1024 * 1024     # 1 MiB por bloco: memória constante, qualquer tamanho de arquivo
+ITERACOES_KDF = 100_000
+MAXIMO_BLOCO = 64 * 1024 * 1024  # Limites de sanidade ao ler cabeçalhos de terceiros
+MAXIMO_ITERACOES = 10_000_000
+VALIDADE_CHAVES = 300.0          # Segundos que uma chave mestra fica no CacheChaves sem uso
+
+class ErroFormatoEnc(Exception):
+    """Arquivo .enc com cabeçalho inválido ou versão desconhecida."""
+    pass
+
+def _nonce(prefixo: bytes, indice: int) -> bytes:
+    return prefixo + indice.to_bytes(8, "big")
+
+def _dados_autenticados(cabecalho: bytes, final: bool) -> bytes:
+    return cabecalho + (b"\x01" if final else b"\x00")
+
+class CabecalhoEnc(NamedTuple):
+    dados: bytes                   # Bytes do cabeçalho (entram nos dados autenticados)
+    versao: int
+    iteracoes: int
+    tamanho_bloco: int
+    salt: bytes
+    salt_arquivo: Optional[bytes]  # Só no v3
+    prefixo: bytes
+
+def _ler_cabecalho(arquivo) -> CabecalhoEnc:
+    """Lê e valida o cabeçalho v2 ou v3."""
+    inicio = arquivo.read(len(MAGICO_ENC) + 1)
+    if len(inicio) < len(MAGICO_ENC) + 1 or inicio[:len(MAGICO_ENC)] != MAGICO_ENC:
+        raise ErroFormatoEnc("Não é um arquivo .enc v2 ou v3.")
+    versao = inicio[-1]
+    if versao == VERSAO_ENC:
+        formato, tamanho = FORMATO_CABECALHO, TAMANHO_CABECALHO
+    elif versao == VERSAO_ENC_LOTE:
+        formato, tamanho = FORMATO_CABECALHO_LOTE, TAMANHO_CABECALHO_LOTE
+    else:
+        raise ErroFormatoEnc(f"Versão {versao} do formato .enc não suportada.")
+
+    cabecalho = inicio + arquivo.read(tamanho - len(inicio))
+    if len(cabecalho) < tamanho:
+        raise ErroFormatoEnc("Cabeçalho incompleto.")
+    campos = struct.unpack(formato, cabecalho)
+    if versao == VERSAO_ENC:
+        _, _, iteracoes, tamanho_bloco, salt, prefixo = campos
+        salt_arquivo = None
+    else:
+        _, _, iteracoes, tamanho_bloco, salt, salt_arquivo, prefixo = campos
+    if not (0 < tamanho_bloco <= MAXIMO_BLOCO and 0 < iteracoes <= MAXIMO_ITERACOES):
+        raise ErroFormatoEnc("Cabeçalho com parâmetros inválidos.")
+    return CabecalhoEnc(cabecalho, versao, iteracoes, tamanho_bloco, salt, salt_arquivo, prefixo)
+
+def _subchave(chave_mestra, salt_arquivo: bytes) -> bytes:
+    """Chave AES de um arquivo do lote (HKDF-SHA256 da chave mestra com o salt do arquivo)."""
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=salt_arquivo, info=INFO_HKDF).derive(chave_mestra)
+
+def _ler_blocos(arquivo, tamanho: int):
+    """Gera (índice, é o último, bloco), lendo um bloco à frente para saber qual é o último."""
+    bloco = arquivo.read(tamanho)
+    indice = 0
+    while True:
+        proximo = arquivo.read(tamanho)
+        final = not proximo
+        yield indice, final, bloco
+        if final:
+            return
+        bloco = proximo
+        indice += 1
+
+def eh_formato_em_blocos(caminho) -> bool:
+    """
+    Começa com o mágico: v2, v3 ou uma versão desconhecida, que _ler_cabecalho
+    recusa com ErroFormatoEnc em vez de tentar como v1. O resto é tratado como v1.
+    """
+    with open(caminho, "rb") as f:
+        return f.read(len(MAGICO_ENC)) == MAGICO_ENC
+
+class CacheChaves:
+    """
+    Chaves mestras (PBKDF2) de uma senha, por (salt, iterações), só em memória.
+
+    Serve para o lote: o PBKDF2 (a parte lenta) roda uma vez e cada arquivo
+    deriva sua chave por HKDF. As chaves ficam em bytearray e são zeradas ao
+    expirar (VALIDADE_CHAVES sem uso), em limpar() e ao sair do `with`. Cópias
+    que a biblioteca de criptografia faça internamente não têm como ser zeradas
+    daqui; por isso o cache deve viver só o tempo da operação.
+    """
+
+    def __init__(self, senha: str, validade: float = VALIDADE_CHAVES):
+        self._senha = senha
+        self.validade = validade
+        self._chaves: Dict[Tuple[bytes, int], Tuple[bytearray, float]] = {}
+        self._lock = threading.Lock()
+
+    def chave_mestra(self, salt: bytes, iteracoes: int = ITERACOES_KDF) -> bytearray:
+        with self._lock:
+            self._expirar()
+            chave, _ = self._chaves.get((salt, iteracoes), (None, 0.0))
+            if chave is None:
+                kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=iteracoes)
+                chave = bytearray(kdf.derive(self._senha.encode()))
+            self._chaves[(salt, iteracoes)] = (chave, time.monotonic())
+            return chave
+
+    def _expirar(self):
+        limite = time.monotonic() - self.validade
+        for chave_cache, (chave, usado_em) in list(self._chaves.items()):
+            if usado_em < limite:
+                chave[:] = bytes(len(chave))
+                del self._chaves[chave_cache]
+
+    def limpar(self):
+        with self._lock:
+            for chave, _ in self._chaves.values():
+                chave[:] = bytes(len(chave))
+            self._chaves.clear()
+            self._senha = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.limpar()
 
 class SecurityTools:
     def __init__(self, logger_callback=None):
         self.log = logger_callback if logger_callback else print
 
+    def _derivar_chave(self, senha, salt, iteracoes=ITERACOES_KDF):
+        """Chave AES de 32 bytes derivada da senha (PBKDF2-SHA256)."""
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=iteracoes, # 100k voltas para tornar lento para hackers
+        )
+        return kdf.derive(senha.encode())
+
     def _gerar_chave_da_senha(self, senha, salt=None):
         """
-        Deriva uma chave segura de 32 bytes baseada na senha do usuário.
+        Deriva uma chave segura de 32 bytes baseada na senha do usuário (formato Fernet, v1).
         Se não houver salt (criptografando), gera um novo.
         Se houver salt (descriptografando), usa o existente.
         """
         if salt is None:
             salt = os.urandom(16) # Gera 16 bytes aleatórios
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100_000, # 100k voltas para tornar lento para hackers
-        )
-        chave = base64.urlsafe_b64encode(kdf.derive(senha.encode()))
+        chave = base64.urlsafe_b64encode(self._derivar_chave(senha, salt))
         return chave, salt
 
-    def criptografar_arquivo(self, caminho_arquivo, senha, apagar_original=False):
-        """Lê arquivo -> Gera Salt+Chave -> Criptografa -> Salva .enc"""
+    def _nome_descriptografado(self, caminho_arquivo_enc):
+        """arquivo.pdf.enc -> arquivo.pdf"""
+        if caminho_arquivo_enc.lower().endswith(".enc"):
+            return caminho_arquivo_enc[:-4]
+        return caminho_arquivo_enc + ".dec"
+
+    def criptografar_arquivo(self, caminho_arquivo, senha, apagar_original=False, trabalhadores=None):
+        """
+        Lê arquivo em blocos -> Gera Salt+Chave -> Criptografa os blocos em paralelo -> Salva .enc (v2)
+        A memória fica limitada aos blocos em processamento, independente do tamanho do arquivo.
+        """
         self.log(f"🔒 Trancando: {os.path.basename(caminho_arquivo)}...")
+        novo_nome = caminho_arquivo + ".enc"
+        temporario = novo_nome + ".tmp"
         
         try:
-            # 1. Preparar a chave
-            chave, salt = self._gerar_chave_da_senha(senha)
-            f = Fernet(chave)
-
-            # 2. Ler o conteúdo original
-            with open(caminho_arquivo, "rb") as file:
-                dados = file.read()
+            # 1. Preparar a chave e o cabeçalho
+            salt = os.urandom(16)
+            prefixo = os.urandom(4)
+            aes = AESGCM(self._derivar_chave(senha, salt))
+            cabecalho = struct.pack(FORMATO_CABECALHO, MAGICO_ENC, VERSAO_ENC, ITERACOES_KDF,
+                                    TAMANHO_BLOCO, salt, prefixo)
 
-            # 3. Criptografar
-            dados_cifrados = f.encrypt(dados)
+            # 2. Criptografar: leitura -> pool de threads -> escrita, na ordem dos blocos
+            #    (só aparece como .enc depois de completo)
+            self._gravar_enc(caminho_arquivo, temporario, novo_nome, cabecalho, aes, prefixo, trabalhadores)
 
-            # 4. Salvar (O segredo: Escrevemos o SALT nos primeiros 16 bytes)
-            novo_nome = caminho_arquivo + ".enc"
-            with open(novo_nome, "wb") as file:
-                file.write(salt + dados_cifrados)
-
-            # 5. Opcional: Destruir original
+            # 3. Opcional: Destruir original
             if apagar_original:
                 os.remove(caminho_arquivo)
                 self.log("🗑️ Arquivo original removido por segurança.")
@@ -57,57 +224,201 @@ class SecurityTools:
             return True
 
         except Exception as e:
+            self._remover_temporario(temporario)
             self.log(f"❌ Erro na criptografia: {e}")
             return False
 
-    def descriptografar_arquivo(self, caminho_arquivo_enc, senha):
-        """Lê Salt do arquivo -> Recria a Chave -> Destranca"""
-        self.log(f"🔓 Destrancando: {os.path.basename(caminho_arquivo_enc)}...")
-        
-        try:
-            with open(caminho_arquivo_enc, "rb") as file:
-                conteudo = file.read()
+    def _gravar_enc(self, caminho_arquivo, temporario, novo_nome, cabecalho, aes, prefixo, trabalhadores):
+        def cifrar(indice, final, bloco):
+            return aes.encrypt(_nonce(prefixo, indice), bloco, _dados_autenticados(cabecalho, final))
 
-            # 1. Separar o Salt (primeiros 16 bytes) do resto
-            salt = conteudo[:16]
-            dados_cifrados = conteudo[16:]
+        with open(caminho_arquivo, "rb") as entrada, open(temporario, "wb") as saida:
+            saida.write(cabecalho)
+            processar_em_ordem(_ler_blocos(entrada, TAMANHO_BLOCO), cifrar, saida.write, trabalhadores)
+        os.replace(temporario, novo_nome)
 
-            # 2. Recriar a chave exata
-            chave, _ = self._gerar_chave_da_senha(senha, salt)
-            f = Fernet(chave)
+    def criptografar_lote(self, caminhos: List[str], senha, apagar_original=False, trabalhadores=None,
+                          cancelamento: TokenCancelamento = None) -> List[str]:
+        """
+        Criptografa vários arquivos com a mesma senha (formato v3).
+        A chave mestra é derivada uma vez; cada arquivo recebe salt, subchave (HKDF) e
+        prefixo de nonce próprios. Os arquivos são processados em paralelo, cada um
+        numa thread só. Retorna os arquivos que falharam.
+        """
+        self.log(f"🔒 Trancando {len(caminhos)} arquivo(s)...")
+        salt = os.urandom(16)
+        falhas = []
+
+        with CacheChaves(senha) as chaves:
+            chave_mestra = chaves.chave_mestra(salt)
 
-            # 3. Tentar descriptografar (Se a senha for errada, falha aqui)
-            dados_originais = f.decrypt(dados_cifrados)
+            def criptografar(caminho):
+                if cancelamento:
+                    cancelamento.verificar()
+                novo_nome = caminho + ".enc"
+                temporario = novo_nome + ".tmp"
+                try:
+                    salt_arquivo = os.urandom(16)
+                    prefixo = os.urandom(4)
+                    cabecalho = struct.pack(FORMATO_CABECALHO_LOTE, MAGICO_ENC, VERSAO_ENC_LOTE, ITERACOES_KDF,
+                                            TAMANHO_BLOCO, salt, salt_arquivo, prefixo)
+                    aes = AESGCM(_subchave(chave_mestra, salt_arquivo))
+                    self._gravar_enc(caminho, temporario, novo_nome, cabecalho, aes, prefixo, trabalhadores=1)
+                    if apagar_original:
+                        os.remove(caminho)
+                except Exception as e:
+                    self._remover_temporario(temporario)
+                    self.log(f"❌ Erro em {os.path.basename(caminho)}: {e}")
+                    falhas.append(caminho)
 
-            # 4. Salvar arquivo limpo (Remove o .enc)
-            nome_original = caminho_arquivo_enc.replace(".enc", "")
-            with open(nome_original, "wb") as file:
-                file.write(dados_originais)
+            with ThreadPoolExecutor(max_workers=trabalhadores or trabalhadores_padrao()) as pool:
+                for futuro in [pool.submit(criptografar, caminho) for caminho in caminhos]:
+                    futuro.result()  # Relança OperacaoCancelada (os demais param na verificação)
+
+        if apagar_original and len(falhas) < len(caminhos):
+            self.log("🗑️ Arquivos originais removidos por segurança.")
+        self.log(f"✅ {len(caminhos) - len(falhas)} de {len(caminhos)} arquivo(s) protegido(s).")
+        return falhas
+
+    def descriptografar_arquivo(self, caminho_arquivo_enc, senha, trabalhadores=None, chaves: CacheChaves = None):
+        """
+        Lê o cabeçalho -> Recria a Chave -> Destranca (v2/v3 em blocos; v1 Fernet para arquivos antigos)
+        `chaves` permite reaproveitar a chave mestra entre vários arquivos v3 do mesmo lote.
+        """
+        self.log(f"🔓 Destrancando: {os.path.basename(caminho_arquivo_enc)}...")
+        nome_original = self._nome_descriptografado(caminho_arquivo_enc)
+        temporario = nome_original + ".tmp"
+        
+        try:
+            if eh_formato_em_blocos(caminho_arquivo_enc):
+                if chaves is not None:
+                    self._descriptografar_blocos(caminho_arquivo_enc, temporario, chaves, trabalhadores)
+                else:
+                    with CacheChaves(senha) as chaves_arquivo:
+                        self._descriptografar_blocos(caminho_arquivo_enc, temporario, chaves_arquivo, trabalhadores)
+            else:
+                self._descriptografar_v1(caminho_arquivo_enc, temporario, senha)
+            os.replace(temporario, nome_original)
 
             self.log(f"✅ Arquivo restaurado: {os.path.basename(nome_original)}")
             return True
 
+        except ErroFormatoEnc as e:
+            self._remover_temporario(temporario)
+            self.log(f"❌ ERRO: {e}")
+            return False
         except Exception:
+            self._remover_temporario(temporario)
             self.log("❌ ERRO: Senha incorreta ou arquivo corrompido.")
             return False
 
-    def criar_pasta_cofre(self, pasta_alvo, senha):
-        """Compacta uma pasta inteira num ZIP com senha AES-256"""
+    def _descriptografar_blocos(self, caminho_arquivo_enc, destino, chaves: CacheChaves, trabalhadores=None):
+        with open(caminho_arquivo_enc, "rb") as entrada:
+            cabecalho = _ler_cabecalho(entrada)
+            chave = chaves.chave_mestra(cabecalho.salt, cabecalho.iteracoes)
+            # Cópia em bytes: o cache pode zerar a chave mestra enquanto o AESGCM ainda a usa
+            aes = AESGCM(_subchave(chave, cabecalho.salt_arquivo) if cabecalho.versao == VERSAO_ENC_LOTE
+                         else bytes(chave))
+
+            def decifrar(indice, final, bloco):
+                # Falha (InvalidTag) com senha errada, bloco alterado, fora de ordem ou arquivo truncado
+                return aes.decrypt(_nonce(cabecalho.prefixo, indice), bloco,
+                                   _dados_autenticados(cabecalho.dados, final))
+
+            with open(destino, "wb") as saida:
+                processar_em_ordem(_ler_blocos(entrada, cabecalho.tamanho_bloco + TAMANHO_TAG), decifrar,
+                                   saida.write, trabalhadores)
+
+    def _descriptografar_v1(self, caminho_arquivo_enc, destino, senha):
+        """Formato antigo: o arquivo inteiro é um token Fernet (precisa caber na memória)."""
+        with open(caminho_arquivo_enc, "rb") as file:
+            conteudo = file.read()
+
+        # 1. Separar o Salt (primeiros 16 bytes) do resto
+        salt = conteudo[:16]
+        dados_cifrados = conteudo[16:]
+
+        # 2. Recriar a chave exata
+        chave, _ = self._gerar_chave_da_senha(senha, salt)
+        f = Fernet(chave)
+
+        # 3. Tentar descriptografar (Se a senha for errada, falha aqui)
+        dados_originais = f.decrypt(dados_cifrados)
+
+        # 4. Salvar arquivo limpo
+        with open(destino, "wb") as file:
+            file.write(dados_originais)
+
+    def _remover_temporario(self, caminho):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+    def criar_pasta_cofre(self, pasta_alvo, senha, cancelamento: TokenCancelamento = None,
+                          preset="equilibrado", trabalhadores=None):
+        """
+        Compacta uma pasta inteira num ZIP com senha AES-256.
+        Se for cancelado, o ZIP é fechado corretamente e marcado num checkpoint;
+        a próxima execução acrescenta só os arquivos que faltam.
+
+        preset: "rapido", "equilibrado" ou "maximo" (ver PRESETS_COFRE). Fotos, vídeos,
+        ZIPs etc. são gravados sem compressão; os demais são comprimidos em paralelo
+        pelos trabalhadores e gravados em ordem por uma única thread.
+        """
+        config = PRESETS_COFRE[preset]
         nome_zip = f"{pasta_alvo}_COFRE.zip"
         self.log(f"📦 Criando cofre para pasta: {pasta_alvo}")
 
+        checkpoint = Checkpoint("cofre", os.path.abspath(pasta_alvo))
+        modo = 'w'
+        ja_no_cofre = set()
+        if checkpoint.carregar() is not None and os.path.exists(nome_zip):
+            try:
+                with pyzipper.AESZipFile(nome_zip) as zf:
+                    zf.setpassword(senha.encode('utf-8'))
+                    nomes = zf.namelist()
+                    if nomes:
+                        with zf.open(nomes[0]) as membro:
+                            membro.read(1)  # Confirma que a senha é a mesma do cofre parcial
+                ja_no_cofre = set(nomes)
+                modo = 'a'
+                self.log(f"⏩ Retomando cofre interrompido ({len(ja_no_cofre)} arquivos já gravados).")
+            except (pyzipper.BadZipFile, RuntimeError, OSError):
+                pass  # ZIP incompleto (programa fechado à força) ou outra senha: recomeça do zero
+
         try:
-            with pyzipper.AESZipFile(nome_zip, 'w', compression=pyzipper.ZIP_LZMA, encryption=pyzipper.WZ_AES) as zf:
+            checkpoint.salvar({"zip": nome_zip}, forcar=True)
+            trabalhadores = trabalhadores or trabalhadores_padrao()
+            gravados = {"comprimidos": 0, "sem_compressao": 0}
+
+            def arquivos():
+                for entry in percorrer_arquivos(pasta_alvo, ao_erro=lambda e: self.log(f"⚠️ Sem acesso: {e}")):
+                    if cancelamento:
+                        cancelamento.verificar()
+                    caminho_rel = os.path.relpath(entry.path, os.path.dirname(pasta_alvo))
+                    if caminho_rel.replace(os.sep, '/') in ja_no_cofre:
+                        continue
+                    yield entry.path, caminho_rel, config
+
+            with pyzipper.AESZipFile(nome_zip, modo, compression=config.compressao, compresslevel=config.nivel,
+                                     encryption=pyzipper.WZ_AES) as zf:
                 zf.setpassword(senha.encode('utf-8'))
-                
-                for folder, _, files in os.walk(pasta_alvo):
-                    for file in files:
-                        caminho_abs = os.path.join(folder, file)
-                        caminho_rel = os.path.relpath(caminho_abs, os.path.dirname(pasta_alvo))
-                        zf.write(caminho_abs, arcname=caminho_rel)
+
+                def gravar(membro):
+                    gravar_membro(zf, membro)
+                    gravados["sem_compressao" if membro.compressao == pyzipper.ZIP_STORED else "comprimidos"] += 1
+
+                # em_voo pequeno: cada arquivo pré-comprimido fica na memória até ser gravado
+                processar_em_ordem(arquivos(), preparar_membro, gravar, trabalhadores, em_voo=trabalhadores + 1)
             
-            self.log(f"✅ Cofre criado com sucesso: {nome_zip}")
+            checkpoint.remover()
+            self.log(f"✅ Cofre criado com sucesso: {nome_zip} ({config.rotulo}: {gravados['comprimidos']} "
+                     f"comprimido(s), {gravados['sem_compressao']} sem compressão)")
             return True
+        except OperacaoCancelada:
+            self.log("⏸️ Cofre cancelado. Os arquivos já gravados serão aproveitados na próxima execução.")
+            raise
         except Exception as e:
             self.log(f"❌ Erro ao criar cofre: {e}")
             return False
\ No newline at end of file
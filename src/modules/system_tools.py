@@ -1,55 +1,390 @@
 import os
-import hashlib
+import sys
+import csv
+import json
+import time
+import uuid
 import shutil
-from typing import List, Dict, Tuple
+import ctypes
+import ctypes.util
+from typing import List, Dict, Tuple, Iterable, Iterator, Optional
+from src.utils.hash_engine import HashEngine, FilaDeTrabalho
+from src.utils.hash_cache import HashCache
+from src.utils.bk_tree import BKTree
+from src.utils.file_walker import percorrer_arquivos, LINKS_IGNORAR
+from src.utils.checkpoint import Checkpoint
+from src.utils.task_queue import TokenCancelamento
+from src.modules.image_tools import ImageTools
+
+TAMANHO_MINIMO = 1024  # Arquivos menores que isso são ignorados na busca por duplicados
+BLOCO_PARCIAL = 65536  # Bytes lidos do início e do fim no hash parcial
+JOURNAL_VINCULOS_DIR = "logs/dedupe_journal"  # Um .jsonl por operação de vínculo (para desfazer)
+EXTENSOES_IMAGEM = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff'}
 
 class SystemTools:
-    def __init__(self, logger_callback=None):
+    def __init__(self, logger_callback=None, hash_engine: HashEngine = None):
         self.log = logger_callback if logger_callback else print
+        self.hash_engine = hash_engine if hash_engine else HashEngine(cache=HashCache(logger_callback=self.log), algoritmo="blake2b", logger_callback=self.log)
+        self.image_tools = ImageTools(logger_callback=self.log)
 
-    def _hash_file(self, filepath: str, blocksize: int = 65536) -> str:
-        """Calcula o hash SHA256 de um arquivo para identificação única."""
-        hasher = hashlib.sha256()
+    def _hash_file(self, filepath: str) -> str:
+        """Calcula o hash (BLAKE2b por padrão) de um arquivo para identificação única."""
         try:
-            with open(filepath, 'rb') as afile:
-                buf = afile.read(blocksize)
-                while len(buf) > 0:
-                    hasher.update(buf)
-                    buf = afile.read(blocksize)
-            return hasher.hexdigest()
+            return self.hash_engine.hash_arquivo(filepath)
         except Exception as e:
             self.log(f"❌ Erro ao calcular hash de {os.path.basename(filepath)}: {e}")
             return None
 
-    def localizar_duplicados(self, diretorio: str) -> Dict[str, List[str]]:
+    def _hash_parcial(self, filepath: str, tamanho: int, bloco: int = BLOCO_PARCIAL) -> str:
+        """
+        Calcula o hash do primeiro e do último bloco do arquivo.
+        Se o arquivo couber nesses dois blocos, o conteúdo é lido inteiro e o
+        resultado é igual ao de _hash_file.
+        """
+        try:
+            return self.hash_engine.hash_parcial(filepath, tamanho, bloco)
+        except Exception as e:
+            self.log(f"❌ Erro ao calcular hash de {os.path.basename(filepath)}: {e}")
+            return None
+
+    def _agrupar_por_tamanho(self, diretorio: str, cancelamento: TokenCancelamento = None) -> Dict[int, List[str]]:
+        """Etapa 1: agrupa os arquivos por tamanho, sem ler nenhum conteúdo."""
+        por_tamanho: Dict[int, List[str]] = {}
+
+        # Ignora links simbólicos e arquivos muito pequenos (opcional)
+        for entry in percorrer_arquivos(diretorio, links=LINKS_IGNORAR):
+            if cancelamento:
+                cancelamento.verificar()
+            try:
+                tamanho = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            if tamanho > TAMANHO_MINIMO:
+                por_tamanho.setdefault(tamanho, []).append(entry.path)
+
+        return por_tamanho
+
+    @staticmethod
+    def _assinatura(filepath: str) -> Optional[List[int]]:
+        """(tamanho, mtime_ns, inode) do arquivo, para saber na retomada se ele mudou."""
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+    def _checkpoint_dedupe(self, diretorio: str) -> Tuple[Checkpoint, dict, int]:
+        """
+        Checkpoint da busca na pasta, o estado salvo (None se não houver um
+        válido) e a data de modificação atual da pasta. Se ela mudou desde o
+        checkpoint (arquivos criados, apagados ou renomeados na pasta), o
+        checkpoint é descartado.
+        """
+        checkpoint = Checkpoint("dedupe", os.path.abspath(diretorio))
+        try:
+            mtime = os.stat(diretorio).st_mtime_ns
+        except OSError:
+            mtime = None
+        estado = checkpoint.carregar()
+        if estado and estado.get("mtime_raiz") != mtime:
+            checkpoint.remover()
+            estado = None
+        return checkpoint, estado, mtime
+
+    def busca_pendente(self, diretorio: str) -> bool:
+        """Se existe uma busca por duplicados interrompida nesta pasta (sem ler o checkpoint)."""
+        return Checkpoint("dedupe", os.path.abspath(diretorio)).existe()
+
+    def iterar_duplicados(self, diretorio: str, cancelamento: TokenCancelamento = None,
+                          retomar: bool = True) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Versão em fluxo de localizar_duplicados: gera (hash, caminhos) assim que
+        cada grupo é confirmado, sem esperar a busca inteira terminar.
+
+        A busca é feita em etapas: tamanho -> hash parcial -> hash completo.
+        Arquivos com tamanho único nunca são lidos. As etapas 2 e 3 rodam em
+        paralelo no HashEngine.
+
+        Os candidatos da etapa 1 são salvos num checkpoint uma vez só; depois,
+        cada tamanho resolvido é anotado no diário do checkpoint junto com os
+        seus grupos e a assinatura (tamanho, mtime, inode) de cada arquivo,
+        tirada antes da leitura. Se a busca for cancelada (ou interrompida), a
+        próxima na mesma pasta retoma dos tamanhos pendentes, sem varrer a
+        árvore de novo (retomar=False ignora o checkpoint e faz uma busca nova).
+        Na retomada, os grupos salvos só são repetidos com os arquivos cuja
+        assinatura não mudou; grupo que fica com menos de 2 é descartado.
+        """
+        self.log(f"--- Iniciando busca por duplicados em: {diretorio} ---")
+
+        checkpoint, estado, mtime = self._checkpoint_dedupe(diretorio)
+        grupos_anteriores = []
+        if estado and retomar:
+            candidatos = {int(t): paths for t, paths in estado["pendentes"].items()}
+            alterados = 0
+            for anotacao in checkpoint.anotacoes():
+                candidatos.pop(anotacao["tamanho"], None)
+                salvas = anotacao.get("assinaturas", {})
+                for file_hash, grupo in anotacao["grupos"]:
+                    # Arquivo editado, trocado ou apagado desde a interrupção não é mais duplicado garantido
+                    inalterados = [p for p in grupo if salvas.get(p) is not None and salvas[p] == self._assinatura(p)]
+                    alterados += len(grupo) - len(inalterados)
+                    if len(inalterados) > 1:
+                        grupos_anteriores.append((file_hash, inalterados))
+            self.log(f"  -> Retomando busca anterior ({len(grupos_anteriores)} grupos já encontrados).")
+            if alterados:
+                self.log(f"  -> {alterados} arquivo(s) mudaram desde a interrupção e saíram dos grupos salvos. "
+                         "Faça uma busca nova para reavaliá-los.")
+        else:
+            # Etapa 1: agrupa por tamanho
+            por_tamanho = self._agrupar_por_tamanho(diretorio, cancelamento)
+            candidatos = {t: paths for t, paths in por_tamanho.items() if len(paths) > 1}
+            checkpoint.salvar({"mtime_raiz": mtime, "pendentes": candidatos}, forcar=True)
+        self.log(f"  -> {sum(len(p) for p in candidatos.values())} arquivos com tamanho repetido.")
+
+        # Grupos confirmados de cada tamanho; vão para o diário só quando o tamanho
+        # termina, senão a retomada repetiria os grupos de um tamanho ainda pendente
+        confirmados: Dict[int, List[Tuple[str, List[str]]]] = {}
+        assinaturas: Dict[str, Optional[List[int]]] = {}  # Tiradas antes da leitura que decide o grupo
+
+        def concluir_tamanho(tamanho):
+            grupos = confirmados.pop(tamanho, [])
+            checkpoint.anotar({"tamanho": tamanho, "grupos": grupos,
+                               "assinaturas": {p: assinaturas.get(p) for _, grupo in grupos for p in grupo}})
+            for p in candidatos[tamanho]:
+                assinaturas.pop(p, None)
+
+        ordem = {p: i for paths in candidatos.values() for i, p in enumerate(paths)}
+        faltando = {t: len(paths) for t, paths in candidatos.items()}
+        por_parcial: Dict[int, Dict[str, List[str]]] = {}
+        por_completo: Dict[Tuple[int, str], Dict[str, List[str]]] = {}
+
+        # Itens da fila: (etapa, caminho, tamanho, chave do grupo parcial)
+        fila = FilaDeTrabalho(
+            ("parcial", p, t, None) for t, paths in candidatos.items() for p in paths
+        )
+
+        def calcular(item):
+            etapa, filepath, tamanho, _ = item
+            if etapa == "completo" or tamanho <= 2 * BLOCO_PARCIAL:
+                assinaturas[filepath] = self._assinatura(filepath)
+            if etapa == "parcial":
+                return self._hash_parcial(filepath, tamanho)
+            return self._hash_file(filepath)
+
+        def confirmar(tamanho, file_hash, grupo):
+            grupo = sorted(grupo, key=ordem.get)
+            for filepath in grupo[1:]:
+                self.log(f"  -> Duplicado encontrado: {os.path.basename(filepath)}")
+            confirmados.setdefault(tamanho, []).append((file_hash, grupo))
+            return file_hash, grupo
+
+        total_grupos = 0
+        concluida = False
+        try:
+            # Grupos confirmados antes da interrupção
+            for file_hash, grupo in grupos_anteriores:
+                total_grupos += 1
+                yield file_hash, grupo
+
+            for (etapa, filepath, tamanho, chave), resultado in self.hash_engine.mapear(calcular, fila, cancelamento):
+                if cancelamento:
+                    cancelamento.verificar()
+
+                if etapa == "parcial":
+                    # Etapa 2: espera todos os arquivos do mesmo tamanho
+                    if resultado:
+                        por_parcial.setdefault(tamanho, {}).setdefault(resultado, []).append(filepath)
+                    faltando[tamanho] -= 1
+                    if faltando[tamanho]:
+                        continue
+
+                    for hash_parcial, grupo in por_parcial.pop(tamanho, {}).items():
+                        if len(grupo) < 2:
+                            continue
+                        # Arquivos pequenos já foram lidos inteiros na etapa 2
+                        if tamanho <= 2 * BLOCO_PARCIAL:
+                            total_grupos += 1
+                            yield confirmar(tamanho, hash_parcial, grupo)
+                            continue
+                        # Etapa 3: hash completo só de quem ainda colide
+                        chave = (tamanho, hash_parcial)
+                        faltando[chave] = len(grupo)
+                        faltando[tamanho] += 1  # O tamanho só termina quando a etapa 3 terminar
+                        for p in grupo:
+                            fila.adicionar(("completo", p, tamanho, chave))
+                    if not faltando[tamanho]:
+                        concluir_tamanho(tamanho)
+                else:
+                    if resultado:
+                        por_completo.setdefault(chave, {}).setdefault(resultado, []).append(filepath)
+                    faltando[chave] -= 1
+                    if faltando[chave]:
+                        continue
+
+                    for file_hash, grupo in por_completo.pop(chave, {}).items():
+                        if len(grupo) > 1:
+                            total_grupos += 1
+                            yield confirmar(tamanho, file_hash, grupo)
+                    faltando[tamanho] -= 1
+                    if not faltando[tamanho]:
+                        concluir_tamanho(tamanho)
+            concluida = True
+        finally:
+            self.hash_engine.salvar_cache()
+            if concluida:
+                checkpoint.remover()
+            else:
+                checkpoint.fechar()
+                self.log("⏸️ Busca interrompida. O progresso foi salvo e será retomado na próxima busca.")
+
+        self.log(f"✅ Busca concluída. {total_grupos} grupos de arquivos duplicados encontrados.")
+
+    def localizar_duplicados(self, diretorio: str, cancelamento: TokenCancelamento = None) -> Dict[str, List[str]]:
         """
         Localiza arquivos duplicados em um diretório e subdiretórios.
         Retorna um dicionário onde a chave é o hash e o valor é uma lista de caminhos.
         """
-        self.log(f"--- Iniciando busca por duplicados em: {diretorio} ---")
-        
-        hashes: Dict[str, List[str]] = {}
-        
-        for dirpath, _, filenames in os.walk(diretorio):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                
-                # Ignora links simbólicos e arquivos muito pequenos (opcional)
-                if not os.path.islink(filepath) and os.path.getsize(filepath) > 1024:
-                    file_hash = self._hash_file(filepath)
-                    
-                    if file_hash:
-                        if file_hash in hashes:
-                            hashes[file_hash].append(filepath)
-                            self.log(f"  -> Duplicado encontrado: {filename}")
-                        else:
-                            hashes[file_hash] = [filepath]
-        
-        # Filtra para manter apenas os hashes com mais de um arquivo (os duplicados)
-        duplicados = {h: paths for h, paths in hashes.items() if len(paths) > 1}
-        
-        self.log(f"✅ Busca concluída. {len(duplicados)} grupos de arquivos duplicados encontrados.")
-        return duplicados
+        return dict(self.iterar_duplicados(diretorio, cancelamento))
+
+    def iterar_imagens_similares(self, diretorio: str, distancia_maxima: int = 6,
+                                 cancelamento: TokenCancelamento = None,
+                                 intervalo: int = 50) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Versão em fluxo de localizar_imagens_similares.
+
+        Diferente dos duplicados exatos, um grupo de semelhantes só fica
+        definitivo quando todas as imagens foram comparadas: uma imagem nova
+        pode entrar num grupo já mostrado ou juntar dois grupos. Por isso cada
+        item gerado (chave, caminhos) é o estado atual do grupo daquela chave:
+        uma chave repetida substitui o grupo anterior e uma lista vazia o remove.
+        Os grupos alterados são enviados a cada `intervalo` imagens e no fim.
+        """
+        self.log(f"--- Iniciando busca por imagens semelhantes em: {diretorio} ---")
+
+        indice: Dict[str, int] = {}
+        caminhos: List[str] = []
+        pais: List[int] = []  # Union-find para juntar vizinhos em grupos
+        membros: Dict[int, List[int]] = {}  # raiz -> índices do grupo (só grupos com 2+)
+        chaves: Dict[int, str] = {}         # raiz -> chave já enviada à UI
+        hashes: Dict[int, int] = {}
+        alterados = set()
+        removidas: List[str] = []
+
+        def raiz(i):
+            while pais[i] != i:
+                pais[i] = pais[pais[i]]
+                i = pais[i]
+            return i
+
+        def unir(i, j):
+            ri, rj = raiz(i), raiz(j)
+            if ri == rj:
+                return
+            grupo_i, grupo_j = membros.pop(ri, [ri]), membros.pop(rj, [rj])
+            if len(grupo_i) < len(grupo_j):
+                ri, rj, grupo_i, grupo_j = rj, ri, grupo_j, grupo_i
+            pais[rj] = ri
+            grupo_i.extend(grupo_j)
+            membros[ri] = grupo_i
+            alterados.discard(rj)
+            alterados.add(ri)
+            # O grupo absorvido some da UI; o que sobra mantém a chave que já tinha
+            chave_j = chaves.pop(rj, None)
+            if chave_j is not None:
+                if ri in chaves:
+                    removidas.append(chave_j)
+                else:
+                    chaves[ri] = chave_j
+
+        def pendentes():
+            for chave in removidas:
+                yield chave, []
+            removidas.clear()
+            for r in alterados:
+                chave = chaves.setdefault(r, f"{hashes[r]:016x}")
+                yield chave, [caminhos[i] for i in sorted(membros[r])]
+            alterados.clear()
+
+        def imagens():
+            for entry in percorrer_arquivos(diretorio, links=LINKS_IGNORAR):
+                if cancelamento:
+                    cancelamento.verificar()
+                if os.path.splitext(entry.name)[1].lower() in EXTENSOES_IMAGEM:
+                    yield entry.path
+
+        def calcular(filepath):
+            return self.hash_engine.calcular_com_cache(
+                filepath, "dhash-64", lambda p: f"{self.image_tools.hash_perceptual(p):016x}"
+            )
+
+        arvore = BKTree()
+        total_imagens = 0
+        try:
+            for filepath, valor_hex in self.hash_engine.mapear(calcular, imagens(), cancelamento):
+                if cancelamento:
+                    cancelamento.verificar()
+                total_imagens += 1
+                if valor_hex:
+                    i = indice[filepath] = len(caminhos)
+                    caminhos.append(filepath)
+                    pais.append(i)
+                    valor = int(valor_hex, 16)
+                    hashes[i] = valor
+                    for _, j in arvore.buscar(valor, distancia_maxima):
+                        unir(i, j)
+                    arvore.inserir(valor, i)
+                if total_imagens % intervalo == 0:
+                    yield from pendentes()
+            yield from pendentes()
+        finally:
+            self.hash_engine.salvar_cache()
+
+        self.log(f"  -> {total_imagens} imagens analisadas.")
+        self.log(f"✅ Busca concluída. {len(membros)} grupos de imagens semelhantes encontrados.")
+
+    def localizar_imagens_similares(self, diretorio: str, distancia_maxima: int = 6,
+                                    cancelamento: TokenCancelamento = None) -> Dict[str, List[str]]:
+        """
+        Localiza imagens quase iguais (mesma foto em outro tamanho ou qualidade).
+        Usa hash perceptual (dHash de 64 bits) indexado numa árvore BK: cada imagem
+        só é comparada com as vizinhas a até `distancia_maxima` bits.
+        Retorna o mesmo formato de localizar_duplicados (hash -> caminhos).
+        """
+        similares: Dict[str, List[str]] = {}
+        for chave, grupo in self.iterar_imagens_similares(diretorio, distancia_maxima, cancelamento):
+            if grupo:
+                similares[chave] = grupo
+            else:
+                similares.pop(chave, None)
+        return similares
+
+    def exportar_duplicados(self, grupos: Iterable[Tuple[str, List[str]]], caminho_saida: str) -> int:
+        """
+        Grava grupos de duplicados em CSV ou JSONL (pela extensão do arquivo),
+        um grupo por vez. Aceita o gerador de iterar_duplicados, então o
+        resultado completo nunca precisa ficar em memória.
+        Retorna a quantidade de grupos exportados.
+        """
+        formato = os.path.splitext(caminho_saida)[1].lower()
+        total = 0
+
+        with open(caminho_saida, 'w', encoding='utf-8', newline='') as saida:
+            if formato == '.jsonl':
+                for file_hash, paths in grupos:
+                    total += 1
+                    saida.write(json.dumps({"grupo": total, "hash": file_hash, "arquivos": paths},
+                                           ensure_ascii=False) + "\n")
+                    saida.flush()
+            else:
+                writer = csv.writer(saida)
+                writer.writerow(["grupo", "hash", "caminho"])
+                for file_hash, paths in grupos:
+                    total += 1
+                    writer.writerows([total, file_hash, p] for p in paths)
+                    saida.flush()
+
+        self.log(f"✅ {total} grupos exportados para: {caminho_saida}")
+        return total
 
     def renomear_em_lote(self, lista_arquivos: List[str], prefixo: str = "", sufixo: str = "", numeracao_inicial: int = 1) -> List[Tuple[str, str]]:
         """Renomeia uma lista de arquivos com prefixo, sufixo e numeração."""
@@ -95,37 +430,38 @@ class SystemTools:
         
         estatisticas = {"total_movidos": 0, "pastas_criadas": 0}
         
-        for filename in os.listdir(diretorio_origem):
-            filepath = os.path.join(diretorio_origem, filename)
+        # Só o nível de cima; a lista é montada antes porque os arquivos vão sair da pasta
+        for entry in list(percorrer_arquivos(diretorio_origem, profundidade_maxima=0)):
+            filename = entry.name
+            filepath = entry.path
+
+            _, ext = os.path.splitext(filename)
+            ext = ext.lstrip('.').lower()
             
-            if os.path.isfile(filepath):
-                _, ext = os.path.splitext(filename)
-                ext = ext.lstrip('.').lower()
-                
-                pasta_destino_relativa = extensoes_mapeadas.get(ext) or extensoes_mapeadas.get('*')
+            pasta_destino_relativa = extensoes_mapeadas.get(ext) or extensoes_mapeadas.get('*')
+            
+            if pasta_destino_relativa:
+                pasta_destino_absoluta = os.path.join(diretorio_origem, pasta_destino_relativa)
                 
-                if pasta_destino_relativa:
-                    pasta_destino_absoluta = os.path.join(diretorio_origem, pasta_destino_relativa)
+                if not os.path.exists(pasta_destino_absoluta):
+                    os.makedirs(pasta_destino_absoluta)
+                    estatisticas["pastas_criadas"] += 1
+                    self.log(f"  -> Pasta criada: {pasta_destino_relativa}")
                     
-                    if not os.path.exists(pasta_destino_absoluta):
-                        os.makedirs(pasta_destino_absoluta)
-                        estatisticas["pastas_criadas"] += 1
-                        self.log(f"  -> Pasta criada: {pasta_destino_relativa}")
+                novo_caminho = os.path.join(pasta_destino_absoluta, filename)
+                
+                try:
+                    if mover:
+                        shutil.move(filepath, novo_caminho)
+                        self.log(f"  -> Movido: {filename} para {pasta_destino_relativa}")
+                    else:
+                        shutil.copy2(filepath, novo_caminho)
+                        self.log(f"  -> Copiado: {filename} para {pasta_destino_relativa}")
                         
-                    novo_caminho = os.path.join(pasta_destino_absoluta, filename)
+                    estatisticas["total_movidos"] += 1
                     
-                    try:
-                        if mover:
-                            shutil.move(filepath, novo_caminho)
-                            self.log(f"  -> Movido: {filename} para {pasta_destino_relativa}")
-                        else:
-                            shutil.copy2(filepath, novo_caminho)
-                            self.log(f"  -> Copiado: {filename} para {pasta_destino_relativa}")
-                            
-                        estatisticas["total_movidos"] += 1
-                        
-                    except Exception as e:
-                        self.log(f"❌ Erro ao mover/copiar {filename}: {e}")
+                except Exception as e:
+                    self.log(f"❌ Erro ao mover/copiar {filename}: {e}")
         
         self.log(f"✅ Organização concluída. {estatisticas['total_movidos']} arquivos movidos/copiados.")
         return estatisticas
@@ -142,6 +478,166 @@ class SystemTools:
                 arquivos_deletados += 1
             except Exception as e:
                 self.log(f"❌ Erro ao deletar {filepath}: {e}")
+
+        if self.hash_engine.cache is not None:
+            self.hash_engine.cache.remover(lista_arquivos)
                 
         self.log(f"✅ Deleção concluída. {arquivos_deletados} arquivos removidos.")
         return arquivos_deletados
+
+    # ==========================
+    # DEDUPLICAÇÃO POR LINKS (sem apagar)
+    # ==========================
+    def _criar_reflink(self, origem: str, destino: str):
+        """Cria uma cópia copy-on-write (reflink). Lança OSError se o sistema não suportar."""
+        if sys.platform.startswith("linux"):
+            import fcntl
+            FICLONE = 0x40049409
+            with open(origem, 'rb') as src, open(destino, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        elif sys.platform == "darwin":
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            if libc.clonefile(os.fsencode(origem), os.fsencode(destino), 0) != 0:
+                erro = ctypes.get_errno()
+                raise OSError(erro, os.strerror(erro))
+        else:
+            raise OSError("Reflink não suportado neste sistema.")
+
+    def _substituir_por_link(self, original: str, copia: str, modo: str) -> str:
+        """
+        Troca `copia` por um link para `original` de forma atômica: o link é criado
+        num arquivo temporário na mesma pasta e depois renomeado por cima da cópia.
+        Retorna o modo efetivamente usado ("hardlink" ou "reflink").
+        """
+        temporario = os.path.join(os.path.dirname(copia), f".{os.path.basename(copia)}.titanium-tmp")
+        try:
+            if modo in ("reflink", "auto"):
+                try:
+                    self._criar_reflink(original, temporario)
+                    shutil.copystat(copia, temporario)
+                    os.replace(temporario, copia)
+                    return "reflink"
+                except OSError:
+                    if os.path.exists(temporario):
+                        os.remove(temporario)
+                    if modo == "reflink":
+                        raise
+
+            os.link(original, temporario)
+            os.replace(temporario, copia)
+            return "hardlink"
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def vincular_duplicados(self, pares: List[Tuple[str, str]], modo: str = "auto") -> List[str]:
+        """
+        Libera espaço sem apagar nada: cada (original, copia) vira um hardlink
+        ou reflink (copy-on-write) do original. modo: "hardlink", "reflink" ou
+        "auto" (reflink quando o sistema de arquivos suportar, senão hardlink).
+        Cada troca é registrada num diário para desfazer_vinculos().
+        Retorna a lista de cópias substituídas.
+        """
+        self.log(f"--- Iniciando Vinculação de {len(pares)} arquivos duplicados ({modo}) ---")
+
+        operacao_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        os.makedirs(JOURNAL_VINCULOS_DIR, exist_ok=True)
+        caminho_journal = os.path.join(JOURNAL_VINCULOS_DIR, f"{operacao_id}.jsonl")
+
+        substituidos: List[str] = []
+        bytes_liberados = 0
+
+        with open(caminho_journal, 'w', encoding='utf-8') as journal:
+            for original, copia in pares:
+                try:
+                    st_original = os.stat(original)
+                    st_copia = os.stat(copia)
+
+                    if st_original.st_ino == st_copia.st_ino and st_original.st_dev == st_copia.st_dev:
+                        continue  # Já são o mesmo arquivo
+                    if st_original.st_dev != st_copia.st_dev:
+                        self.log(f"⚠️ {os.path.basename(copia)} está em outro disco. Ignorado.")
+                        continue
+                    # Confere o conteúdo de novo (o arquivo pode ter mudado desde a busca)
+                    if st_original.st_size != st_copia.st_size or self._hash_file(original) != self._hash_file(copia):
+                        self.log(f"⚠️ {os.path.basename(copia)} mudou desde a busca. Ignorado.")
+                        continue
+
+                    modo_usado = self._substituir_por_link(original, copia, modo)
+
+                    journal.write(json.dumps({
+                        "original": original,
+                        "copia": copia,
+                        "modo": modo_usado,
+                        "mtime_ns": st_copia.st_mtime_ns,
+                        "permissoes": st_copia.st_mode & 0o7777,
+                    }, ensure_ascii=False) + "\n")
+                    journal.flush()
+
+                    substituidos.append(copia)
+                    bytes_liberados += st_copia.st_size
+                    self.log(f"  -> Vinculado ({modo_usado}): {os.path.basename(copia)}")
+                except Exception as e:
+                    self.log(f"❌ Erro ao vincular {copia}: {e}")
+
+        if not substituidos:
+            os.remove(caminho_journal)
+        elif self.hash_engine.cache is not None:
+            self.hash_engine.cache.remover(substituidos)
+
+        mb_total = bytes_liberados / (1024 * 1024)
+        self.log(f"✅ Vinculação concluída. {len(substituidos)} arquivos, {mb_total:.2f} MB liberados.")
+        return substituidos
+
+    def listar_operacoes_vinculo(self) -> List[str]:
+        """Lista os ids das operações de vínculo que ainda podem ser desfeitas (mais recente primeiro)."""
+        if not os.path.isdir(JOURNAL_VINCULOS_DIR):
+            return []
+        return sorted((os.path.splitext(f)[0] for f in os.listdir(JOURNAL_VINCULOS_DIR) if f.endswith(".jsonl")),
+                      reverse=True)
+
+    def desfazer_vinculos(self, operacao_id: str = None) -> int:
+        """
+        Desfaz uma operação de vincular_duplicados (a mais recente, se não informada):
+        cada hardlink volta a ser um arquivo independente, com data e permissões originais.
+        Reflinks já são independentes (copy-on-write) e não precisam ser copiados.
+        """
+        operacoes = self.listar_operacoes_vinculo()
+        operacao_id = operacao_id or (operacoes[0] if operacoes else None)
+        if not operacao_id:
+            self.log("⚠️ Nenhuma operação de vínculo para desfazer.")
+            return 0
+
+        caminho_journal = os.path.join(JOURNAL_VINCULOS_DIR, f"{operacao_id}.jsonl")
+        self.log(f"--- Desfazendo vínculos da operação {operacao_id} ---")
+
+        with open(caminho_journal, 'r', encoding='utf-8') as journal:
+            entradas = [json.loads(linha) for linha in journal if linha.strip()]
+
+        restaurados = 0
+        falhas = 0
+        for entrada in entradas:
+            copia = entrada["copia"]
+            if entrada["modo"] != "hardlink":
+                restaurados += 1
+                continue
+            temporario = os.path.join(os.path.dirname(copia), f".{os.path.basename(copia)}.titanium-tmp")
+            try:
+                shutil.copyfile(copia, temporario)
+                os.chmod(temporario, entrada["permissoes"])
+                os.utime(temporario, ns=(entrada["mtime_ns"], entrada["mtime_ns"]))
+                os.replace(temporario, copia)
+                restaurados += 1
+                self.log(f"  -> Restaurado: {os.path.basename(copia)}")
+            except Exception as e:
+                falhas += 1
+                if os.path.exists(temporario):
+                    os.remove(temporario)
+                self.log(f"❌ Erro ao restaurar {copia}: {e}")
+
+        if not falhas:
+            os.remove(caminho_journal)
+
+        self.log(f"✅ Operação desfeita. {restaurados} arquivos restaurados.")
+        return restaurados
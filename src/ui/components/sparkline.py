@@ -0,0 +1,57 @@
+'''
+Mini gráfico de linha (sparkline) para séries de métricas.
+Desenha direto num Canvas: um único item de linha por trecho contínuo.
+'''
+import customtkinter as ctk
+
+
+class Sparkline(ctk.CTkCanvas):
+    """
+    Gráfico compacto de uma série de valores.
+
+    definir_valores() recebe a série da mais antiga para a mais recente;
+    None marca intervalos sem amostra e interrompe a linha. Se a série for a
+    mesma da última chamada, nada é redesenhado.
+    """
+
+    def __init__(self, parent, largura=220, altura=36, cor="#4cc9f0", maximo=None, **kwargs):
+        super().__init__(parent, width=largura, height=altura, highlightthickness=0,
+                         bg=kwargs.pop("bg", "#2b2b2b"), **kwargs)
+        self.largura = largura
+        self.altura = altura
+        self.cor = cor
+        self.maximo = maximo   # Escala fixa (ex.: 100 para %); None = escala pelo maior valor
+        self._valores = None
+
+    def definir_valores(self, valores):
+        if valores == self._valores:
+            return
+        self._valores = valores
+        self.delete("serie")
+
+        presentes = [v for v in valores if v is not None]
+        if not presentes or len(valores) < 2:
+            return
+
+        maximo = self.maximo or max(presentes) or 1
+        passo = (self.largura - 2) / (len(valores) - 1)
+        util = self.altura - 4
+
+        trecho = []
+        for i, valor in enumerate(valores):
+            if valor is None:
+                self._desenhar_trecho(trecho)
+                trecho = []
+                continue
+            x = 1 + i * passo
+            y = 2 + util - min(valor, maximo) / maximo * util
+            trecho.extend((x, y))
+        self._desenhar_trecho(trecho)
+
+    def _desenhar_trecho(self, pontos):
+        if len(pontos) >= 4:
+            self.create_line(*pontos, fill=self.cor, width=1.5, tags="serie")
+        elif len(pontos) == 2:
+            # Amostra isolada entre lacunas: um ponto
+            x, y = pontos
+            self.create_oval(x - 1, y - 1, x + 1, y + 1, fill=self.cor, outline="", tags="serie")
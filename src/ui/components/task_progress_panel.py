@@ -59,6 +59,12 @@ class TaskProgressPanel(ctk.CTkFrame):
             # Remove a tarefa da lista após um tempo
             self.after(5000, lambda: self._remove_task_widget(task_id))
 
+        elif status == "CANCELADA":
+            widget_info["progress"].stop()
+            widget_info["progress"].set(0)
+            widget_info["frame"].configure(fg_color="gray30")
+            self.after(5000, lambda: self._remove_task_widget(task_id))
+
         elif status == "ERRO":
             widget_info["progress"].stop()
             widget_info["progress"].set(1)
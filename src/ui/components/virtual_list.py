@@ -0,0 +1,159 @@
+'''
+Lista virtualizada para grandes volumes de linhas.
+Só existem widgets para as linhas visíveis; ao rolar, eles são reaproveitados.
+'''
+import customtkinter as ctk
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Lista com rolagem que não cria um widget por linha.
+
+    Os dados ficam fora do componente. Para cada linha visível a lista chama
+    obter_linha(i), que deve retornar (tipo, texto, selecionado), onde tipo é
+    "cabecalho" (rótulo em negrito) ou "item" (checkbox). Quando o usuário clica
+    num item, ao_alternar(i) é chamado e a lista é redesenhada.
+    """
+
+    def __init__(self, parent, obter_linha, ao_alternar=None, altura_linha=28, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.obter_linha = obter_linha
+        self.ao_alternar = ao_alternar
+        self.altura_linha = altura_linha
+
+        self.total = 0        # Quantidade de linhas nos dados
+        self.inicio = 0       # Índice da primeira linha visível
+        self.linhas_visiveis = 0
+        self.slots = []       # Widgets reaproveitados (um por linha visível)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.area = ctk.CTkFrame(self, fg_color="transparent")
+        self.area.grid(row=0, column=0, sticky="nsew")
+        self.area.grid_columnconfigure(0, weight=1)
+        self.area.grid_propagate(False)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.area.bind("<Configure>", self._on_resize)
+        self._bind_rolagem(self.area)
+
+    # --- API ---
+    def set_total(self, total):
+        """Informa quantas linhas existem nos dados e redesenha."""
+        self.total = total
+        self.refresh()
+
+    def refresh(self):
+        """Redesenha apenas as linhas visíveis."""
+        self.inicio = max(0, min(self.inicio, self.total - self.linhas_visiveis))
+
+        for k, slot in enumerate(self.slots):
+            i = self.inicio + k
+            if k >= self.linhas_visiveis or i >= self.total:
+                self._esconder_slot(slot)
+                continue
+
+            tipo, texto, selecionado = self.obter_linha(i)
+            slot["indice"] = i
+            if tipo == "cabecalho":
+                self._mostrar(slot, "cabecalho")
+                self._configurar(slot, "cabecalho", texto)
+            else:
+                self._mostrar(slot, "item")
+                self._configurar(slot, "item", texto)
+                checkbox = slot["item"]
+                if selecionado != slot["selecionado"]:
+                    checkbox.select() if selecionado else checkbox.deselect()
+                    slot["selecionado"] = selecionado
+
+        self._atualizar_scrollbar()
+
+    # --- SLOTS ---
+    def _criar_slot(self, linha):
+        cabecalho = ctk.CTkLabel(self.area, text="", anchor="w", font=ctk.CTkFont(weight="bold"))
+        item = ctk.CTkCheckBox(self.area, text="", onvalue="on", offvalue="off")
+        slot = {"cabecalho": cabecalho, "item": item, "visivel": None, "texto": None,
+                "selecionado": False, "indice": None}
+        item.configure(command=lambda s=slot: self._on_alternar(s))
+
+        cabecalho.grid(row=linha, column=0, sticky="ew", padx=10)
+        item.grid(row=linha, column=0, sticky="w", padx=25)
+        cabecalho.grid_remove()
+        item.grid_remove()
+        self.area.grid_rowconfigure(linha, minsize=self.altura_linha)
+
+        self._bind_rolagem(cabecalho)
+        self._bind_rolagem(item)
+        return slot
+
+    def _mostrar(self, slot, tipo):
+        if slot["visivel"] == tipo:
+            return
+        if slot["visivel"]:
+            slot[slot["visivel"]].grid_remove()
+        slot[tipo].grid()
+        slot["visivel"] = tipo
+        slot["texto"] = None
+
+    def _esconder_slot(self, slot):
+        if slot["visivel"]:
+            slot[slot["visivel"]].grid_remove()
+            slot["visivel"] = None
+        slot["indice"] = None
+
+    def _configurar(self, slot, tipo, texto):
+        # Só chama configure() quando o texto muda de fato
+        if slot["texto"] != texto:
+            slot[tipo].configure(text=texto)
+            slot["texto"] = texto
+
+    def _on_alternar(self, slot):
+        if slot["indice"] is not None and self.ao_alternar:
+            self.ao_alternar(slot["indice"])
+        slot["selecionado"] = slot["item"].get() == "on"
+        self.refresh()
+
+    # --- ROLAGEM ---
+    def _on_resize(self, event):
+        self.linhas_visiveis = max(1, event.height // self.altura_linha)
+        while len(self.slots) < self.linhas_visiveis:
+            self.slots.append(self._criar_slot(len(self.slots)))
+        self.refresh()
+
+    def _rolar_para(self, inicio):
+        novo_inicio = max(0, min(int(inicio), self.total - self.linhas_visiveis))
+        if novo_inicio != self.inicio:
+            self.inicio = novo_inicio
+            self.refresh()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._rolar_para(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            passo = self.linhas_visiveis if args[2] == "pages" else 1
+            self._rolar_para(self.inicio + int(args[1]) * passo)
+
+    def _on_roda(self, event):
+        if getattr(event, "num", None) == 4:
+            passos = -3
+        elif getattr(event, "num", None) == 5:
+            passos = 3
+        else:
+            passos = -3 if event.delta > 0 else 3
+        self._rolar_para(self.inicio + passos)
+
+    def _bind_rolagem(self, widget):
+        widget.bind("<MouseWheel>", self._on_roda, add="+")
+        widget.bind("<Button-4>", self._on_roda, add="+")
+        widget.bind("<Button-5>", self._on_roda, add="+")
+
+    def _atualizar_scrollbar(self):
+        if self.total <= 0:
+            self.scrollbar.set(0, 1)
+            return
+        primeiro = self.inicio / self.total
+        ultimo = min(1.0, (self.inicio + self.linhas_visiveis) / self.total)
+        self.scrollbar.set(primeiro, ultimo)
@@ -2,10 +2,11 @@
 import customtkinter as ctk
 import os
 import json
-import psutil
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from src.ui.components.tooltip import add_tooltip
+from src.ui.components.sparkline import Sparkline
+from src.modules.monitor import ColetorMetricas, ContextoAvaliacao
 
 class FrameDashboard(ctk.CTkFrame):
     def __init__(self, parent, master_app=None):
@@ -16,7 +17,7 @@ class FrameDashboard(ctk.CTkFrame):
         # Grid principal
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
-        self.grid_rowconfigure(2, weight=1)
+        self.grid_rowconfigure(4, weight=1)
         
         # Título com horário
         self.setup_header()
@@ -25,13 +26,25 @@ class FrameDashboard(ctk.CTkFrame):
         self.setup_health_card()      # Esquerda: Saúde do Sistema
         self.setup_activity_card()    # Direita: Últimas Atividades
         
+        # Histórico de CPU/RAM/Disco (1h, 24h, 7d)
+        self.setup_history_card()
+        
+        # Processos que mais consomem CPU/RAM
+        self.setup_processes_card()
+        
         # Alertas e Ações Rápidas
         self.setup_alerts_section()
         
         # Sistema de logs
         self.ensure_logs_exist()
         
-        # Atualiza dados a cada 30 segundos (inteligente)
+        # Métricas coletadas numa thread própria; a interface só lê o snapshot
+        self.coletor = ColetorMetricas()
+        self.coletor.iniciar()
+        self._ultimo_snapshot = None
+        self.bind("<Destroy>", self._ao_destruir, add="+")
+        
+        # Atualiza dados conforme a saúde do sistema (inteligente)
         self.update_dashboard_smart()
         
     def setup_header(self):
@@ -103,25 +116,8 @@ class FrameDashboard(ctk.CTkFrame):
         self.frame_indicators = ctk.CTkFrame(self.card_health, fg_color="transparent")
         self.frame_indicators.pack(pady=10, fill="x", padx=20)
         
+        # Uma linha por verificação registrada no coletor (criadas conforme aparecem)
         self.indicators = {}
-        indicadores = [
-            ("disco", "💾 Espaço em Disco"),
-            ("backup", "☁️ Status Backup"),
-            ("temp", "🗑️ Arquivos Temp"),
-            ("licenca", "🔑 Licença")
-        ]
-        
-        for key, label in indicadores:
-            frame = ctk.CTkFrame(self.frame_indicators, fg_color="transparent")
-            frame.pack(fill="x", pady=2)
-            
-            lbl = ctk.CTkLabel(frame, text=label, font=ctk.CTkFont(size=11), anchor="w")
-            lbl.pack(side="left")
-            
-            status = ctk.CTkLabel(frame, text="⏳", font=ctk.CTkFont(size=11))
-            status.pack(side="right")
-            
-            self.indicators[key] = status
             
     def setup_activity_card(self):
         """Card de Últimas Atividades"""
@@ -138,13 +134,89 @@ class FrameDashboard(ctk.CTkFrame):
         self.scroll_stats = ctk.CTkScrollableFrame(self.card_activity, height=250)
         self.scroll_stats.pack(fill="both", expand=True, padx=15, pady=10)
         
-        # Estatísticas (serão populadas dinamicamente)
-        self.stats_labels = {}
+        # Estatísticas (linhas reaproveitadas entre atualizações, por rótulo)
+        self.stats_rows = {}
+        
+    def setup_history_card(self):
+        """Card com o histórico das métricas em mini gráficos"""
+        self.card_history = ctk.CTkFrame(self, corner_radius=15)
+        self.card_history.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+        
+        frame_topo = ctk.CTkFrame(self.card_history, fg_color="transparent")
+        frame_topo.pack(fill="x", padx=15, pady=(10, 5))
+        
+        ctk.CTkLabel(
+            frame_topo,
+            text="📈 Histórico",
+            font=ctk.CTkFont(size=16, weight="bold")
+        ).pack(side="left")
+        
+        # Botão -> janela do armazém de métricas
+        self.janelas_historico = {"1h": "hora", "24h": "dia", "7d": "semana"}
+        self.seletor_janela = ctk.CTkSegmentedButton(
+            frame_topo,
+            values=list(self.janelas_historico),
+            command=lambda _: self.update_history(self._ultimo_snapshot)
+        )
+        self.seletor_janela.set("1h")
+        self.seletor_janela.pack(side="right")
+        
+        frame_series = ctk.CTkFrame(self.card_history, fg_color="transparent")
+        frame_series.pack(fill="x", padx=15, pady=(0, 10))
+        
+        self.sparklines = {}
+        series = [
+            ("cpu", "⚡ CPU", "#4cc9f0"),
+            ("memoria", "🧠 RAM", "#06d6a0"),
+            ("disco", "💾 Disco", "#ffd60a")
+        ]
+        
+        for coluna, (key, label, cor) in enumerate(series):
+            frame_series.grid_columnconfigure(coluna, weight=1)
+            frame = ctk.CTkFrame(frame_series, fg_color="#2b2b2b", corner_radius=10)
+            frame.grid(row=0, column=coluna, padx=5, sticky="ew")
+            
+            ctk.CTkLabel(frame, text=label, font=ctk.CTkFont(size=11), anchor="w").grid(
+                row=0, column=0, sticky="w", padx=10, pady=(6, 0))
+            valor = ctk.CTkLabel(frame, text="--", font=ctk.CTkFont(size=11, weight="bold"), text_color=cor)
+            valor.grid(row=0, column=1, sticky="e", padx=10, pady=(6, 0))
+            
+            grafico = Sparkline(frame, cor=cor, maximo=100)
+            grafico.grid(row=1, column=0, columnspan=2, padx=10, pady=(2, 8))
+            
+            self.sparklines[key] = (grafico, valor)
+        
+    def setup_processes_card(self):
+        """Card com os processos que mais consomem recursos"""
+        self.card_processes = ctk.CTkFrame(self, corner_radius=15)
+        self.card_processes.grid(row=3, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+        
+        frame_topo = ctk.CTkFrame(self.card_processes, fg_color="transparent")
+        frame_topo.pack(fill="x", padx=15, pady=(10, 5))
+        
+        ctk.CTkLabel(
+            frame_topo,
+            text="🔥 Processos",
+            font=ctk.CTkFont(size=16, weight="bold")
+        ).pack(side="left")
+        
+        self.seletor_processos = ctk.CTkSegmentedButton(
+            frame_topo,
+            values=["CPU", "Memória"],
+            command=lambda _: self.update_processes(self._ultimo_snapshot)
+        )
+        self.seletor_processos.set("CPU")
+        self.seletor_processos.pack(side="right")
+        
+        # Linhas reaproveitadas entre atualizações, por PID
+        self.container_processes = ctk.CTkFrame(self.card_processes, fg_color="transparent")
+        self.container_processes.pack(fill="x", padx=15, pady=(0, 10))
+        self.process_rows = {}
         
     def setup_alerts_section(self):
         """Seção de Alertas e Ações Rápidas"""
         self.frame_alerts = ctk.CTkFrame(self, corner_radius=15)
-        self.frame_alerts.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
+        self.frame_alerts.grid(row=4, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
         
         ctk.CTkLabel(
             self.frame_alerts,
@@ -156,6 +228,9 @@ class FrameDashboard(ctk.CTkFrame):
         self.container_alerts = ctk.CTkFrame(self.frame_alerts, fg_color="transparent")
         self.container_alerts.pack(fill="both", expand=True, padx=15, pady=10)
         
+        # Cards de alerta reaproveitados entre atualizações, por título
+        self.alert_rows = {}
+        
     def ensure_logs_exist(self):
         """Garante que os logs necessários existam"""
         # Cria diretório de logs
@@ -233,454 +308,213 @@ class FrameDashboard(ctk.CTkFrame):
                 json.dump(initial_maintenance, f, indent=2)
     
     def update_dashboard_smart(self):
-        """Atualiza dashboard baseado em necessidade real"""
+        """
+        Atualiza dashboard baseado em necessidade real.
+        Só lê o último snapshot do coletor: nenhuma leitura de disco, CPU ou
+        arquivos acontece na thread da interface.
+        """
+        snapshot = self.coletor.snapshot
+        if snapshot is None:
+            # Primeira coleta ainda em andamento
+            self.after(500, self.update_dashboard_smart)
+            return
+
         try:
-            # Calcula saúde do sistema
-            score, status_text, color = self.calculate_health_score()
-            
-            # Atualiza UI
-            self.lbl_score.configure(text=f"{score}", text_color=color)
-            self.lbl_status.configure(text=status_text)
-            self.progress_health.set(score / 100)
-            
-            # Atualiza estatísticas reais
-            self.update_real_statistics()
-            
-            # Atualiza alertas
-            self.update_alerts()
-            
-            # Define intervalo baseado no score
-            if score < 50:  # Sistema crítico
-                interval = 10000  # Atualiza a cada 10s
-            elif score < 70:  # Sistema com atenção
-                interval = 20000  # Atualiza a cada 20s
-            else:  # Sistema saudável
-                interval = 60000  # Atualiza a cada 60s
+            if snapshot is not self._ultimo_snapshot:
+                self._ultimo_snapshot = snapshot
+                for erro in snapshot.erros:
+                    self.log_error(erro)
+                
+                # Gráficos: um ponto novo a cada amostra (10 s)
+                self.update_history(snapshot)
+                self.update_processes(snapshot)
+
+                # Avaliação única do tick, compartilhada por score, resumo e alertas
+                contexto = ContextoAvaliacao(snapshot)
+                
+                # Calcula saúde do sistema
+                score, status_text, color = self.calculate_health_score(contexto)
+                
+                # Atualiza UI
+                self.lbl_score.configure(text=f"{score}", text_color=color)
+                self.lbl_status.configure(text=status_text)
+                self.progress_health.set(score / 100)
+                
+                # Atualiza estatísticas reais
+                self.update_real_statistics(contexto)
+                
+                # Atualiza alertas
+                self.update_alerts(contexto)
+                
+                # Define frequência das verificações baseada no score
+                if score < 50:  # Sistema crítico
+                    self.coletor.intervalo = 10  # Verificações 6x mais frequentes
+                elif score < 70:  # Sistema com atenção
+                    self.coletor.intervalo = 20  # Verificações 3x mais frequentes
+                else:  # Sistema saudável
+                    self.coletor.intervalo = 60  # Intervalos declarados de cada verificação
             
-            # Reagenda
-            self.after(interval, self.update_dashboard_smart)
+            # Reagenda (só compara referências; custo desprezível)
+            self.after(1000, self.update_dashboard_smart)
             
         except Exception as e:
             self.log_error(f"Erro na atualização do dashboard: {e}")
             # Reagenda mesmo com erro
             self.after(30000, self.update_dashboard_smart)
         
-    def calculate_health_score(self):
-        """Calcula pontuação de saúde (0-100) - VERSÃO CORRIGIDA"""
-        score = 100
-        issues = []
-        
-        # 1. ESPAÇO EM DISCO (30 pontos) - CORRIGIDO PARA MULTIPLATAFORMA
-        try:
-            disk_percent, disk_free_gb, disk_total_gb = self.get_disk_usage()
-            
-            if disk_percent > 95:
-                score -= 30
-                self.indicators["disco"].configure(text=f"🔴 {disk_percent:.0f}%", text_color="#ef233c")
-                issues.append("Disco quase cheio")
-            elif disk_percent > 85:
-                score -= 15
-                self.indicators["disco"].configure(text=f"⚠️ {disk_percent:.0f}%", text_color="#ffd60a")
-            else:
-                self.indicators["disco"].configure(text=f"✅ {disk_percent:.0f}%", text_color="#06d6a0")
-        except Exception as e:
-            score -= 10
-            self.indicators["disco"].configure(text="❓ Erro", text_color="gray")
-            self.log_error(f"Erro ao capturar disco: {e}")
-        
-        # 2. STATUS BACKUP (30 pontos) - MELHORADO
-        try:
-            backup_status, backup_info = self.get_backup_status()
-            if backup_status == "critical":
-                score -= 30
-                self.indicators["backup"].configure(text=f"🔴 {backup_info}", text_color="#ef233c")
-                issues.append("Backup desatualizado")
-            elif backup_status == "warning":
-                score -= 15
-                self.indicators["backup"].configure(text=f"⚠️ {backup_info}", text_color="#ffd60a")
-            else:
-                self.indicators["backup"].configure(text=f"✅ {backup_info}", text_color="#06d6a0")
-        except Exception as e:
-            score -= 20
-            self.indicators["backup"].configure(text="❓ Erro", text_color="gray")
-            self.log_error(f"Erro ao capturar backup: {e}")
+    def calculate_health_score(self, contexto):
+        """Aplica os indicadores do contexto e retorna (score 0-100, texto, cor)"""
+        itens = [(key, (contexto.rotulos[key], texto, cor)) for key, (texto, cor, _) in contexto.indicadores.items()]
+        self._reconciliar(self.indicators, itens, self._criar_indicador, self._atualizar_indicador, pady=2)
+        return contexto.saude
+    
+    def _criar_indicador(self, dados):
+        frame = ctk.CTkFrame(self.frame_indicators, fg_color="transparent")
+        frame.pack(fill="x", pady=2)
         
-        # 3. ARQUIVOS TEMPORÁRIOS (20 pontos) - CORRIGIDO
-        try:
-            temp_size_gb, temp_count = self.get_temp_files_info()
-            
-            if temp_size_gb > 5:
-                score -= 20
-                self.indicators["temp"].configure(text=f"🔴 {temp_size_gb:.1f}GB", text_color="#ef233c")
-                issues.append("Muitos arquivos temporários")
-            elif temp_size_gb > 2:
-                score -= 10
-                self.indicators["temp"].configure(text=f"⚠️ {temp_size_gb:.1f}GB", text_color="#ffd60a")
-            else:
-                self.indicators["temp"].configure(text=f"✅ {temp_size_gb:.1f}GB", text_color="#06d6a0")
-        except Exception as e:
-            self.indicators["temp"].configure(text="❓ Erro", text_color="gray")
-            self.log_error(f"Erro ao capturar arquivos temp: {e}")
+        lbl = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=11), anchor="w")
+        lbl.pack(side="left")
         
-        # 4. LICENÇA (20 pontos) - MELHORADO
-        try:
-            license_status = self.get_license_status()
-            if license_status == "valid":
-                self.indicators["licenca"].configure(text="✅ Ativa", text_color="#06d6a0")
-            elif license_status == "trial":
-                self.indicators["licenca"].configure(text="⏱️ Trial", text_color="#ffd60a")
-            else:
-                score -= 20
-                self.indicators["licenca"].configure(text="🔴 Inválida", text_color="#ef233c")
-                issues.append("Licença expirada")
-        except Exception as e:
-            score -= 10
-            self.indicators["licenca"].configure(text="❓ Erro", text_color="gray")
-            self.log_error(f"Erro ao capturar licença: {e}")
-        
-        # Define texto e cor baseado no score
-        if score >= 90:
-            status = "Excelente"
-            color = "#06d6a0"
-        elif score >= 70:
-            status = "Bom"
-            color = "#4cc9f0"
-        elif score >= 50:
-            status = "Atenção Necessária"
-            color = "#ffd60a"
-        else:
-            status = "Crítico"
-            color = "#ef233c"
+        status = ctk.CTkLabel(frame, text="⏳", font=ctk.CTkFont(size=11))
+        status.pack(side="right")
         
-        return score, status, color
+        return {"frame": frame, "rotulo": lbl, "status": status}
     
-    def get_disk_usage(self):
-        """Captura uso de disco multiplataforma - CORREÇÃO CRÍTICA"""
-        try:
-            if os.name == 'nt':  # Windows
-                disk = psutil.disk_usage('C:')
-            else:  # Linux/Mac
-                disk = psutil.disk_usage('/')
-            
-            percent_used = (disk.total - disk.free) / disk.total * 100
-            free_gb = disk.free / (1024**3)
-            total_gb = disk.total / (1024**3)
-            
-            return percent_used, free_gb, total_gb
-        except Exception as e:
-            self.log_error(f"Erro ao capturar disco: {e}")
-            return 0, 0, 0
+    def _atualizar_indicador(self, linha, dados):
+        rotulo, texto, cor = dados
+        anterior = linha["dados"] or (None, None, None)
+        if anterior[0] != rotulo:
+            linha["rotulo"].configure(text=rotulo)
+        if anterior[1:] != (texto, cor):
+            linha["status"].configure(text=texto, text_color=cor)
     
-    def get_temp_files_info(self):
-        """Captura informações de arquivos temporários de forma segura - CORREÇÃO CRÍTICA"""
-        temp_paths = self._get_temp_paths()
-        total_size = 0
-        file_count = 0
-        
-        for temp_path in temp_paths:
-            if temp_path.exists():
-                try:
-                    # Usa generator para economizar memória e evitar bloqueios
-                    for item in self._safe_iterdir(temp_path):
-                        if item.is_file():
-                            try:
-                                # Verifica se é realmente um arquivo temporário
-                                if self._is_temp_file(item):
-                                    stat = item.stat()
-                                    total_size += stat.st_size
-                                    file_count += 1
-                            except (PermissionError, OSError):
-                                continue  # Pula arquivos sem permissão
-                except Exception as e:
-                    self.log_error(f"Erro ao ler {temp_path}: {e}")
-        
-        return total_size / (1024**3), file_count  # Retorna em GB
+    def update_history(self, snapshot):
+        """Redesenha os mini gráficos com a janela selecionada"""
+        if snapshot is None:
+            return
+        janela = self.janelas_historico[self.seletor_janela.get()]
+        for key, (grafico, valor) in self.sparklines.items():
+            valores = snapshot.historico.get((key, janela), ())
+            grafico.definir_valores(valores)
+            ultimo = next((v for v in reversed(valores) if v is not None), None)
+            valor.configure(text=f"{ultimo:.0f}%" if ultimo is not None else "--")
     
-    def _get_temp_paths(self):
-        """Obtém caminhos de arquivos temporários baseados no sistema"""
-        temp_paths = []
-        
-        # Caminho TEMP padrão
-        temp_env = os.environ.get('TEMP', '')
-        if temp_env:
-            temp_paths.append(Path(temp_env))
-        
-        # Caminho Windows Temp
-        if os.name == 'nt':
-            windir = os.environ.get('WINDIR', '')
-            if windir:
-                temp_paths.append(Path(windir) / "Temp")
-        
-        # Caminho Linux/Mac Temp
+    def update_processes(self, snapshot):
+        """Atualiza o top de processos pela métrica selecionada"""
+        if snapshot is None:
+            return
+        if self.seletor_processos.get() == "CPU":
+            processos = snapshot.processos_cpu
         else:
-            temp_paths.append(Path("/tmp"))
-        
-        return temp_paths
+            processos = snapshot.processos_memoria
+        itens = [(p.pid, (p.nome, f"{p.cpu:.1f}%", f"{p.memoria_mb:,.0f} MB")) for p in processos]
+        self._reconciliar(self.process_rows, itens, self._criar_linha_processo, self._atualizar_linha_processo)
     
-    def _safe_iterdir(self, path):
-        """Itera sobre diretório de forma segura"""
-        try:
-            return path.iterdir()
-        except PermissionError:
-            return []
-    
-    def _is_temp_file(self, file_path):
-        """Verifica se é realmente um arquivo temporário"""
-        temp_extensions = ['.tmp', '.temp', '.cache', '.log']
-        temp_names = ['temp', 'tmp', 'cache']
-        
-        # Verifica extensão
-        if file_path.suffix.lower() in temp_extensions:
-            return True
-        
-        # Verifica nome
-        name_lower = file_path.stem.lower()
-        if any(temp_name in name_lower for temp_name in temp_names):
-            return True
+    def _criar_linha_processo(self, dados):
+        frame = ctk.CTkFrame(self.container_processes, fg_color="#2b2b2b", corner_radius=10)
+        frame.pack(fill="x", pady=5)
+        frame.grid_columnconfigure(0, weight=1)
         
-        # Verifica data de modificação (arquivos muito antigos não são temporários)
-        try:
-            stat = file_path.stat()
-            age_days = (datetime.now().timestamp() - stat.st_mtime) / (24 * 3600)
-            if age_days > 30:  # Mais de 30 dias
-                return False
-        except:
-            pass
+        lbl_nome = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12), anchor="w")
+        lbl_nome.grid(row=0, column=0, sticky="w", padx=10, pady=4)
         
-        return False
-    
-    def get_backup_status(self):
-        """Obtém status do backup - MELHORADO"""
-        backup_log = Path("logs/backup_history.json")
+        lbl_cpu = ctk.CTkLabel(frame, text="", width=70, font=ctk.CTkFont(size=12, weight="bold"),
+                               text_color="#4cc9f0", anchor="e")
+        lbl_cpu.grid(row=0, column=1, padx=10, pady=4)
         
-        if not backup_log.exists():
-            return "critical", "Nunca feito"
+        lbl_memoria = ctk.CTkLabel(frame, text="", width=90, font=ctk.CTkFont(size=12, weight="bold"),
+                                   text_color="#06d6a0", anchor="e")
+        lbl_memoria.grid(row=0, column=2, padx=10, pady=4)
         
-        try:
-            with open(backup_log, "r", encoding="utf-8") as f:
-                history_data = json.load(f)
-            
-            # Valida se é dicionário
-            if not isinstance(history_data, dict):
-                # Se for lista, converte
-                history_data = {"history": history_data, "last_check": datetime.now().isoformat()}
-                with open(backup_log, "w") as f:
-                    json.dump(history_data, f, indent=2)
-            
-            if not history_data.get("history"):
-                return "warning", "Sem histórico"
-            
-            last_backup_str = history_data["history"][-1]["timestamp"]
-            last_backup = datetime.fromisoformat(last_backup_str)
-            days_ago = (datetime.now() - last_backup).days
-            
-            if days_ago > 14:
-                return "critical", f"Há {days_ago}d"
-            elif days_ago > 7:
-                return "warning", f"Há {days_ago}d"
-            else:
-                return "ok", f"Há {days_ago}d"
-                
-        except Exception as e:
-            self.log_error(f"Erro ao ler log de backup: {e}")
-            return "error", "Erro de leitura"
+        return {"frame": frame, "colunas": (lbl_nome, lbl_cpu, lbl_memoria)}
     
-    def get_license_status(self):
-        """Obtém status da licença - MELHORADO"""
-        license_file = Path("license.key")
-        
-        if not license_file.exists():
-            # Verifica trial
-            trial_status = self._check_trial_status()
-            if trial_status["status"] == "trial_ativo":
-                return "trial"
-            return "invalid"
-        
-        try:
-            from src.modules.auth import AuthManager
-            auth = AuthManager()
-            
-            if auth.verificar_licenca_completa():
-                return "valid"
-            else:
-                return "expired"
-        except Exception as e:
-            self.log_error(f"Erro ao verificar licença: {e}")
-            return "error"
+    def _atualizar_linha_processo(self, linha, dados):
+        anterior = linha["dados"] or (None, None, None)
+        for label, valor, valor_anterior in zip(linha["colunas"], dados, anterior):
+            if valor != valor_anterior:
+                label.configure(text=valor)
     
-    def _check_trial_status(self):
-        """Verifica status do trial"""
-        trial_config = Path("config/trial.json")
-        
-        if not trial_config.exists():
-            return {"status": "trial_ativo", "dias_restantes": 30}
-        
-        try:
-            with open(trial_config, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            data_inicio = datetime.fromisoformat(data["data_inicio"])
-            data_fim = data_inicio + timedelta(days=data["trial_dias"])
-            agora = datetime.now()
-            
-            if agora <= data_fim:
-                dias_restantes = (data_fim - agora).days
-                return {"status": "trial_ativo", "dias_restantes": dias_restantes}
-            else:
-                return {"status": "trial_expirado", "dias_restantes": 0}
-        except:
-            return {"status": "erro", "dias_restantes": 0}
+    def _reconciliar(self, linhas, itens, criar, atualizar, pady=5):
+        """
+        Sincroniza as linhas de um painel com `itens` [(chave, dados)].
+        Linhas com a mesma chave são reaproveitadas e só recebem configure()
+        se os dados mudaram; as novas são criadas e as que sumiram, destruídas.
+        Os frames só são reempacotados quando a ordem muda.
+        """
+        chaves = [chave for chave, _ in itens]
+        for chave in [c for c in linhas if c not in chaves]:
+            linhas.pop(chave)["frame"].destroy()
+        
+        for chave, dados in itens:
+            linha = linhas.get(chave)
+            if linha is None:
+                linha = linhas[chave] = criar(dados)
+                linha["dados"] = None
+            if linha["dados"] != dados:
+                atualizar(linha, dados)
+                linha["dados"] = dados
+        
+        if list(linhas) != chaves:
+            for chave in chaves:
+                linha = linhas.pop(chave)
+                linha["frame"].pack_forget()
+                linha["frame"].pack(fill="x", pady=pady)
+                linhas[chave] = linha
     
-    def update_real_statistics(self):
-        """Atualiza estatísticas reais do sistema - SUBSTITUI DADOS FICTÍCIOS"""
-        # Limpa stats anteriores
-        for widget in self.scroll_stats.winfo_children():
-            widget.destroy()
-        
-        # Carrega dados reais
-        stats_data = self.load_real_stats()
-        
-        for stat in stats_data:
-            frame = ctk.CTkFrame(self.scroll_stats, fg_color="#2b2b2b", corner_radius=10)
-            frame.pack(fill="x", pady=5)
-            
-            # Ícone + Label
-            ctk.CTkLabel(
-                frame,
-                text=f"{stat['icon']} {stat['label']}",
-                font=ctk.CTkFont(size=12),
-                anchor="w"
-            ).pack(side="left", padx=10, pady=8)
-            
-            # Valor
-            ctk.CTkLabel(
-                frame,
-                text=stat['value'],
-                font=ctk.CTkFont(size=12, weight="bold"),
-                text_color="#4cc9f0"
-            ).pack(side="right", padx=10, pady=8)
+    def update_real_statistics(self, contexto):
+        """Atualiza estatísticas reais do sistema, reaproveitando as linhas já criadas"""
+        stats_data = self.load_real_stats(contexto)
+        itens = [(stat['label'], (stat['icon'], stat['label'], stat['value'])) for stat in stats_data]
+        self._reconciliar(self.stats_rows, itens, self._criar_linha_stat, self._atualizar_linha_stat)
     
-    def load_real_stats(self):
-        """Carrega estatísticas reais do sistema - SUBSTITUIÇÃO CRÍTICA"""
-        stats = []
-        
-        # 1. Espaço em Disco (REAL)
-        try:
-            disk_percent, disk_free_gb, disk_total_gb = self.get_disk_usage()
-            stats.append({
-                "icon": "💾", 
-                "label": "Espaço em Disco", 
-                "value": f"{disk_free_gb:.1f} GB livre"
-            })
-        except:
-            stats.append({
-                "icon": "❓", 
-                "label": "Espaço em Disco", 
-                "value": "Erro ao capturar"
-            })
+    def _criar_linha_stat(self, dados):
+        frame = ctk.CTkFrame(self.scroll_stats, fg_color="#2b2b2b", corner_radius=10)
+        frame.pack(fill="x", pady=5)
         
-        # 2. Arquivos Temporários (REAL)
-        try:
-            temp_size_gb, temp_count = self.get_temp_files_info()
-            stats.append({
-                "icon": "🗑️", 
-                "label": "Arquivos Temp", 
-                "value": f"{temp_count:,} arquivos ({temp_size_gb:.1f}GB)"
-            })
-        except:
-            stats.append({
-                "icon": "❓", 
-                "label": "Arquivos Temp", 
-                "value": "Erro ao capturar"
-            })
+        # Ícone + Label
+        lbl_titulo = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12), anchor="w")
+        lbl_titulo.pack(side="left", padx=10, pady=8)
         
-        # 3. Status da Licença (REAL)
-        try:
-            license_status = self.get_license_status()
-            if license_status == "valid":
-                stats.append({
-                    "icon": "✅", 
-                    "label": "Licença", 
-                    "value": "Ativa"
-                })
-            elif license_status == "trial":
-                trial_info = self._check_trial_status()
-                stats.append({
-                    "icon": "⏱️", 
-                    "label": "Licença", 
-                    "value": f"Trial ({trial_info['dias_restantes']} dias)"
-                })
-            else:
-                stats.append({
-                    "icon": "⚠️", 
-                    "label": "Licença", 
-                    "value": "Expirada"
-                })
-        except:
-            stats.append({
-                "icon": "❓", 
-                "label": "Licença", 
-                "value": "Erro ao verificar"
-            })
+        # Valor
+        lbl_valor = ctk.CTkLabel(
+            frame,
+            text="",
+            font=ctk.CTkFont(size=12, weight="bold"),
+            text_color="#4cc9f0"
+        )
+        lbl_valor.pack(side="right", padx=10, pady=8)
         
-        # 4. Status do Backup (REAL)
-        try:
-            backup_status, backup_info = self.get_backup_status()
-            stats.append({
-                "icon": "☁️", 
-                "label": "Backup", 
-                "value": backup_info
-            })
-        except:
-            stats.append({
-                "icon": "❓", 
-                "label": "Backup", 
-                "value": "Erro ao verificar"
-            })
+        return {"frame": frame, "titulo": lbl_titulo, "valor": lbl_valor}
+    
+    def _atualizar_linha_stat(self, linha, dados):
+        icon, label, value = dados
+        anterior = linha["dados"]
+        if anterior is None or anterior[:2] != (icon, label):
+            linha["titulo"].configure(text=f"{icon} {label}")
+        if anterior is None or anterior[2] != value:
+            linha["valor"].configure(text=value)
+    
+    def load_real_stats(self, contexto):
+        """Estatísticas do card de resumo (já calculadas no contexto do tick)"""
+        return contexto.estatisticas
+    
+    def update_alerts(self, contexto):
+        """Atualiza alertas e ações recomendadas, reaproveitando os cards já criados"""
+        # Coleta alertas baseado no score (já calculado neste tick)
+        score, _, _ = contexto.saude
         
-        # 5. Uso de Memória (ADICIONAL)
-        try:
-            memory = psutil.virtual_memory()
-            stats.append({
-                "icon": "🧠", 
-                "label": "Memória RAM", 
-                "value": f"{memory.percent}% usado"
-            })
-        except:
-            stats.append({
-                "icon": "❓", 
-                "label": "Memória RAM", 
-                "value": "Erro ao capturar"
-            })
+        itens = []
+        if score < 70:
+            # Botão de ação rápida sempre no topo
+            itens.append(("manutencao_completa", None))
         
-        # 6. CPU (ADICIONAL)
-        try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            stats.append({
-                "icon": "⚡", 
-                "label": "CPU", 
-                "value": f"{cpu_percent:.1f}% uso"
-            })
-        except:
-            stats.append({
-                "icon": "❓", 
-                "label": "CPU", 
-                "value": "Erro ao capturar"
-            })
+        # Alertas específicos baseados em dados reais
+        itens.extend((alerta[0], alerta) for alerta in contexto.alertas)
         
-        return stats
+        self._reconciliar(self.alert_rows, itens, self._criar_alerta, self._atualizar_alerta)
     
-    def update_alerts(self):
-        """Atualiza alertas e ações recomendadas - MELHORADO"""
-        # Limpa alertas anteriores
-        for widget in self.container_alerts.winfo_children():
-            widget.destroy()
-        
-        # Coleta alertas baseado no score
-        score, _, _ = self.calculate_health_score()
-        
-        if score < 70:
-            # Mostra botão de ação rápida
+    def _criar_alerta(self, dados):
+        if dados is None:
             btn_action = ctk.CTkButton(
                 self.container_alerts,
                 text="🚀 Executar Manutenção Completa",
@@ -691,91 +525,66 @@ class FrameDashboard(ctk.CTkFrame):
                 command=self.run_quick_maintenance
             )
             btn_action.pack(fill="x", pady=5)
-        
-        # Alertas específicos baseados em dados reais
-        self._add_specific_alerts()
+            return {"frame": btn_action}
+        return self.create_alert_card()
     
-    def _add_specific_alerts(self):
-        """Adiciona alertas específicos baseados em dados reais"""
-        
-        # Alerta de Backup
-        backup_status, backup_info = self.get_backup_status()
-        if backup_status in ["critical", "error"]:
-            self.create_alert_card(
-                "☁️ Backup Pendente",
-                f"Status: {backup_info}. Proteja seus dados agora!",
-                "Criar Backup",
-                self.open_backup_tab
-            )
-        
-        # Alerta de Espaço em Disco
-        try:
-            disk_percent, _, _ = self.get_disk_usage()
-            if disk_percent > 85:
-                self.create_alert_card(
-                    "💾 Espaço em Disco Baixo",
-                    f"Seu disco está {disk_percent:.0f}% cheio. Libere espaço.",
-                    "Limpar Agora",
-                    self.open_maintenance_tab
-                )
-        except:
-            pass
-        
-        # Alerta de Arquivos Temporários
-        try:
-            temp_size_gb, temp_count = self.get_temp_files_info()
-            if temp_size_gb > 2:
-                self.create_alert_card(
-                    "🗑️ Muitos Arquivos Temp",
-                    f"{temp_count:,} arquivos temporários ocupando {temp_size_gb:.1f}GB.",
-                    "Limpar Temp",
-                    self.open_maintenance_tab
-                )
-        except:
-            pass
-        
-        # Alerta de Licença
-        license_status = self.get_license_status()
-        if license_status in ["expired", "invalid"]:
-            self.create_alert_card(
-                "🔑 Licença Expirada",
-                "Sua licença expirou. Ative para continuar usando.",
-                "Ativar Agora",
-                self.open_license_tab
-            )
+    def _atualizar_alerta(self, linha, dados):
+        if dados is None:
+            return
+        acoes = {
+            "backup": self.open_backup_tab,
+            "manutencao": self.open_maintenance_tab,
+            "licenca": self.open_license_tab,
+        }
+        titulo, descricao, texto_botao, acao = dados
+        anterior = linha["dados"] or (None, None, None, None)
+        if anterior[0] != titulo:
+            linha["titulo"].configure(text=titulo)
+        if anterior[1] != descricao:
+            linha["descricao"].configure(text=descricao)
+        if anterior[2:] != (texto_botao, acao):
+            linha["botao"].configure(text=texto_botao, command=acoes[acao])
     
-    def create_alert_card(self, title, description, btn_text, btn_action):
-        """Cria um card de alerta com botão de ação"""
+    def create_alert_card(self):
+        """Cria um card de alerta vazio (título, descrição e botão de ação)"""
         frame = ctk.CTkFrame(self.container_alerts, fg_color="#2b2b2b", corner_radius=10)
         frame.pack(fill="x", pady=5)
         
         # Grid para layout
         frame.grid_columnconfigure(0, weight=1)
         
-        ctk.CTkLabel(
+        lbl_titulo = ctk.CTkLabel(
             frame,
-            text=title,
+            text="",
             font=ctk.CTkFont(size=13, weight="bold"),
             anchor="w"
-        ).grid(row=0, column=0, sticky="w", padx=15, pady=(10, 2))
+        )
+        lbl_titulo.grid(row=0, column=0, sticky="w", padx=15, pady=(10, 2))
         
-        ctk.CTkLabel(
+        lbl_descricao = ctk.CTkLabel(
             frame,
-            text=description,
+            text="",
             font=ctk.CTkFont(size=11),
             text_color="gray",
             anchor="w",
             wraplength=600
-        ).grid(row=1, column=0, sticky="w", padx=15, pady=(0, 10))
+        )
+        lbl_descricao.grid(row=1, column=0, sticky="w", padx=15, pady=(0, 10))
         
-        ctk.CTkButton(
+        btn = ctk.CTkButton(
             frame,
-            text=btn_text,
+            text="",
             width=150,
-            height=30,
-            command=btn_action
-        ).grid(row=0, column=1, rowspan=2, padx=15, pady=10)
+            height=30
+        )
+        btn.grid(row=0, column=1, rowspan=2, padx=15, pady=10)
+        
+        return {"frame": frame, "titulo": lbl_titulo, "descricao": lbl_descricao, "botao": btn}
     
+    def _ao_destruir(self, event):
+        if event.widget is self:
+            self.coletor.parar()
+
     def run_quick_maintenance(self):
         """Executa manutenção rápida - INTEGRADO"""
         if self.master_app:
@@ -1,12 +1,15 @@
 import customtkinter as ctk
 import threading
 from src.modules.maintenance import SystemCleaner, NetworkTools
+from src.utils.task_queue import TaskQueue, OperacaoCancelada
 from src.ui.components.tooltip import add_tooltip
 from src.ui.components.unified_console import UnifiedConsole
 
 class FrameManutencao(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="transparent")
+        self.task_queue = TaskQueue()
+        self.tarefa_limpeza_id = None
         
         # Layout: Grid 2 linhas (conteúdo + console)
         self.grid_rowconfigure(0, weight=1)
@@ -43,7 +46,12 @@ class FrameManutencao(ctk.CTkFrame):
         self.btn_limpar = ctk.CTkButton(self.frame_clean, text="🗑️ EXECUTAR LIMPEZA", 
                                         fg_color="#e63946", hover_color="#d62828",
                                         command=self.iniciar_limpeza_thread)
-        self.btn_limpar.pack(pady=20)
+        self.btn_limpar.pack(pady=(20, 5))
+
+        self.btn_cancelar_limpeza = ctk.CTkButton(self.frame_clean, text="⏹️ Cancelar", width=100,
+                                                  fg_color="gray30", state="disabled",
+                                                  command=self.cancelar_limpeza)
+        self.btn_cancelar_limpeza.pack(pady=(0, 20))
         
         # Adicionar tooltips
         add_tooltip(self.btn_limpar, "btn_limpar_temp")
@@ -71,21 +79,37 @@ class FrameManutencao(ctk.CTkFrame):
     # --- Funções de Controle ---
     
     def iniciar_limpeza_thread(self):
-        """Roda em thread separada para não travar a tela"""
-        threading.Thread(target=self._executar_limpeza).start()
-
-    def _executar_limpeza(self):
+        """Roda na fila de tarefas para não travar a tela (e poder ser cancelada)"""
         self.btn_limpar.configure(state="disabled")
+        self.btn_cancelar_limpeza.configure(state="normal")
+        self.tarefa_limpeza_id = self.task_queue.submit_task(
+            self._executar_limpeza, cancelavel=True, task_name="Limpeza de Disco"
+        )
+
+    def cancelar_limpeza(self):
+        if self.tarefa_limpeza_id is not None and self.task_queue.cancel_task(self.tarefa_limpeza_id):
+            self.console.log("Cancelando limpeza...", "warning")
+
+    def _executar_limpeza(self, cancelamento=None):
         cleaner = SystemCleaner(logger_callback=self.console.log)
         
-        if self.chk_temp.get():
-            cleaner.limpar_temporarios()
-        
-        if self.chk_dns.get():
-            cleaner.limpar_dns()
+        try:
+            if self.chk_temp.get():
+                cleaner.limpar_temporarios(cancelamento)
             
-        self.console.log("--- Processo Finalizado ---", "info")
-        self.btn_limpar.configure(state="normal")
+            if self.chk_dns.get():
+                if cancelamento:
+                    cancelamento.verificar()
+                cleaner.limpar_dns()
+                
+            self.console.log("--- Processo Finalizado ---", "info")
+        except OperacaoCancelada:
+            self.console.log("--- Processo Cancelado ---", "warning")
+            raise
+        finally:
+            self.tarefa_limpeza_id = None
+            self.btn_limpar.configure(state="normal")
+            self.btn_cancelar_limpeza.configure(state="disabled")
 
     def iniciar_ping_thread(self):
         threading.Thread(target=self._executar_ping).start()
@@ -2,12 +2,15 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import threading
 from src.modules.cloud import DriveManager
+from src.utils.task_queue import TaskQueue
 from src.ui.components.tooltip import add_tooltip
 from src.ui.components.unified_console import UnifiedConsole
 
 class FrameNuvem(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="transparent")
+        self.task_queue = TaskQueue()
+        self.tarefa_backup_id = None
 
         # Layout: Grid 2 linhas (conteúdo + console)
         self.grid_rowconfigure(0, weight=1)
@@ -105,8 +108,13 @@ class FrameNuvem(ctk.CTkFrame):
         self.btn_upload = ctk.CTkButton(tab, text="☁️ INICIAR UPLOAD", height=50, 
                                         font=("Arial", 16, "bold"),
                                         command=self.acao_upload)
-        self.btn_upload.pack(pady=30)
+        self.btn_upload.pack(pady=(30, 5))
         add_tooltip(self.btn_upload, "btn_upload")
+
+        self.btn_cancelar_upload = ctk.CTkButton(tab, text="⏹️ Cancelar", width=100, fg_color="gray30",
+                                                 state="disabled", command=self.acao_cancelar_upload)
+        self.btn_cancelar_upload.pack()
+        add_tooltip(self.btn_cancelar_upload, "Interrompe o backup. O próximo backup da mesma pasta continua de onde parou.")
         
         self.pasta_selecionada = None
 
@@ -125,10 +133,19 @@ class FrameNuvem(ctk.CTkFrame):
 
         # Desabilita botão
         self.btn_upload.configure(state="disabled", text="Enviando...")
+        self.btn_cancelar_upload.configure(state="normal")
         
-        def task():
-            self.drive.fazer_backup_pasta(self.pasta_selecionada, nome_destino)
-            # Reabilita botão
-            self.btn_upload.configure(state="normal", text="☁️ INICIAR UPLOAD")
-
-        threading.Thread(target=task).start()
\ No newline at end of file
+        def task(cancelamento):
+            try:
+                self.drive.fazer_backup_pasta(self.pasta_selecionada, nome_destino, cancelamento)
+            finally:
+                # Reabilita botão
+                self.tarefa_backup_id = None
+                self.btn_upload.configure(state="normal", text="☁️ INICIAR UPLOAD")
+                self.btn_cancelar_upload.configure(state="disabled")
+
+        self.tarefa_backup_id = self.task_queue.submit_task(task, cancelavel=True, task_name=f"Backup de {nome_destino}")
+
+    def acao_cancelar_upload(self):
+        if self.tarefa_backup_id is not None and self.task_queue.cancel_task(self.tarefa_backup_id):
+            self.console.log("Cancelando backup...", "warning")
\ No newline at end of file
@@ -1,14 +1,21 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
+import inspect
 import threading
 from src.modules.security import SecurityTools
+from src.utils.compressao_cofre import PRESETS_COFRE
+from src.utils.task_queue import TaskQueue, OperacaoCancelada
+from src.utils.config import resource_path
+from src.utils import descriptografar_arquivo
 from src.ui.components.tooltip import add_tooltip
 from src.ui.components.unified_console import UnifiedConsole
 
 class FrameSeguranca(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="transparent")
+        self.task_queue = TaskQueue()
+        self.tarefa_cofre_id = None
 
         # Layout: Grid 2 linhas (conteúdo + console)
         self.grid_rowconfigure(0, weight=1)
@@ -77,6 +84,12 @@ class FrameSeguranca(ctk.CTkFrame):
         btn_decrypt.grid(row=0, column=1, padx=10)
         add_tooltip(btn_decrypt, "btn_descriptografar")
 
+        btn_encrypt_lote = ctk.CTkButton(frame_btns, text="🗂️ CRIPTOGRAFAR VÁRIOS", fg_color="#7209b7",
+                      command=self.acao_encrypt_lote)
+        btn_encrypt_lote.grid(row=0, column=2, padx=10)
+        add_tooltip(btn_encrypt_lote, "Escolhe vários arquivos e tranca todos com a senha acima. "
+                                      "Muito mais rápido para muitos arquivos; cada .enc continua abrindo sozinho.")
+
         self.arquivo_alvo = None
 
     def acao_select_file(self):
@@ -92,6 +105,32 @@ class FrameSeguranca(ctk.CTkFrame):
     def acao_decrypt(self):
         self._executar_crypto(modo="decrypt")
 
+    def acao_encrypt_lote(self):
+        senha = self.entry_senha_file.get()
+        if not senha:
+            messagebox.showwarning("Atenção", "Digite uma senha antes de escolher os arquivos.")
+            return
+        arquivos = filedialog.askopenfilenames()
+        if not arquivos:
+            return
+
+        tool = SecurityTools(logger_callback=self.console.log)
+        apagar = (self.switch_delete.get() == 1)
+
+        def task():
+            try:
+                self.console.log(f"🔒 Criptografando {len(arquivos)} arquivo(s)", "process")
+                falhas = tool.criptografar_lote(list(arquivos), senha, apagar)
+                if falhas:
+                    self.console.log(f"❌ {len(falhas)} arquivo(s) não foram criptografados", "error")
+                else:
+                    self.console.log("✅ Criptografia concluída com sucesso!", "success")
+            except Exception as e:
+                self.console.log(f"❌ ERRO: {str(e)}", "error")
+                messagebox.showerror("Erro", f"Ocorreu um erro: {str(e)}")
+
+        threading.Thread(target=task).start()
+
     def _executar_crypto(self, modo):
         senha = self.entry_senha_file.get()
         if not self.arquivo_alvo or not senha:
@@ -143,10 +182,23 @@ class FrameSeguranca(ctk.CTkFrame):
         self.entry_senha_folder = ctk.CTkEntry(tab, show="*", width=300)
         self.entry_senha_folder.pack()
 
+        ctk.CTkLabel(tab, text="Compressão:").pack(pady=(15, 5))
+        self.presets_cofre = {p.rotulo: nome for nome, p in PRESETS_COFRE.items()}
+        self.seg_preset_cofre = ctk.CTkSegmentedButton(tab, values=list(self.presets_cofre))
+        self.seg_preset_cofre.set(PRESETS_COFRE["equilibrado"].rotulo)
+        self.seg_preset_cofre.pack()
+        add_tooltip(self.seg_preset_cofre, "Rápido: compressão leve. Equilibrado: padrão. Máximo: LZMA, mais lento. "
+                                           "Fotos, vídeos e arquivos já compactados são guardados sem compressão.")
+
         btn_create_cofre = ctk.CTkButton(tab, text="📦 CRIAR COFRE AGORA", height=50, font=("Arial", 16, "bold"),
                       command=self.acao_zip_folder)
-        btn_create_cofre.pack(pady=30)
+        btn_create_cofre.pack(pady=(30, 5))
         add_tooltip(btn_create_cofre, "btn_criar_cofre")
+
+        btn_cancel_cofre = ctk.CTkButton(tab, text="⏹️ Cancelar", width=100, fg_color="gray30",
+                                         command=self.acao_cancelar_cofre)
+        btn_cancel_cofre.pack()
+        add_tooltip(btn_cancel_cofre, "Interrompe a criação. Ao criar de novo com a mesma senha, só os arquivos que faltam são adicionados.")
         
         self.pasta_alvo = None
 
@@ -164,21 +216,28 @@ class FrameSeguranca(ctk.CTkFrame):
             return
         
         tool = SecurityTools(logger_callback=self.console.log)
+        preset = self.presets_cofre[self.seg_preset_cofre.get()]
         
-        def task():
+        def task(cancelamento):
             try:
                 self.console.log(f"📦 Criando cofre para: {self.pasta_alvo}", "process")
-                result = tool.criar_pasta_cofre(self.pasta_alvo, senha)
+                result = tool.criar_pasta_cofre(self.pasta_alvo, senha, cancelamento, preset)
                 if result:
                     self.console.log("✅ Cofre criado com sucesso!", "success")
                     messagebox.showinfo("Sucesso", f"Cofre criado: {self.pasta_alvo}_COFRE.zip")
                 else:
                     self.console.log("❌ Erro ao criar cofre", "error")
+            except OperacaoCancelada:
+                raise
             except Exception as e:
                 self.console.log(f"❌ ERRO: {str(e)}", "error")
                 messagebox.showerror("Erro", f"Ocorreu um erro: {str(e)}")
         
-        threading.Thread(target=task).start()
+        self.tarefa_cofre_id = self.task_queue.submit_task(task, cancelavel=True, task_name="Criar Cofre")
+
+    def acao_cancelar_cofre(self):
+        if self.tarefa_cofre_id is not None and self.task_queue.cancel_task(self.tarefa_cofre_id):
+            self.console.log("Cancelando criação do cofre...", "warning")
 
     # ==========================
     # ABA 3: COMPARTILHAR
@@ -254,75 +313,10 @@ class FrameSeguranca(ctk.CTkFrame):
                 
                 shutil.copy(self.arquivo_enc_selecionado, pasta_temp)
                 
-                # SCRIPT PYTHON EMBUTIDO - MODIFICADO PARA SEGURANÇA
-                script_py = '''#!/usr/bin/env python
-# -*- coding: utf-8 -*-
-import os, sys, base64, getpass
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-
-def gerar_chave(senha, salt):
-    """Gera uma chave de criptografia a partir da senha e do salt."""
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100_000
-    )
-    return Fernet(base64.urlsafe_b64encode(kdf.derive(senha.encode('utf-8'))))
-
-def main():
-    """Função principal para descriptografar o arquivo."""
-    try:
-        # Pega o nome do arquivo do argumento da linha de comando
-        if len(sys.argv) > 1:
-            arquivo_enc = sys.argv[1]
-        else:
-            # Se nenhum argumento for passado, procura por um arquivo .enc no diretório
-            arquivos_enc = [f for f in os.listdir('.') if f.endswith('.enc')]
-            if not arquivos_enc:
-                print("\\n[!] Nenhum arquivo .enc encontrado no diretório.")
-                input("Pressione Enter para sair...")
-                return
-            arquivo_enc = arquivos_enc[0]
-        
-        print(f"Arquivo a ser descriptografado: {arquivo_enc}")
-        if not os.path.exists(arquivo_enc):
-            print(f"\\n[!] ERRO: Arquivo '{arquivo_enc}' não encontrado!")
-            input("Pressione Enter para sair...")
-            return
-
-        # Pede a senha de forma segura
-        senha = getpass.getpass("Digite a senha de descriptografia: ")
-        
-        with open(arquivo_enc, "rb") as f:
-            conteudo = f.read()
-        
-        salt = conteudo[:16]
-        dados_criptografados = conteudo[16:]
-        
-        fernet = gerar_chave(senha, salt)
-        dados_originais = fernet.decrypt(dados_criptografados)
-        
-        nome_original = arquivo_enc.rsplit('.enc', 1)[0]
-        with open(nome_original, "wb") as f:
-            f.write(dados_originais)
-            
-        print(f"\\n[SUCCESS] Arquivo '{nome_original}' descriptografado com sucesso!")
-        
-    except Exception as e:
-        print(f"\\n[!] ERRO: Falha ao descriptografar. Verifique a senha ou a integridade do arquivo.")
-        # print(f"Detalhes do erro: {e}") # Descomente para depuração
-        
-    finally:
-        input("Pressione Enter para sair...")
-
-if __name__ == "__main__":
-    main()
-'''
+                # Mesmo descriptografador standalone do criar_pacote_compartilhamento
+                # (todas as versões do .enc, em blocos, vários arquivos de uma vez)
                 with open(os.path.join(pasta_temp, "descriptografar.py"), "w", encoding="utf-8") as f:
-                    f.write(script_py)
+                    f.write(self._codigo_descriptografador())
                 
                 # BATCH SCRIPT - MODIFICADO PARA NÃO INCLUIR A SENHA
                 batch = f"""@echo off
@@ -372,3 +366,22 @@ Arquivo a ser restaurado: {os.path.basename(self.arquivo_enc_selecionado).replac
                 messagebox.showerror("Erro", str(e))
         
         threading.Thread(target=task).start()
+
+    def _codigo_descriptografador(self):
+        """
+        Código do descriptografador standalone que vai no pacote.
+
+        No executável do PyInstaller os .py não existem em disco: o script só
+        está lá se o build o incluiu como dado (--add-data, ver VERSION.md).
+        Rodando do código-fonte, vem do próprio módulo, qualquer que seja a
+        pasta atual.
+        """
+        caminho = resource_path(os.path.join("src", "utils", "descriptografar_arquivo.py"))
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                return f.read()
+        try:
+            return inspect.getsource(descriptografar_arquivo)
+        except (OSError, TypeError):
+            raise FileNotFoundError("O descriptografador não foi incluído neste executável. "
+                                    "Gere o build com --add-data (veja VERSION.md).")
@@ -1,10 +1,14 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
+import time
+from array import array
+from bisect import bisect_right
 from src.modules.system_tools import SystemTools
-from src.utils.task_queue import TaskQueue
+from src.utils.task_queue import TaskQueue, OperacaoCancelada
 from src.ui.components.tooltip import add_tooltip
 from src.ui.components.unified_console import UnifiedConsole
+from src.ui.components.virtual_list import VirtualList
 
 class FrameSistema(ctk.CTkFrame):
     def __init__(self, parent):
@@ -71,21 +75,41 @@ class FrameSistema(ctk.CTkFrame):
         
         btn_run = ctk.CTkButton(top_frame, text="🔍 Iniciar Busca", fg_color="green", command=self._acao_localizar_duplicados)
         btn_run.grid(row=1, column=2, sticky="e")
+
+        btn_export = ctk.CTkButton(top_frame, text="📄 Exportar", width=100, command=self._acao_exportar_duplicados)
+        btn_export.grid(row=1, column=3, sticky="e", padx=(10,0))
+        add_tooltip(btn_export, "Busca e grava os grupos direto em CSV ou JSONL, sem carregar tudo na tela.")
+
+        btn_stop = ctk.CTkButton(top_frame, text="⏹️ Parar", width=80, fg_color="gray30", command=self._acao_parar_dedupe)
+        btn_stop.grid(row=1, column=4, sticky="e", padx=(10,0))
+        add_tooltip(btn_stop, "Interrompe a busca. O progresso é salvo e a próxima busca na mesma pasta continua dali.")
+
+        self.switch_similares = ctk.CTkSwitch(top_frame, text="🖼️ Imagens semelhantes")
+        self.switch_similares.grid(row=0, column=1, columnspan=3, sticky="e")
+        add_tooltip(self.switch_similares, "Encontra a mesma foto salva em outro tamanho ou qualidade (hash perceptual).")
         
         self.diretorio_dedupe = None
-        self.checkboxes_duplicados = [] # Lista para guardar as checkboxes
-        self.grupos_duplicados = {} # Dicionário para guardar os grupos de checkboxes
+        self.busca_dedupe_id = 0 # Identifica a busca atual (lotes de buscas antigas são descartados)
+        self.tarefa_dedupe_id = None # ID na TaskQueue da busca/exportação em andamento (para cancelar)
+        self.dedupe_similares = False # Resultados atuais são de imagens semelhantes (não idênticas)
+        self._limpar_dados_dedupe()
 
         # --- Frame de Resultados (Interativo) ---
+        frame.grid_rowconfigure(1, weight=1)
         results_frame = ctk.CTkFrame(frame)
         results_frame.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=20, pady=10)
         results_frame.grid_rowconfigure(0, weight=1)
         results_frame.grid_columnconfigure(0, weight=1)
         
         ctk.CTkLabel(results_frame, text="Resultados:", font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=10, pady=(5,0))
+
+        self.lbl_dedupe_status = ctk.CTkLabel(results_frame, text="Nenhum resultado para exibir.", text_color="gray")
+        self.lbl_dedupe_status.pack(anchor="w", padx=10)
         
-        self.scroll_frame_dedupe = ctk.CTkScrollableFrame(results_frame, label_text="Nenhum resultado para exibir.")
-        self.scroll_frame_dedupe.pack(fill="both", expand=True, padx=5, pady=5)
+        # Lista virtualizada: só as linhas visíveis têm widgets
+        self.lista_dedupe = VirtualList(results_frame, obter_linha=self._linha_dedupe,
+                                        ao_alternar=self._alternar_item_dedupe, height=300)
+        self.lista_dedupe.pack(fill="both", expand=True, padx=5, pady=5)
         
         # --- Frame de Ações (Baixo) ---
         bottom_frame = ctk.CTkFrame(frame, fg_color="transparent")
@@ -102,6 +126,13 @@ class FrameSistema(ctk.CTkFrame):
         self.btn_delete_selected = ctk.CTkButton(bottom_frame, text="🗑️ Deletar Selecionados", fg_color="#D32F2F", hover_color="#B71C1C", command=self._acao_deletar_duplicados, state="disabled")
         self.btn_delete_selected.pack(side="right")
 
+        self.btn_link_selected = ctk.CTkButton(bottom_frame, text="🔗 Substituir por Links", command=self._acao_vincular_duplicados, state="disabled")
+        self.btn_link_selected.pack(side="right", padx=(0, 10))
+        add_tooltip(self.btn_link_selected, "Troca os selecionados por links para o arquivo mantido no grupo.\nLibera o espaço sem apagar nada e pode ser desfeito.")
+
+        btn_undo_links = ctk.CTkButton(bottom_frame, text="↩️ Desfazer Links", width=120, fg_color="gray30", command=self._acao_desfazer_vinculos)
+        btn_undo_links.pack(side="right", padx=(0, 10))
+
 
     def _acao_selecionar_diretorio_dedupe(self):
         diretorio = filedialog.askdirectory(title="Selecione a Pasta para Buscar Duplicados")
@@ -118,71 +149,215 @@ class FrameSistema(ctk.CTkFrame):
             messagebox.showerror("Erro", "Selecione o diretório primeiro.")
             return
 
+        similares = self.switch_similares.get() == 1
+        retomar = True
+        if not similares and self.system_tool.busca_pendente(self.diretorio_dedupe):
+            resposta = messagebox.askyesnocancel(
+                "Busca Interrompida",
+                "Há uma busca anterior interrompida nesta pasta.\n\n"
+                "Sim: retomar de onde parou. Os grupos já encontrados são conferidos de novo e "
+                "arquivos alterados desde então saem deles; arquivos criados depois podem ficar de fora.\n"
+                "Não: fazer uma busca nova, varrendo a pasta inteira (mais lento, resultado completo).")
+            if resposta is None:
+                return
+            retomar = resposta
+
         # Limpa resultados anteriores
-        for widget in self.scroll_frame_dedupe.winfo_children():
-            widget.destroy()
-        self.scroll_frame_dedupe.configure(label_text="Buscando duplicados... Aguarde.")
-        self.checkboxes_duplicados = []
-        self.grupos_duplicados = {}
+        self._limpar_dados_dedupe()
+        self.dedupe_similares = similares
+        self.lista_dedupe.set_total(0)
+        self.lbl_dedupe_status.configure(text="Buscando duplicados... Aguarde.")
         self.btn_delete_selected.configure(state="disabled")
+        self.btn_link_selected.configure(state="disabled")
         self.check_var_todos.set("off")
         self.check_var_inteligente.set("off")
+        self.busca_dedupe_id += 1
+        self._acao_parar_dedupe()  # Uma busca nova substitui a anterior
         
         self.console.log("Iniciando busca de arquivos duplicados...", "process")
         task_name = f"Buscar Duplicados em {os.path.basename(self.diretorio_dedupe)}"
-        self.task_queue.submit_task(
+        self.tarefa_dedupe_id = self.task_queue.submit_task(
             self._run_localizar_duplicados,
             self.diretorio_dedupe,
+            self.busca_dedupe_id,
+            self.dedupe_similares,
+            retomar=retomar,
+            cancelavel=True,
             task_name=task_name
         )
 
-    def _run_localizar_duplicados(self, diretorio):
-        """Função wrapper para rodar a busca e atualizar a UI (via after)"""
-        duplicados = self.system_tool.localizar_duplicados(diretorio)
-        self.after(0, self._update_dedupe_results, duplicados)
-        return f"Busca concluída. {len(duplicados)} grupos encontrados."
+    def _acao_parar_dedupe(self):
+        if self.tarefa_dedupe_id is not None and self.task_queue.cancel_task(self.tarefa_dedupe_id):
+            self.console.log("Cancelando operação...", "warning")
+        self.tarefa_dedupe_id = None
 
-    def _update_dedupe_results(self, duplicados):
-        # Limpa o frame
-        for widget in self.scroll_frame_dedupe.winfo_children():
-            widget.destroy()
-            
-        if not duplicados:
-            self.scroll_frame_dedupe.configure(label_text="✅ Nenhum arquivo duplicado encontrado.")
+    def _run_localizar_duplicados(self, diretorio, busca_id, similares=False, tamanho_lote=50, intervalo=0.5,
+                                  retomar=True, cancelamento=None):
+        """
+        Consome os grupos em fluxo e envia para a UI em lotes (via after),
+        para que o usuário comece a revisar antes da busca terminar.
+        """
+        lote = []
+        total = 0
+        ultimo_envio = time.monotonic()
+
+        try:
+            if similares:
+                # Grupos de semelhantes podem crescer ou se juntar: uma chave repetida substitui o grupo
+                grupos = self.system_tool.iterar_imagens_similares(diretorio, cancelamento=cancelamento)
+            else:
+                grupos = self.system_tool.iterar_duplicados(diretorio, cancelamento, retomar)
+
+            for grupo in grupos:
+                lote.append(grupo)
+                total += 1
+                if len(lote) >= tamanho_lote or time.monotonic() - ultimo_envio >= intervalo:
+                    self.after(0, self._append_dedupe_results, busca_id, lote)
+                    lote = []
+                    ultimo_envio = time.monotonic()
+        except OperacaoCancelada:
+            # Mostra o que já foi encontrado; o restante fica no checkpoint
+            self.after(0, self._append_dedupe_results, busca_id, lote)
+            self.after(0, self._finalizar_dedupe_results, busca_id, True)
+            raise
+
+        self.after(0, self._append_dedupe_results, busca_id, lote)
+        self.after(0, self._finalizar_dedupe_results, busca_id)
+        return f"Busca concluída. {total} grupos encontrados."
+
+    # --- Dados da lista de duplicados (compactos, sem um widget por arquivo) ---
+    def _limpar_dados_dedupe(self):
+        self.dedupe_caminhos = []                 # Todos os caminhos, grupo após grupo
+        self.dedupe_inicio_grupos = array('L')    # Índice do 1º caminho de cada grupo
+        self.dedupe_linhas_cabecalho = array('L') # Linha (na lista) do cabeçalho de cada grupo
+        self.dedupe_selecao = bytearray()         # 1 = marcado para deleção
+        self.dedupe_chaves = {}                   # Chave (hash) -> índice do grupo
+
+    def _fim_grupo(self, g):
+        if g + 1 < len(self.dedupe_inicio_grupos):
+            return self.dedupe_inicio_grupos[g + 1]
+        return len(self.dedupe_caminhos)
+
+    def _linha_dedupe(self, linha):
+        """Converte uma linha da lista em cabeçalho de grupo ou caminho (busca binária)."""
+        g = bisect_right(self.dedupe_linhas_cabecalho, linha) - 1
+        cabecalho = self.dedupe_linhas_cabecalho[g]
+        inicio = self.dedupe_inicio_grupos[g]
+        if linha == cabecalho:
+            return "cabecalho", f"Grupo {g+1} ({self._fim_grupo(g) - inicio} arquivos)", False
+        idx = inicio + (linha - cabecalho - 1)
+        return "item", self.dedupe_caminhos[idx], bool(self.dedupe_selecao[idx])
+
+    def _alternar_item_dedupe(self, linha):
+        g = bisect_right(self.dedupe_linhas_cabecalho, linha) - 1
+        idx = self.dedupe_inicio_grupos[g] + (linha - self.dedupe_linhas_cabecalho[g] - 1)
+        self.dedupe_selecao[idx] ^= 1
+
+    def _append_dedupe_results(self, busca_id, lote):
+        """Adiciona um lote de grupos ao final da lista de resultados."""
+        if busca_id != self.busca_dedupe_id or not lote:
+            return
+
+        # Semelhantes: chave já mostrada (ou lista vazia) atualiza/remove o grupo -> remonta a lista
+        if any(not paths or hash_val in self.dedupe_chaves for hash_val, paths in lote):
+            grupos = {chave: self._grupo_dedupe(g) for chave, g in self.dedupe_chaves.items()}
+            for hash_val, paths in lote:
+                if paths:
+                    grupos[hash_val] = [(p, 0) for p in sorted(paths)]
+                else:
+                    grupos.pop(hash_val, None)
+            self._remontar_dedupe(grupos)
+            return
+
+        if not self.dedupe_inicio_grupos:
+            self.lbl_dedupe_status.configure(text="")
+            self.btn_delete_selected.configure(state="normal")
+            self.btn_link_selected.configure(state="normal")
+
+        for hash_val, paths in lote:
+            self._adicionar_grupo_dedupe(hash_val, [(p, 0) for p in sorted(paths)])
+
+        self._atualizar_total_dedupe()
+
+    def _grupo_dedupe(self, g):
+        """[(caminho, marcado)] do grupo g."""
+        return [(self.dedupe_caminhos[i], self.dedupe_selecao[i])
+                for i in range(self.dedupe_inicio_grupos[g], self._fim_grupo(g))]
+
+    def _adicionar_grupo_dedupe(self, chave, itens):
+        g = len(self.dedupe_inicio_grupos)
+        self.dedupe_chaves[chave] = g
+        self.dedupe_linhas_cabecalho.append(len(self.dedupe_caminhos) + g)
+        self.dedupe_inicio_grupos.append(len(self.dedupe_caminhos))
+        self.dedupe_caminhos.extend(path for path, _ in itens)
+        self.dedupe_selecao.extend(marcado for _, marcado in itens)
+
+    def _remontar_dedupe(self, grupos):
+        """Refaz a lista a partir de {chave: [(caminho, marcado)]}, na ordem do dicionário."""
+        self._limpar_dados_dedupe()
+        for chave, itens in grupos.items():
+            if len(itens) > 1:
+                self._adicionar_grupo_dedupe(chave, itens)
+        estado = "normal" if self.dedupe_inicio_grupos else "disabled"
+        self.btn_delete_selected.configure(state=estado)
+        self.btn_link_selected.configure(state=estado)
+        self._atualizar_total_dedupe()
+
+    def _atualizar_total_dedupe(self):
+        total_grupos = len(self.dedupe_inicio_grupos)
+        self.lbl_dedupe_status.configure(text=f"{total_grupos} grupos, {len(self.dedupe_caminhos)} arquivos.")
+        self.lista_dedupe.set_total(len(self.dedupe_caminhos) + total_grupos)
+
+    def _finalizar_dedupe_results(self, busca_id, cancelada=False):
+        if busca_id != self.busca_dedupe_id:
+            return
+        if cancelada:
+            self.lbl_dedupe_status.configure(
+                text=f"⏸️ Busca interrompida: {len(self.dedupe_inicio_grupos)} grupos até aqui. Busque de novo para continuar.")
+        elif not self.dedupe_inicio_grupos:
+            self.lbl_dedupe_status.configure(text="✅ Nenhum arquivo duplicado encontrado.")
             self.btn_delete_selected.configure(state="disabled")
+            self.btn_link_selected.configure(state="disabled")
+
+    def _acao_exportar_duplicados(self):
+        if not self.diretorio_dedupe:
+            messagebox.showerror("Erro", "Selecione o diretório primeiro.")
             return
 
-        self.scroll_frame_dedupe.configure(label_text="")
-        self.btn_delete_selected.configure(state="normal")
-        
-        self.checkboxes_duplicados = []
-        self.grupos_duplicados = {}
+        caminho_saida = filedialog.asksaveasfilename(
+            title="Exportar Duplicados",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")]
+        )
+        if not caminho_saida:
+            return
 
-        for i, (hash_val, paths) in enumerate(duplicados.items()):
-            # Frame do grupo
-            group_frame = ctk.CTkFrame(self.scroll_frame_dedupe, border_width=1)
-            group_frame.pack(fill="x", expand=True, padx=5, pady=(5, 10))
-            
-            label_text = f"Grupo {i+1} ({len(paths)} arquivos)"
-            ctk.CTkLabel(group_frame, text=label_text, font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=10, pady=5)
-            
-            # Checkboxes do grupo
-            self.grupos_duplicados[i] = []
-            for path in sorted(paths):
-                check_var = ctk.StringVar(value="off")
-                checkbox = ctk.CTkCheckBox(group_frame, text=path, variable=check_var, onvalue="on", offvalue="off")
-                checkbox.pack(anchor="w", padx=20, pady=2)
-                self.checkboxes_duplicados.append(checkbox)
-                self.grupos_duplicados[i].append(checkbox)
+        diretorio = self.diretorio_dedupe
+        similares = self.switch_similares.get() == 1
+        task_name = f"Exportar {'Semelhantes' if similares else 'Duplicados'} de {os.path.basename(diretorio)}"
+        self.console.log(f"Adicionando à fila: {task_name}", "process")
+
+        def grupos(cancelamento):
+            if similares:
+                # Só os grupos finais: durante a busca eles ainda podem mudar
+                return self.system_tool.localizar_imagens_similares(diretorio, cancelamento=cancelamento).items()
+            return self.system_tool.iterar_duplicados(diretorio, cancelamento)
+
+        self.tarefa_dedupe_id = self.task_queue.submit_task(
+            lambda cancelamento: self.system_tool.exportar_duplicados(grupos(cancelamento), caminho_saida),
+            cancelavel=True,
+            task_name=task_name
+        )
 
     def _selecionar_todos_duplicados(self):
         select_all = self.check_var_todos.get() == "on"
         # Desmarcar a outra opção se esta for marcada
         if select_all:
             self.check_var_inteligente.set("off")
-            
-        for checkbox in self.checkboxes_duplicados:
-            checkbox.select() if select_all else checkbox.deselect()
+
+        valor = b"\x01" if select_all else b"\x00"
+        self.dedupe_selecao[:] = valor * len(self.dedupe_selecao)
+        self.lista_dedupe.refresh()
             
     def _selecionar_inteligente_duplicados(self):
         select_intelligent = self.check_var_inteligente.get() == "on"
@@ -190,18 +365,18 @@ class FrameSistema(ctk.CTkFrame):
         if select_intelligent:
             self.check_var_todos.set("off")
 
-        for grupo in self.grupos_duplicados.values():
-            # Desmarca todos primeiro
-            for cb in grupo:
-                cb.deselect()
-            # Se a opção inteligente está ativa, marca todos exceto o primeiro
-            if select_intelligent:
-                for cb in grupo[1:]: # Deixa o primeiro desmarcado
-                    cb.select()
+        # Desmarca todos primeiro
+        self.dedupe_selecao[:] = bytes(len(self.dedupe_selecao))
+        # Se a opção inteligente está ativa, marca todos exceto o primeiro de cada grupo
+        if select_intelligent:
+            for g, inicio in enumerate(self.dedupe_inicio_grupos):
+                fim = self._fim_grupo(g)
+                self.dedupe_selecao[inicio + 1:fim] = b"\x01" * (fim - inicio - 1)
+        self.lista_dedupe.refresh()
 
     def _acao_deletar_duplicados(self):
         arquivos_para_deletar = [
-            cb.cget("text") for cb in self.checkboxes_duplicados if cb.get() == "on"
+            path for path, marcado in zip(self.dedupe_caminhos, self.dedupe_selecao) if marcado
         ]
         
         if not arquivos_para_deletar:
@@ -209,6 +384,13 @@ class FrameSistema(ctk.CTkFrame):
             return
             
         qtd = len(arquivos_para_deletar)
+        if self.dedupe_similares and not messagebox.askyesno(
+                "Imagens Semelhantes, Não Idênticas",
+                f"Os {qtd} arquivo(s) marcados são imagens SEMELHANTES, não cópias idênticas: podem ter "
+                "resolução, recorte ou edição diferentes do arquivo mantido.\n\n"
+                "Revise cada grupo antes de continuar. Deseja mesmo prosseguir?", icon='warning'):
+            return
+
         msg = f"Você tem certeza que deseja deletar permanentemente {qtd} arquivo(s)?\n\nESTA AÇÃO NÃO PODE SER DESFEITA."
         
         if messagebox.askyesno("Confirmar Deleção", msg, icon='warning'):
@@ -224,6 +406,61 @@ class FrameSistema(ctk.CTkFrame):
             # Limpa e reinicia a busca para atualizar a lista
             self._acao_localizar_duplicados()
 
+    def _acao_vincular_duplicados(self):
+        """Substitui os arquivos marcados por links para o primeiro não marcado do grupo."""
+        pares = []
+        grupos_sem_original = 0
+        for g, inicio in enumerate(self.dedupe_inicio_grupos):
+            fim = self._fim_grupo(g)
+            mantidos = [i for i in range(inicio, fim) if not self.dedupe_selecao[i]]
+            marcados = [i for i in range(inicio, fim) if self.dedupe_selecao[i]]
+            if not marcados:
+                continue
+            if not mantidos:
+                grupos_sem_original += 1
+                continue
+            original = self.dedupe_caminhos[mantidos[0]]
+            pares.extend((original, self.dedupe_caminhos[i]) for i in marcados)
+
+        if grupos_sem_original:
+            messagebox.showwarning("Atenção", f"{grupos_sem_original} grupo(s) com todos os arquivos marcados foram ignorados.\nDeixe pelo menos 1 arquivo desmarcado por grupo.")
+        if not pares:
+            messagebox.showwarning("Nenhum Arquivo", "Nenhum arquivo foi selecionado para vincular.")
+            return
+
+        busca_id = self.busca_dedupe_id
+        task_name = f"Vincular {len(pares)} arquivos duplicados"
+        self.console.log(f"Adicionando à fila: {task_name}", "process")
+
+        def tarefa():
+            substituidos = self.system_tool.vincular_duplicados(pares)
+            # Atualiza a lista localmente, sem refazer a busca
+            self.after(0, self._remover_da_lista_dedupe, busca_id, set(substituidos))
+            return f"{len(substituidos)} arquivos vinculados."
+
+        self.task_queue.submit_task(tarefa, task_name=task_name)
+
+    def _remover_da_lista_dedupe(self, busca_id, caminhos):
+        """Tira da lista os caminhos informados e os grupos que ficarem com menos de 2 arquivos."""
+        if busca_id != self.busca_dedupe_id or not caminhos:
+            return
+
+        self._remontar_dedupe({
+            chave: [(path, marcado) for path, marcado in self._grupo_dedupe(g) if path not in caminhos]
+            for chave, g in self.dedupe_chaves.items()
+        })
+
+    def _acao_desfazer_vinculos(self):
+        operacoes = self.system_tool.listar_operacoes_vinculo()
+        if not operacoes:
+            messagebox.showinfo("Desfazer Links", "Nenhuma operação de vínculo para desfazer.")
+            return
+
+        if messagebox.askyesno("Desfazer Links", f"Desfazer a última vinculação ({operacoes[0]})?\nOs arquivos voltarão a ser cópias independentes."):
+            task_name = f"Desfazer vínculos {operacoes[0]}"
+            self.console.log(f"Adicionando à fila: {task_name}", "process")
+            self.task_queue.submit_task(self.system_tool.desfazer_vinculos, operacoes[0], task_name=task_name)
+
     # ==========================
     # LÓGICA DA ABA RENOMEAR EM LOTE
     # ==========================
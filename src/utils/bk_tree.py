@@ -0,0 +1,64 @@
+from typing import Dict, Iterator, List, Tuple
+
+def distancia_hamming(a: int, b: int) -> int:
+    """Quantidade de bits diferentes entre dois hashes inteiros."""
+    return bin(a ^ b).count("1")
+
+class BKTree:
+    """
+    Árvore BK para busca por distância de Hamming.
+
+    Cada nó guarda um hash e os itens com exatamente esse hash; os filhos são
+    indexados pela distância até o nó. Numa consulta com raio r só são visitados
+    os filhos com distância entre d - r e d + r, então a busca não compara o
+    hash com todos os outros (evita o O(n²) da comparação par a par).
+    """
+
+    def __init__(self):
+        # Nós em listas paralelas: hash, itens e filhos {distância: índice do nó}
+        self._hashes: List[int] = []
+        self._itens: List[list] = []
+        self._filhos: List[Dict[int, int]] = []
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _novo_no(self, valor: int, item) -> int:
+        self._hashes.append(valor)
+        self._itens.append([item])
+        self._filhos.append({})
+        return len(self._hashes) - 1
+
+    def inserir(self, valor: int, item):
+        """Insere um item com o hash informado."""
+        if not self._hashes:
+            self._novo_no(valor, item)
+            return
+
+        no = 0
+        while True:
+            distancia = distancia_hamming(valor, self._hashes[no])
+            if distancia == 0:
+                self._itens[no].append(item)
+                return
+            filho = self._filhos[no].get(distancia)
+            if filho is None:
+                self._filhos[no][distancia] = self._novo_no(valor, item)
+                return
+            no = filho
+
+    def buscar(self, valor: int, raio: int) -> Iterator[Tuple[int, object]]:
+        """Gera (distância, item) para todos os itens a no máximo `raio` bits de `valor`."""
+        if not self._hashes:
+            return
+
+        pilha = [0]
+        while pilha:
+            no = pilha.pop()
+            distancia = distancia_hamming(valor, self._hashes[no])
+            if distancia <= raio:
+                for item in self._itens[no]:
+                    yield distancia, item
+            for d_filho, filho in self._filhos[no].items():
+                if distancia - raio <= d_filho <= distancia + raio:
+                    pilha.append(filho)
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import hashlib
+from typing import List, Optional
+
+CHECKPOINT_DIR = "logs/checkpoints"
+
+class Checkpoint:
+    """
+    Progresso salvo de uma operação longa (busca de duplicados, limpeza, backup, cofre).
+
+    Cada operação é identificada por (nome, chave) — ex.: ("dedupe", pasta) — e
+    grava um JSON em logs/checkpoints/. Se a operação for cancelada ou o programa
+    fechar no meio, a próxima execução com a mesma chave retoma desse estado.
+    Ao terminar com sucesso, a operação chama remover().
+
+    Estados grandes não precisam ser regravados a cada progresso: a operação
+    salva o estado inicial uma vez e registra cada passo concluído com anotar(),
+    que só acrescenta uma linha a um diário ao lado do JSON. Na retomada,
+    anotacoes() devolve esses passos para serem aplicados sobre o estado.
+
+    - intervalo: tempo mínimo (s) entre gravações periódicas de salvar().
+    - intervalo: também é o tempo máximo que uma anotação fica só no buffer.
+    - validade: checkpoints mais antigos que isso (s) são descartados.
+    """
+
+    def __init__(self, nome: str, chave: str, intervalo: float = 30.0,
+                 validade: float = 24 * 3600, pasta: str = CHECKPOINT_DIR):
+        self.nome = nome
+        self.chave = chave
+        self.intervalo = intervalo
+        self.validade = validade
+        resumo = hashlib.sha1(chave.encode('utf-8')).hexdigest()[:16]
+        self.caminho = os.path.join(pasta, f"{nome}-{resumo}.json")
+        self.caminho_diario = os.path.join(pasta, f"{nome}-{resumo}.jsonl")
+        self._ultima_gravacao = time.monotonic()
+        self._diario = None
+        self._ultimo_flush = time.monotonic()
+
+    def carregar(self) -> Optional[dict]:
+        """Retorna o estado salvo, ou None se não houver checkpoint válido."""
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if dados.get("chave") != self.chave or time.time() - dados.get("salvo_em", 0) > self.validade:
+            self.remover()
+            return None
+        return dados.get("estado")
+
+    def existe(self) -> bool:
+        """Se há um checkpoint dentro da validade, sem ler o conteúdo (barato para a interface)."""
+        try:
+            return time.time() - os.path.getmtime(self.caminho) <= self.validade
+        except OSError:
+            return False
+
+    def salvar(self, estado: dict, forcar: bool = False) -> bool:
+        """
+        Grava o estado se já passou `intervalo` desde a última gravação (ou se forcar=True).
+        A escrita é atômica: um checkpoint nunca fica pela metade. Retorna se gravou.
+        """
+        if not forcar and time.monotonic() - self._ultima_gravacao < self.intervalo:
+            return False
+
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        self.fechar()
+        temporario = self.caminho + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({"chave": self.chave, "salvo_em": time.time(), "estado": estado}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+        self._remover_arquivo(self.caminho_diario)  # O estado novo já inclui as anotações
+        self._ultima_gravacao = time.monotonic()
+        return True
+
+    def anotar(self, registro: dict):
+        """
+        Acrescenta um passo concluído ao diário. Cada registro é uma linha
+        inteira, aplicada por completo ou não aplicada; linhas cortadas por
+        uma queda são ignoradas na leitura.
+        """
+        if self._diario is None:
+            os.makedirs(os.path.dirname(self.caminho_diario), exist_ok=True)
+            self._diario = open(self.caminho_diario, 'a', encoding='utf-8')
+        self._diario.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        if time.monotonic() - self._ultimo_flush >= self.intervalo:
+            self._diario.flush()
+            self._ultimo_flush = time.monotonic()
+
+    def anotacoes(self) -> List[dict]:
+        """Registros do diário, na ordem em que foram anotados."""
+        registros = []
+        try:
+            with open(self.caminho_diario, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        registros.append(json.loads(linha))
+                    except ValueError:
+                        break  # Última linha incompleta
+        except OSError:
+            pass
+        return registros
+
+    def fechar(self):
+        """Grava no disco as anotações que ainda estão no buffer."""
+        if self._diario is not None:
+            self._diario.close()
+            self._diario = None
+
+    def remover(self):
+        """Apaga o checkpoint e o diário (operação concluída)."""
+        self.fechar()
+        self._remover_arquivo(self.caminho)
+        self._remover_arquivo(self.caminho_diario)
+
+    @staticmethod
+    def _remover_arquivo(caminho: str):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
@@ -0,0 +1,139 @@
+import os
+import zlib
+import pyzipper
+from typing import List, NamedTuple, Optional
+
+# Formatos que já são comprimidos: comprimir de novo só gasta CPU
+EXTENSOES_COMPRIMIDAS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic", ".heif", ".avif",
+    ".mp4", ".m4v", ".mkv", ".avi", ".mov", ".wmv", ".webm", ".flv",
+    ".mp3", ".m4a", ".aac", ".ogg", ".opus", ".flac", ".wma",
+    ".zip", ".7z", ".rar", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".lz4", ".cab",
+    ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".odp", ".epub", ".jar", ".apk",
+    ".enc",
+}
+TAMANHO_AMOSTRA = 64 * 1024   # Por trecho: arquivos maiores são amostrados no início, no meio e no fim
+LIMITE_EM_MEMORIA = 16 * 1024 * 1024  # Maiores que isso são comprimidos na hora de gravar, em fluxo
+PEDACO_LEITURA = 1024 * 1024
+
+class PresetCofre(NamedTuple):
+    rotulo: str
+    compressao: int          # pyzipper.ZIP_DEFLATED / ZIP_LZMA
+    nivel: Optional[int]     # Nível do DEFLATE (ignorado no LZMA)
+    razao_minima: float      # Amostra que não encolhe abaixo disso (comprimido/original) é gravada sem compressão
+
+PRESETS_COFRE = {
+    "rapido": PresetCofre("Rápido", pyzipper.ZIP_DEFLATED, 1, 0.90),
+    "equilibrado": PresetCofre("Equilibrado", pyzipper.ZIP_DEFLATED, 6, 0.95),
+    "maximo": PresetCofre("Máximo", pyzipper.ZIP_LZMA, None, 0.98),
+}
+
+class MembroCofre(NamedTuple):
+    """Arquivo preparado por um trabalhador, pronto para o escritor do ZIP."""
+    caminho: str
+    arcname: str
+    compressao: int                 # ZIP_STORED se não compensa comprimir
+    pedacos: Optional[List[bytes]]  # Já comprimidos; None = o escritor lê do disco
+    crc: int
+    tamanho: int
+    preset: PresetCofre             # Nível usado quando o escritor comprime (pedacos None)
+
+def vale_comprimir(caminho: str, preset: PresetCofre) -> bool:
+    """
+    Pela extensão e, se ela não decidir, por amostras do início, do meio e do
+    fim do arquivo comprimidas com DEFLATE nível 1 (estimativa barata da
+    entropia do conteúdo). Comprime se a maioria das amostras encolher: um
+    cabeçalho de texto na frente de dados já comprimidos não engana a decisão.
+    """
+    if os.path.splitext(caminho)[1].lower() in EXTENSOES_COMPRIMIDAS:
+        return False
+    with open(caminho, "rb") as f:
+        tamanho = os.fstat(f.fileno()).st_size
+        if not tamanho:
+            return False
+        if tamanho <= 3 * TAMANHO_AMOSTRA:
+            amostras = [f.read(TAMANHO_AMOSTRA)]
+        else:
+            amostras = []
+            for posicao in (0, (tamanho - TAMANHO_AMOSTRA) // 2, tamanho - TAMANHO_AMOSTRA):
+                f.seek(posicao)
+                amostras.append(f.read(TAMANHO_AMOSTRA))
+    encolheram = sum(1 for a in amostras if len(zlib.compress(a, 1)) < len(a) * preset.razao_minima)
+    return encolheram * 2 > len(amostras)
+
+def _compressor(preset: PresetCofre):
+    """O mesmo fluxo que o ZipFile geraria para o método do preset."""
+    if preset.compressao == pyzipper.ZIP_LZMA:
+        return pyzipper.zipfile.LZMACompressor()
+    return zlib.compressobj(preset.nivel, zlib.DEFLATED, -15)
+
+def preparar_membro(caminho: str, arcname: str, preset: PresetCofre) -> MembroCofre:
+    """
+    Decide o método de um arquivo e, se for pequeno, já o comprime (roda nos
+    trabalhadores; zlib e lzma liberam o GIL enquanto comprimem).
+
+    Os maiores que LIMITE_EM_MEMORIA são comprimidos pelo escritor, em fluxo,
+    só com a decisão das amostras: não há como conferir antes se encolheram.
+    """
+    tamanho = os.path.getsize(caminho)
+    if not vale_comprimir(caminho, preset):
+        return MembroCofre(caminho, arcname, pyzipper.ZIP_STORED, None, 0, tamanho, preset)
+    if tamanho > LIMITE_EM_MEMORIA:
+        return MembroCofre(caminho, arcname, preset.compressao, None, 0, tamanho, preset)
+
+    compressor = _compressor(preset)
+    pedacos = []
+    crc = 0
+    tamanho = 0
+    with open(caminho, "rb") as f:
+        while True:
+            dados = f.read(PEDACO_LEITURA)
+            if not dados:
+                break
+            tamanho += len(dados)
+            crc = zlib.crc32(dados, crc)
+            pedacos.append(compressor.compress(dados))
+    pedacos.append(compressor.flush())
+
+    # A amostra pode enganar (início comprimível, resto não): se não encolheu, guarda sem compressão
+    if sum(len(p) for p in pedacos) >= tamanho * preset.razao_minima:
+        return MembroCofre(caminho, arcname, pyzipper.ZIP_STORED, None, crc, tamanho, preset)
+    return MembroCofre(caminho, arcname, preset.compressao, pedacos, crc, tamanho, preset)
+
+class _SemCompressao:
+    """Compressor que repassa os bytes: os dados chegam já comprimidos do trabalhador."""
+
+    def compress(self, dados):
+        return dados
+
+    def flush(self):
+        return b""
+
+def gravar_membro(zf, membro: MembroCofre):
+    """
+    Grava o membro no ZIP (só a thread escritora chama isto).
+
+    Os pré-comprimidos passam pelo escritor do pyzipper com o compressor
+    trocado por um que repassa os bytes; a criptografia AES continua sendo
+    feita por ele. O CRC e o tamanho original, calculados no trabalhador, são
+    restaurados antes do close(), que é quando o pyzipper os grava. Isso mexe
+    em atributos internos do escritor: por isso o pyzipper é fixado em
+    requirements.txt e há teste que abre um cofre gravado assim.
+    """
+    if membro.pedacos is None:
+        zf.write(membro.caminho, arcname=membro.arcname, compress_type=membro.compressao,
+                 compresslevel=membro.preset.nivel)
+        return
+
+    zinfo = zf.zipinfo_cls.from_file(membro.caminho, membro.arcname)
+    zinfo.compress_type = membro.compressao
+    zinfo.file_size = membro.tamanho
+    escritor = zf.open(zinfo, 'w')
+    try:
+        escritor._compressor = _SemCompressao()
+        for pedaco in membro.pedacos:
+            escritor.write(pedaco)
+        escritor._crc = membro.crc
+        escritor._file_size = membro.tamanho
+    finally:
+        escritor.close()
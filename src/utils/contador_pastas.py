@@ -0,0 +1,90 @@
+import os
+import time
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+from src.utils.file_walker import percorrer_arquivos, LINKS_IGNORAR
+
+class _TotaisPasta(NamedTuple):
+    mtime_ns: int             # mtime da pasta quando foi listada
+    bytes: int                # Soma dos arquivos diretamente nesta pasta
+    arquivos: int
+    subpastas: Tuple[str, ...]
+
+class ContadorPastas:
+    """
+    Tamanho e quantidade de arquivos de árvores de pastas, calculados de forma incremental.
+
+    Guarda os totais locais de cada pasta (só os arquivos dela) junto com o mtime
+    da pasta. Numa nova medição cada pasta recebe um único stat: se o mtime não
+    mudou, nenhum arquivo foi criado, apagado ou renomeado nela e os totais do
+    cache são reaproveitados; só as pastas alteradas são listadas de novo.
+
+    Um arquivo que cresce no lugar não muda o mtime da pasta, por isso a árvore
+    inteira é relida a cada `revalidar_a_cada` segundos.
+
+    - filtro: função que recebe o nome do arquivo e diz se ele conta (padrão: todos).
+    """
+
+    def __init__(self, filtro: Optional[Callable[[str], bool]] = None,
+                 revalidar_a_cada: float = 3600.0, logger_callback=None):
+        self.log = logger_callback if logger_callback else print
+        self.filtro = filtro
+        self.revalidar_a_cada = revalidar_a_cada
+        self._cache: Dict[str, _TotaisPasta] = {}
+        self._proxima_revalidacao = 0.0
+        self.pastas_relidas = 0  # Quantas pastas a última medição precisou listar
+
+    def medir(self, raizes: Iterable[str]) -> Tuple[int, int]:
+        """Retorna (bytes, arquivos) somando as árvores de todas as raízes."""
+        forcar = time.monotonic() >= self._proxima_revalidacao
+        if forcar:
+            self._proxima_revalidacao = time.monotonic() + self.revalidar_a_cada
+
+        total_bytes = 0
+        total_arquivos = 0
+        self.pastas_relidas = 0
+        vistas = set()  # (st_dev, st_ino): a mesma pasta por dois caminhos (ex.: TEMP = /tmp) conta uma vez
+        visitadas = set()
+
+        pilha = list(raizes)
+        while pilha:
+            pasta = pilha.pop()
+            try:
+                st = os.stat(pasta)
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in vistas:
+                continue
+            vistas.add((st.st_dev, st.st_ino))
+            visitadas.add(pasta)
+
+            totais = self._cache.get(pasta)
+            if forcar or totais is None or totais.mtime_ns != st.st_mtime_ns:
+                totais = self._listar(pasta, st.st_mtime_ns)
+                self._cache[pasta] = totais
+                self.pastas_relidas += 1
+
+            total_bytes += totais.bytes
+            total_arquivos += totais.arquivos
+            pilha.extend(totais.subpastas)
+
+        # Pastas apagadas (ou fora das raízes atuais) saem do cache
+        for pasta in [p for p in self._cache if p not in visitadas]:
+            del self._cache[pasta]
+
+        return total_bytes, total_arquivos
+
+    def _listar(self, pasta: str, mtime_ns: int) -> _TotaisPasta:
+        """Lista só o primeiro nível da pasta. O mtime deve ter sido lido antes da listagem."""
+        total_bytes = 0
+        total_arquivos = 0
+        subpastas = []
+        for entry in percorrer_arquivos(pasta, links=LINKS_IGNORAR, incluir_pastas=True, profundidade_maxima=0):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subpastas.append(entry.path)
+                elif self.filtro is None or self.filtro(entry.name):
+                    total_bytes += entry.stat(follow_symlinks=False).st_size
+                    total_arquivos += 1
+            except OSError:
+                continue  # Apagado durante a listagem ou sem permissão
+        return _TotaisPasta(mtime_ns, total_bytes, total_arquivos, tuple(subpastas))
@@ -3,51 +3,239 @@
 Descriptografador Standalone do Titanium Suite
 Este script pode ser enviado junto com o arquivo .enc para que
 outra pessoa possa descriptografar sem precisar do Titanium Suite.
+
+Uso:
+  python descriptografar_arquivo.py                  (todos os .enc desta pasta)
+  python descriptografar_arquivo.py arquivo.enc      (um arquivo)
+  python descriptografar_arquivo.py pasta [...]      (todos os .enc das pastas/arquivos indicados)
+
+A senha é pedida uma vez só. Os arquivos são processados em paralelo e
+em blocos, com memória constante, qualquer que seja o tamanho.
 """
 
 import os
 import sys
+import hmac
 import base64
+import struct
 import getpass
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from cryptography.hazmat.primitives import hashes, padding
+from cryptography.hazmat.primitives.hmac import HMAC
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-def gerar_chave(senha, salt):
-    """Gera a chave Fernet a partir da senha"""
+# Formatos .enc v2 e v3 (ver src/modules/security.py). Repetidos aqui porque este
+# script é enviado sozinho, sem o resto do Titanium Suite.
+MAGICO_ENC = b"TENC"
+VERSAO_ENC = 2
+VERSAO_ENC_LOTE = 3
+FORMATO_CABECALHO = ">4sBII16s4s"
+FORMATO_CABECALHO_LOTE = ">4sBII16s16s4s"
+TAMANHO_CABECALHO = struct.calcsize(FORMATO_CABECALHO)
+TAMANHO_CABECALHO_LOTE = struct.calcsize(FORMATO_CABECALHO_LOTE)
+INFO_HKDF = b"TitaniumSuite .enc v3"
+TAMANHO_TAG = 16
+MAXIMO_BLOCO = 64 * 1024 * 1024
+MAXIMO_ITERACOES = 10_000_000
+
+# Formato v1: salt (16 bytes) + token Fernet em base64
+# (versão 0x80, timestamp 8, IV 16, AES-128-CBC, HMAC-SHA256 32)
+TAMANHO_SALT_V1 = 16
+CABECALHO_FERNET = 1 + 8 + 16
+TAMANHO_HMAC = 32
+BLOCO_BASE64 = 4 * 256 * 1024  # Múltiplo de 4: cada pedaço decodifica sozinho
+
+class ErroFormatoEnc(ValueError):
+    """Arquivo .enc com cabeçalho inválido ou versão desconhecida."""
+    pass
+
+def derivar_chave(senha, salt, iteracoes=100_000):
+    """Chave de 32 bytes a partir da senha (PBKDF2-SHA256)"""
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
         salt=salt,
-        iterations=100_000,
+        iterations=iteracoes,
     )
-    chave = base64.urlsafe_b64encode(kdf.derive(senha.encode('utf-8')))
-    return Fernet(chave)
+    return kdf.derive(senha.encode('utf-8'))
+
+class CacheChaves:
+    """
+    Chaves já derivadas, por (salt, iterações).
+
+    O PBKDF2 é a parte cara de abrir cada arquivo; arquivos com o mesmo salt
+    (ex.: os v3 criptografados no mesmo lote) reaproveitam a chave. Se duas
+    threads pedem a mesma chave ao mesmo tempo, só a primeira calcula e a
+    outra espera o resultado.
+    """
+
+    def __init__(self, senha):
+        self.senha = senha
+        self._chaves = {}
+        self._lock = threading.Lock()
+
+    def obter(self, salt, iteracoes=100_000):
+        with self._lock:
+            futuro = self._chaves.get((salt, iteracoes))
+            calcular = futuro is None
+            if calcular:
+                futuro = self._chaves[(salt, iteracoes)] = Future()
+        if calcular:
+            try:
+                futuro.set_result(derivar_chave(self.senha, salt, iteracoes))
+            except Exception as e:
+                futuro.set_exception(e)
+        return futuro.result()
+
+def _ler_base64(entrada):
+    """Gera os bytes decodificados do token Fernet, pedaço a pedaço."""
+    while True:
+        pedaco = entrada.read(BLOCO_BASE64).strip()
+        if not pedaco:
+            return
+        yield base64.urlsafe_b64decode(pedaco)
+
+def _descriptografar_v1(entrada, saida, chaves):
+    """
+    Token Fernet lido em duas passadas, sem carregar o arquivo inteiro:
+    a primeira confere o HMAC, a segunda (só se ele conferir) decifra.
+    """
+    salt = entrada.read(TAMANHO_SALT_V1)
+    chave = chaves.obter(salt)
+    chave_hmac, chave_aes = chave[:16], chave[16:]
+
+    # 1ª passada: HMAC de tudo menos os 32 bytes finais, que são o próprio HMAC
+    assinatura = HMAC(chave_hmac, hashes.SHA256())
+    inicio = b""
+    pendente = b""
+    for dados in _ler_base64(entrada):
+        pendente += dados
+        if len(inicio) < CABECALHO_FERNET:
+            inicio += dados[:CABECALHO_FERNET - len(inicio)]
+        assinatura.update(pendente[:-TAMANHO_HMAC])
+        pendente = pendente[-TAMANHO_HMAC:]
+    if len(inicio) < CABECALHO_FERNET or inicio[0] != 0x80 or len(pendente) < TAMANHO_HMAC:
+        raise ValueError("Token inválido.")
+    if not hmac.compare_digest(assinatura.finalize(), pendente):
+        raise ValueError("Senha incorreta ou arquivo corrompido.")
+
+    # 2ª passada: AES-CBC + remoção do padding
+    entrada.seek(TAMANHO_SALT_V1)
+    decifrador = Cipher(algorithms.AES(chave_aes), modes.CBC(inicio[9:CABECALHO_FERNET])).decryptor()
+    sem_padding = padding.PKCS7(128).unpadder()
+    pular = CABECALHO_FERNET
+    pendente = b""
+    for dados in _ler_base64(entrada):
+        pendente += dados
+        if pular:
+            cortado = min(pular, len(pendente))
+            pendente = pendente[cortado:]
+            pular -= cortado
+        saida.write(sem_padding.update(decifrador.update(pendente[:-TAMANHO_HMAC])))
+        pendente = pendente[-TAMANHO_HMAC:]
+    saida.write(sem_padding.update(decifrador.finalize()) + sem_padding.finalize())
+
+def _descriptografar_blocos(entrada, saida, chaves):
+    """Descriptografa v2/v3 bloco a bloco (memória constante)"""
+    cabecalho = entrada.read(len(MAGICO_ENC) + 1)
+    versao = cabecalho[-1] if len(cabecalho) == len(MAGICO_ENC) + 1 else None
+    if versao == VERSAO_ENC:
+        lote, tamanho = False, TAMANHO_CABECALHO
+    elif versao == VERSAO_ENC_LOTE:
+        lote, tamanho = True, TAMANHO_CABECALHO_LOTE
+    else:
+        raise ErroFormatoEnc(f"Versão {versao} do formato .enc não suportada por este descriptografador.")
+    cabecalho += entrada.read(tamanho - len(cabecalho))
+    if len(cabecalho) < tamanho:
+        raise ErroFormatoEnc("Cabeçalho incompleto.")
+    if lote:
+        _, _, iteracoes, tamanho_bloco, salt, salt_arquivo, prefixo = struct.unpack(FORMATO_CABECALHO_LOTE,
+                                                                                    cabecalho)
+    else:
+        _, _, iteracoes, tamanho_bloco, salt, prefixo = struct.unpack(FORMATO_CABECALHO, cabecalho)
+    if not (0 < tamanho_bloco <= MAXIMO_BLOCO and 0 < iteracoes <= MAXIMO_ITERACOES):
+        raise ErroFormatoEnc("Cabeçalho inválido.")
+
+    chave = chaves.obter(salt, iteracoes)
+    if lote:
+        # v3: cada arquivo tem sua chave, derivada da chave mestra com o salt do arquivo
+        chave = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt_arquivo, info=INFO_HKDF).derive(chave)
+    aes = AESGCM(chave)
+    tamanho_cifrado = tamanho_bloco + TAMANHO_TAG
+    bloco = entrada.read(tamanho_cifrado)
+    indice = 0
+    while True:
+        proximo = entrada.read(tamanho_cifrado)
+        final = not proximo
+        nonce = prefixo + indice.to_bytes(8, "big")
+        saida.write(aes.decrypt(nonce, bloco, cabecalho + (b"\x01" if final else b"\x00")))
+        if final:
+            break
+        bloco = proximo
+        indice += 1
 
 def descriptografar(arquivo_enc, senha, pasta_saida=None):
-    """Descriptografa um arquivo .enc"""
+    """
+    Descriptografa um arquivo .enc (v1, v2 ou v3).
+    `senha` pode ser a senha em texto ou um CacheChaves compartilhado entre arquivos.
+    """
+    chaves = senha if isinstance(senha, CacheChaves) else CacheChaves(senha)
+    nome_original = arquivo_enc.rsplit('.enc', 1)[0]
+    if pasta_saida:
+        nome_original = os.path.join(pasta_saida, os.path.basename(nome_original))
+    temporario = nome_original + ".tmp"
+
     try:
-        with open(arquivo_enc, "rb") as f:
-            conteudo = f.read()
-        
-        salt = conteudo[:16]
-        dados_cifrados = conteudo[16:]
-        
-        fernet = gerar_chave(senha, salt)
-        dados_originais = fernet.decrypt(dados_cifrados)
-        
-        nome_original = arquivo_enc.rsplit('.enc', 1)[0]
-        if pasta_saida:
-            nome_original = os.path.join(pasta_saida, os.path.basename(arquivo_enc.rsplit('.enc', 1)[0]))
-        
-        with open(nome_original, "wb") as f:
-            f.write(dados_originais)
-        
+        with open(arquivo_enc, "rb") as entrada:
+            # Mesma regra do Titanium Suite: o mágico indica v2/v3 (a versão é conferida
+            # no cabeçalho, e uma desconhecida é recusada); sem ele, é v1
+            em_blocos = entrada.read(len(MAGICO_ENC)) == MAGICO_ENC
+            entrada.seek(0)
+
+            with open(temporario, "wb") as saida:
+                if em_blocos:
+                    _descriptografar_blocos(entrada, saida, chaves)
+                else:
+                    _descriptografar_v1(entrada, saida, chaves)
+
+        os.replace(temporario, nome_original)
         return True, nome_original
+    except ErroFormatoEnc as e:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False, str(e)
     except Exception:
-        # A exceção mais comum aqui é InvalidToken da biblioteca, que indica senha errada.
+        # A exceção mais comum aqui é InvalidTag/HMAC que não confere, que indica senha errada.
+        if os.path.exists(temporario):
+            os.remove(temporario)
         return False, "Senha incorreta ou arquivo corrompido."
 
+def listar_arquivos(alvos):
+    """Arquivos .enc indicados diretamente ou contidos nas pastas indicadas."""
+    arquivos = []
+    for alvo in alvos:
+        if os.path.isdir(alvo):
+            arquivos.extend(os.path.join(alvo, f) for f in sorted(os.listdir(alvo))
+                            if f.endswith('.enc') and os.path.isfile(os.path.join(alvo, f)))
+        else:
+            arquivos.append(alvo)
+    return arquivos
+
+def descriptografar_lote(arquivos, senha, pasta_saida=None, trabalhadores=None):
+    """
+    Descriptografa vários arquivos em paralelo com a mesma senha.
+    Retorna [(arquivo, sucesso, resultado)] na ordem recebida.
+    """
+    chaves = CacheChaves(senha)
+    trabalhadores = trabalhadores or min(len(arquivos), os.cpu_count() or 2) or 1
+    with ThreadPoolExecutor(max_workers=trabalhadores) as pool:
+        futuros = [pool.submit(descriptografar, arquivo, chaves, pasta_saida) for arquivo in arquivos]
+        return [(arquivo, *futuro.result()) for arquivo, futuro in zip(arquivos, futuros)]
+
 def main():
     """Interface de linha de comando"""
     try:
@@ -55,36 +243,38 @@ def main():
         print("🔓 DESCRIPTOGRAFADOR TITANIUM SUITE")
         print("=" * 50)
 
-        # Determina o arquivo a ser descriptografado
-        if len(sys.argv) > 1:
-            arquivo = sys.argv[1]
-            print(f"Arquivo alvo: {arquivo}")
-        else:
-            arquivos_enc = [f for f in os.listdir('.') if f.endswith('.enc')]
-            if not arquivos_enc:
-                print("\\n[!] Nenhum arquivo .enc encontrado neste diretório.")
-                return
-            arquivo = arquivos_enc[0]
-            print(f"Arquivo encontrado: {arquivo}")
-
-        if not os.path.exists(arquivo):
-            print(f"\\n[!] ERRO: Arquivo '{arquivo}' não encontrado!")
+        # Determina os arquivos a serem descriptografados (sem argumentos: esta pasta)
+        alvos = sys.argv[1:] or ['.']
+        faltando = [a for a in alvos if not os.path.exists(a)]
+        if faltando:
+            print(f"\n[!] ERRO: '{faltando[0]}' não encontrado!")
             return
-        
-        # Pede a senha de forma segura
+
+        arquivos = listar_arquivos(alvos)
+        if not arquivos:
+            print("\n[!] Nenhum arquivo .enc encontrado.")
+            return
+        for arquivo in arquivos:
+            print(f"Arquivo alvo: {arquivo}")
+
+        # Pede a senha de forma segura (uma vez para todos os arquivos)
         senha = getpass.getpass("Digite a senha: ")
-        
-        sucesso, resultado = descriptografar(arquivo, senha)
-        
-        if sucesso:
-            print(f"\\n[SUCCESS] Arquivo restaurado com sucesso: {resultado}")
-        else:
-            print(f"\\n[!] ERRO: {resultado}")
+
+        resultados = descriptografar_lote(arquivos, senha)
+
+        for arquivo, sucesso, resultado in resultados:
+            if sucesso:
+                print(f"[SUCCESS] Arquivo restaurado com sucesso: {resultado}")
+            else:
+                print(f"[!] ERRO em {arquivo}: {resultado}")
+        if len(resultados) > 1:
+            restaurados = sum(1 for _, sucesso, _ in resultados if sucesso)
+            print(f"\n{restaurados} de {len(resultados)} arquivo(s) restaurado(s).")
 
     except Exception as e:
-        print(f"\\n[!] Ocorreu um erro inesperado: {e}")
+        print(f"\n[!] Ocorreu um erro inesperado: {e}")
     finally:
-        print("\\n")
+        print("\n")
         input("Pressione Enter para sair...")
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+import os
+import fnmatch
+from typing import Callable, Iterable, Iterator, Optional
+
+# Políticas para links simbólicos
+LINKS_IGNORAR = "ignorar"    # Links são pulados por completo
+LINKS_ARQUIVOS = "arquivos"  # Links para arquivos entram; links para pastas não são seguidos (igual ao os.walk)
+LINKS_SEGUIR = "seguir"      # Segue tudo, com proteção contra ciclos
+
+def percorrer_arquivos(raiz: str,
+                       ignorar: Iterable[str] = (),
+                       links: str = LINKS_ARQUIVOS,
+                       ao_erro: Optional[Callable[[OSError], None]] = None,
+                       incluir_pastas: bool = False,
+                       profundidade_maxima: Optional[int] = None,
+                       ordenar: bool = False) -> Iterator[os.DirEntry]:
+    """
+    Percorre uma árvore de diretórios com os.scandir e gera os DirEntry encontrados.
+
+    O DirEntry já traz o tipo (e, no Windows, o stat completo) da listagem do
+    diretório; use entry.stat() / entry.is_file() em vez de os.path.getsize,
+    os.path.islink etc. para não repetir syscalls.
+
+    - ignorar: padrões (fnmatch) comparados ao nome; pastas que casam não são visitadas.
+    - links: LINKS_IGNORAR, LINKS_ARQUIVOS ou LINKS_SEGUIR.
+    - ao_erro: chamado com o OSError de pastas/arquivos inacessíveis (padrão: ignora).
+    - incluir_pastas: também gera as pastas, sempre antes do conteúdo delas.
+    - profundidade_maxima: 0 = só a raiz, 1 = raiz + subpastas diretas, None = sem limite.
+    - ordenar: entradas de cada pasta em ordem alfabética.
+    """
+    padroes = tuple(ignorar)
+    seguir = links == LINKS_SEGUIR
+    visitadas = set()  # (st_dev, st_ino) das pastas já vistas, quando seguindo links
+
+    if seguir:
+        try:
+            st = os.stat(raiz)
+            visitadas.add((st.st_dev, st.st_ino))
+        except OSError as e:
+            if ao_erro:
+                ao_erro(e)
+            return
+
+    pilha = [(raiz, 0)]
+    while pilha:
+        pasta, profundidade = pilha.pop()
+        try:
+            with os.scandir(pasta) as iterador:
+                entradas = list(iterador)
+        except OSError as e:
+            if ao_erro:
+                ao_erro(e)
+            continue
+
+        if ordenar:
+            entradas.sort(key=lambda e: e.name)
+
+        subpastas = []
+        for entry in entradas:
+            if padroes and any(fnmatch.fnmatch(entry.name, p) for p in padroes):
+                continue
+
+            try:
+                eh_link = entry.is_symlink()
+                if eh_link and links == LINKS_IGNORAR:
+                    continue
+
+                if entry.is_dir(follow_symlinks=seguir):
+                    if seguir:
+                        st = entry.stat()
+                        if (st.st_dev, st.st_ino) in visitadas:
+                            continue  # Ciclo de links ou pasta já alcançada por outro caminho
+                        visitadas.add((st.st_dev, st.st_ino))
+                    if incluir_pastas:
+                        yield entry
+                    if profundidade_maxima is None or profundidade < profundidade_maxima:
+                        subpastas.append(entry.path)
+                elif entry.is_file():
+                    yield entry
+            except OSError as e:
+                if ao_erro:
+                    ao_erro(e)
+
+        # Empilha ao contrário para visitar as subpastas na ordem da listagem
+        pilha.extend((p, profundidade + 1) for p in reversed(subpastas))
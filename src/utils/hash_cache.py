@@ -0,0 +1,179 @@
+import os
+import time
+import atexit
+import logging
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+_logger = logging.getLogger(__name__)
+
+class HashCache:
+    """
+    Cache persistente de hashes de arquivos (SQLite em database/).
+
+    Cada entrada é identificada por (caminho, tipo) e só vale enquanto
+    tamanho, mtime e inode do arquivo continuarem iguais. Assim um arquivo
+    que não mudou nunca é lido de novo, nem entre sessões.
+    Compartilhado entre busca de duplicados, backup e verificação de integridade.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """Singleton pattern: um único cache (e conexão) por processo."""
+        if cls._instance is None:
+            cls._instance = super(HashCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, db_path: str = "database/hash_cache.db", max_entradas: int = 1_000_000,
+                 lote_escrita: int = 500, logger_callback=None):
+        # O cache é compartilhado: quem informar um logger por último passa a
+        # receber os erros (que podem surgir em threads de trabalho ou no atexit).
+        if logger_callback:
+            self.log = logger_callback
+        if self._initialized:
+            return
+        if not logger_callback:
+            self.log = _logger.warning
+
+        self.db_path = db_path
+        self.max_entradas = max_entradas
+        self.lote_escrita = lote_escrita
+
+        self._lock = threading.Lock()
+        self._pendentes: List[Tuple] = []
+        self._usados: List[Tuple] = []
+        self._inicializar_db()
+        atexit.register(self.salvar)
+        self._initialized = True
+
+    def _inicializar_db(self):
+        """Cria a tabela de hashes se não existir"""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                ultimo_uso REAL NOT NULL,
+                PRIMARY KEY (path, tipo)
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_file_hashes_uso ON file_hashes (ultimo_uso)")
+        # Onde o expurgo de obsoletos parou (limpar_obsoletos verifica um lote por vez)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (chave TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+        self.conn.commit()
+
+    # --- CONSULTA E GRAVAÇÃO ---
+    def obter(self, filepath: str, tipo: str, stat: os.stat_result) -> Optional[str]:
+        """Retorna o hash salvo se o arquivo não mudou desde então, senão None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, inode, hash FROM file_hashes WHERE path = ? AND tipo = ?",
+                (filepath, tipo)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        size, mtime_ns, inode, file_hash = row
+        if size == stat.st_size and mtime_ns == stat.st_mtime_ns and inode == stat.st_ino:
+            with self._lock:
+                self._usados.append((time.time(), filepath, tipo))
+            return file_hash
+
+        # Entrada obsoleta: o arquivo mudou
+        self.remover([filepath])
+        return None
+
+    def guardar(self, filepath: str, tipo: str, stat: os.stat_result, file_hash: str):
+        """Agenda a gravação do hash; as escritas são feitas em lote."""
+        with self._lock:
+            self._pendentes.append(
+                (filepath, tipo, stat.st_size, stat.st_mtime_ns, stat.st_ino, file_hash, time.time())
+            )
+            if len(self._pendentes) + len(self._usados) >= self.lote_escrita:
+                self._gravar_pendentes()
+
+    def _gravar_pendentes(self):
+        """Grava o lote pendente. Deve ser chamado com o lock adquirido."""
+        if not self._pendentes and not self._usados:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?, ?, ?, ?)", self._pendentes
+        )
+        # Atualiza o último uso das entradas reaproveitadas (política LRU)
+        self.conn.executemany(
+            "UPDATE file_hashes SET ultimo_uso = ? WHERE path = ? AND tipo = ?", self._usados
+        )
+        self.conn.commit()
+        self._pendentes = []
+        self._usados = []
+
+    def salvar(self):
+        """Grava o que estiver pendente e aplica o limite de tamanho."""
+        try:
+            with self._lock:
+                self._gravar_pendentes()
+            self.aplicar_limite()
+        except sqlite3.Error as e:
+            self.log(f">> Erro ao salvar cache de hashes: {e}")
+
+    # --- EXPURGO ---
+    def remover(self, caminhos: Iterable[str]):
+        """Remove do cache todas as entradas dos caminhos informados."""
+        with self._lock:
+            self.conn.executemany("DELETE FROM file_hashes WHERE path = ?", ((p,) for p in caminhos))
+            self.conn.commit()
+
+    def aplicar_limite(self):
+        """Se passar de max_entradas, descarta as entradas usadas há mais tempo."""
+        with self._lock:
+            total = self.conn.execute("SELECT count(*) FROM file_hashes").fetchone()[0]
+            excesso = total - self.max_entradas
+            if excesso > 0:
+                self.conn.execute(
+                    "DELETE FROM file_hashes WHERE rowid IN "
+                    "(SELECT rowid FROM file_hashes ORDER BY ultimo_uso LIMIT ?)", (excesso,)
+                )
+                self.conn.commit()
+
+    def limpar_obsoletos(self, limite: int = 2000) -> int:
+        """
+        Remove entradas de arquivos apagados ou alterados. Retorna quantas saíram.
+
+        Cada chamada verifica no máximo `limite` linhas (um stat por linha),
+        continuando de onde a anterior parou; ao chegar ao fim da tabela volta
+        ao começo. Assim o custo de cada chamada é fixo, mesmo com o cache cheio.
+        """
+        with self._lock:
+            self._gravar_pendentes()
+            row = self.conn.execute("SELECT valor FROM cache_meta WHERE chave = 'expurgo_rowid'").fetchone()
+            inicio = row[0] if row else 0
+            linhas = self.conn.execute(
+                "SELECT rowid, path, size, mtime_ns, inode FROM file_hashes WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (inicio, limite)
+            ).fetchall()
+            proximo = linhas[-1][0] if len(linhas) == limite else 0
+            self.conn.execute("INSERT OR REPLACE INTO cache_meta VALUES ('expurgo_rowid', ?)", (proximo,))
+            self.conn.commit()
+
+        obsoletos = set()
+        for _, path, size, mtime_ns, inode in linhas:
+            try:
+                st = os.stat(path)
+                if (st.st_size, st.st_mtime_ns, st.st_ino) != (size, mtime_ns, inode):
+                    obsoletos.add(path)
+            except OSError:
+                obsoletos.add(path)
+
+        if obsoletos:
+            self.remover(obsoletos)
+        return len(obsoletos)
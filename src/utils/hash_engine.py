@@ -0,0 +1,295 @@
+import os
+import time
+import mmap
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from src.utils.hash_cache import HashCache
+from src.utils.task_queue import TokenCancelamento
+
+try:
+    import xxhash  # Opcional: hash não criptográfico muito rápido
+except ImportError:
+    xxhash = None
+
+# Algoritmos disponíveis. BLAKE2b é o mais rápido dos criptográficos em CPUs 64 bits;
+# SHA-256 fica para onde a compatibilidade importa (ex.: histórico de backup).
+ALGORITMOS: Dict[str, Callable] = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+    "blake2s": hashlib.blake2s,
+}
+if xxhash is not None:
+    ALGORITMOS["xxh3_128"] = xxhash.xxh3_128
+
+BUFFER_LEITURA = 4 * 1024 * 1024 # Leitura em blocos grandes (menos syscalls)
+BLOCO_MMAP = 8 * 1024 * 1024     # Fatia do mmap entregue ao hasher por vez (só com usar_mmap=True)
+MAXIMO_PASTAS_DISPOSITIVO = 4096 # Pastas lembradas no cache pasta -> st_dev (LRU)
+INTERVALO_CANCELAMENTO = 0.2     # Segundos entre verificações do token enquanto mapear() espera
+
+class FilaDeTrabalho:
+    """
+    Fila de itens para HashEngine.mapear() que pode crescer enquanto os
+    resultados são consumidos (ex.: o hash completo só é agendado depois
+    que o hash parcial confirmou a colisão).
+
+    Os itens iniciais são puxados do iterável aos poucos, conforme o pool
+    pede; só os acrescentados com adicionar() ficam guardados, e eles saem
+    primeiro para que o trabalho já começado termine logo.
+    """
+
+    def __init__(self, itens: Iterable = ()):
+        self._entrada = iter(itens)
+        self._adicionados = deque()
+
+    def adicionar(self, item):
+        self._adicionados.append(item)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._adicionados:
+            return self._adicionados.popleft()
+        return next(self._entrada)
+
+class HashEngine:
+    """
+    Motor de hashing de arquivos com pool de workers.
+
+    - max_workers: quantidade de threads lendo/hasheando ao mesmo tempo.
+    - max_pendentes: limite de tarefas na fila; a entrada é consumida aos poucos,
+      então a memória fica estável mesmo com milhões de arquivos.
+    - limite_por_dispositivo: leituras simultâneas no mesmo disco (st_dev).
+      Use 1 para HDs mecânicos, valores maiores para NVMe/RAID.
+    - cache: HashCache opcional; arquivos que não mudaram não são lidos.
+    - algoritmo: chave de ALGORITMOS usada por padrão (ex.: "blake2b", "sha256").
+    """
+
+    def __init__(self, max_workers: int = None, max_pendentes: int = None,
+                 limite_por_dispositivo: int = 4, cache: HashCache = None,
+                 algoritmo: str = "sha256", logger_callback=None):
+        self.log = logger_callback if logger_callback else print
+        if algoritmo not in ALGORITMOS:
+            raise ValueError(f"Algoritmo de hash desconhecido: {algoritmo}")
+        self.algoritmo = algoritmo
+        self.cache = cache
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_pendentes = max_pendentes or self.max_workers * 4
+        self.limite_por_dispositivo = max(1, limite_por_dispositivo)
+
+        self._lock = threading.Lock()
+        self._semaforos: Dict[int, threading.BoundedSemaphore] = {}
+        self._dispositivo_por_pasta: "OrderedDict[str, int]" = OrderedDict()
+
+    # --- CONTROLE POR DISPOSITIVO ---
+    def _dispositivo(self, filepath: str) -> int:
+        """
+        Descobre o st_dev do arquivo, cacheado por pasta para evitar stat extra.
+        O cache é um LRU limitado (as threads do pool o usam ao mesmo tempo).
+        """
+        pasta = os.path.dirname(filepath)
+        with self._lock:
+            dispositivo = self._dispositivo_por_pasta.get(pasta)
+            if dispositivo is not None:
+                self._dispositivo_por_pasta.move_to_end(pasta)
+                return dispositivo
+
+        try:
+            dispositivo = os.stat(pasta or ".").st_dev
+        except OSError:
+            dispositivo = -1
+        with self._lock:
+            self._dispositivo_por_pasta[pasta] = dispositivo
+            if len(self._dispositivo_por_pasta) > MAXIMO_PASTAS_DISPOSITIVO:
+                self._dispositivo_por_pasta.popitem(last=False)
+        return dispositivo
+
+    def _semaforo(self, filepath: str, stat=None) -> threading.BoundedSemaphore:
+        """Semáforo do disco do arquivo. Se o stat já foi feito (cache), o st_dev vem dele."""
+        dispositivo = stat.st_dev if stat is not None else self._dispositivo(filepath)
+        with self._lock:
+            semaforo = self._semaforos.get(dispositivo)
+            if semaforo is None:
+                semaforo = threading.BoundedSemaphore(self.limite_por_dispositivo)
+                self._semaforos[dispositivo] = semaforo
+        return semaforo
+
+    # --- FUNÇÕES DE HASH ---
+    def _ler_para_hasher(self, afile, hasher, blocksize: int = BUFFER_LEITURA, usar_mmap: bool = False):
+        """
+        Alimenta o hasher com o conteúdo do arquivo, lido num buffer reaproveitado (readinto).
+
+        mmap só com usar_mmap=True (medir_desempenho): se outro processo encolher
+        o arquivo mapeado, ler a página perdida derruba o processo inteiro
+        (SIGBUS), e a busca de duplicados e o backup leem arquivos em uso. O
+        tamanho é conferido antes de cada fatia, o que estreita essa janela mas
+        não a fecha. Só a criação do mmap cai para a leitura normal: depois do
+        primeiro update() recomeçar daria um hash errado.
+        """
+        fd = afile.fileno()
+        mapa = None
+        if usar_mmap:
+            try:
+                mapa = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                pass  # mmap indisponível (arquivo vazio, rede, etc.): lê normalmente
+
+        if mapa is not None:
+            with mapa, memoryview(mapa) as view:
+                for inicio in range(0, len(view), BLOCO_MMAP):
+                    if os.fstat(fd).st_size < len(view):
+                        raise OSError(f"Arquivo alterado durante a leitura: {afile.name}")
+                    hasher.update(view[inicio:inicio + BLOCO_MMAP])
+            return
+
+        buffer = bytearray(blocksize)
+        with memoryview(buffer) as view:
+            while True:
+                lidos = afile.readinto(buffer)
+                if not lidos:
+                    break
+                hasher.update(view[:lidos])
+
+    def hash_arquivo(self, filepath: str, blocksize: int = BUFFER_LEITURA, algoritmo: str = None) -> str:
+        """Hash do arquivo inteiro no algoritmo escolhido. Lança OSError se não conseguir ler."""
+        algoritmo = algoritmo or self.algoritmo
+        stat, file_hash = self._consultar_cache(filepath, algoritmo)
+        if file_hash:
+            return file_hash
+
+        hasher = ALGORITMOS[algoritmo]()
+        with self._semaforo(filepath, stat):
+            with open(filepath, 'rb') as afile:
+                self._ler_para_hasher(afile, hasher, blocksize)
+        return self._guardar_cache(filepath, algoritmo, stat, hasher.hexdigest())
+
+    def hash_parcial(self, filepath: str, tamanho: int, bloco: int = 65536, algoritmo: str = None) -> str:
+        """
+        Hash do primeiro e do último bloco do arquivo.
+        Se o arquivo couber nesses dois blocos, é lido inteiro (igual a hash_arquivo).
+        """
+        algoritmo = algoritmo or self.algoritmo
+        tipo = f"{algoritmo}-parcial-{bloco}"
+        stat, file_hash = self._consultar_cache(filepath, tipo)
+        if file_hash:
+            return file_hash
+
+        hasher = ALGORITMOS[algoritmo]()
+        with self._semaforo(filepath, stat):
+            with open(filepath, 'rb') as afile:
+                if tamanho <= 2 * bloco:
+                    hasher.update(afile.read())
+                else:
+                    hasher.update(afile.read(bloco))
+                    afile.seek(-bloco, os.SEEK_END)
+                    hasher.update(afile.read(bloco))
+        return self._guardar_cache(filepath, tipo, stat, hasher.hexdigest())
+
+    # --- CACHE ---
+    def _consultar_cache(self, filepath: str, tipo: str):
+        """Retorna (stat, hash_em_cache). O stat é feito antes da leitura do conteúdo."""
+        if self.cache is None:
+            return None, None
+        stat = os.stat(filepath)
+        return stat, self.cache.obter(filepath, tipo, stat)
+
+    def _guardar_cache(self, filepath: str, tipo: str, stat, file_hash: str) -> str:
+        if self.cache is not None and stat is not None:
+            self.cache.guardar(filepath, tipo, stat, file_hash)
+        return file_hash
+
+    def calcular_com_cache(self, filepath: str, tipo: str, calcular: Callable[[str], str]) -> str:
+        """Reaproveita o cache para qualquer hash derivado do arquivo (ex.: hash perceptual)."""
+        stat, valor = self._consultar_cache(filepath, tipo)
+        if valor:
+            return valor
+        with self._semaforo(filepath, stat):
+            valor = calcular(filepath)
+        return self._guardar_cache(filepath, tipo, stat, valor)
+
+    def salvar_cache(self):
+        """Persiste as entradas pendentes do cache (chamar no fim de cada operação)."""
+        if self.cache is not None:
+            self.cache.salvar()
+
+    # --- EXECUÇÃO EM PARALELO ---
+    def mapear(self, func: Callable, itens: Iterable,
+               cancelamento: TokenCancelamento = None) -> Iterator[Tuple[object, Optional[str]]]:
+        """
+        Aplica func(item) em paralelo e devolve (item, resultado) conforme terminam.
+        A ordem de saída não é garantida. Em caso de erro o resultado é None.
+        `itens` pode ser uma FilaDeTrabalho que recebe novos itens durante a execução.
+
+        Se o consumidor parar no meio (cancelamento, exceção, close()), as tarefas
+        ainda não iniciadas são descartadas e não se espera pelas que estão
+        rodando: cada uma termina sozinha o arquivo que está lendo. Com
+        `cancelamento`, o token é conferido também enquanto nenhum resultado chega.
+        """
+        iterador = iter(itens)
+        pendentes = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        concluido = False
+        try:
+            while True:
+                # Enche a fila até o limite, sem consumir a entrada inteira
+                for item in iterador:
+                    pendentes[executor.submit(func, item)] = item
+                    if len(pendentes) >= self.max_pendentes:
+                        break
+
+                if not pendentes:
+                    concluido = True
+                    return
+
+                concluidas = ()
+                while not concluidas:
+                    if cancelamento:
+                        cancelamento.verificar()
+                    concluidas, _ = wait(pendentes, timeout=INTERVALO_CANCELAMENTO if cancelamento else None,
+                                         return_when=FIRST_COMPLETED)
+                for future in concluidas:
+                    item = pendentes.pop(future)
+                    try:
+                        yield item, future.result()
+                    except Exception as e:
+                        self.log(f"❌ Erro ao calcular hash de {item}: {e}")
+                        yield item, None
+        finally:
+            executor.shutdown(wait=concluido, cancel_futures=True)
+
+def medir_desempenho(tamanho_mb: int = 256, pasta: str = None) -> Dict[str, float]:
+    """
+    Micro-benchmark: mede MB/s de cada algoritmo com leitura via mmap e via buffer.
+    Usa um arquivo temporário; depois da 1ª leitura ele está no cache do sistema,
+    então o resultado reflete principalmente o custo de CPU do hash.
+    """
+    resultados: Dict[str, float] = {}
+    with tempfile.NamedTemporaryFile(dir=pasta, delete=False) as temp:
+        for _ in range(tamanho_mb):
+            temp.write(os.urandom(1024 * 1024))
+        caminho = temp.name
+
+    try:
+        engine = HashEngine(max_workers=1)
+        for algoritmo, construtor in ALGORITMOS.items():
+            for modo, usar_mmap in (("mmap", True), ("buffer", False)):
+                hasher = construtor()
+                inicio = time.perf_counter()
+                with open(caminho, 'rb') as afile:
+                    engine._ler_para_hasher(afile, hasher, usar_mmap=usar_mmap)
+                hasher.hexdigest()
+                resultados[f"{algoritmo}/{modo}"] = tamanho_mb / (time.perf_counter() - inicio)
+    finally:
+        os.remove(caminho)
+
+    return resultados
+
+# Benchmark local: python -m src.utils.hash_engine
+if __name__ == "__main__":
+    print("=== Desempenho dos algoritmos de hash (MB/s) ===")
+    for backend, mb_s in sorted(medir_desempenho().items(), key=lambda x: -x[1]):
+        print(f"{backend:<20} {mb_s:>10.1f} MB/s")
@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+import psutil
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Sistemas de arquivos de rede: leitura mais espaçada e sujeita a travar
+TIPOS_REMOTOS = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "sshfs", "fuse.sshfs", "9p", "afpfs", "webdav", "davfs"}
+# Sistemas virtuais/somente leitura que nunca "enchem" de verdade
+TIPOS_IGNORADOS = {
+    "squashfs", "iso9660", "udf", "tmpfs", "devtmpfs", "overlay", "ramfs", "proc", "sysfs",
+    "devpts", "cgroup", "cgroup2", "pstore", "bpf", "debugfs", "tracefs", "securityfs", "configfs",
+    "fusectl", "mqueue", "hugetlbfs", "autofs", "binfmt_misc", "efivarfs", "nsfs", "rpc_pipefs",
+    "selinuxfs", "nfsd", "fuse.lxcfs", "fuse.gvfsd-fuse", "fuse.portal", "devfs", "nullfs",
+}
+# Locais cujo "dispositivo" não é um caminho em /dev (ex.: "rpool/ROOT")
+TIPOS_SEM_DISPOSITIVO = {"zfs"}
+TAMANHO_MINIMO_GB = 1.0  # Partições menores (ex.: /boot/efi) não entram no score
+
+class UsoVolume(NamedTuple):
+    percentual: float        # % usado
+    livre_gb: float
+    total_gb: float
+    ponto: str               # Ponto de montagem (ex.: "/", "D:\\")
+    tipo: str                # Sistema de arquivos
+    remoto: bool
+    medido_em: float         # time.monotonic() da leitura
+
+class MonitorVolumes:
+    """
+    Uso de todas as partições montadas (psutil.disk_partitions).
+
+    Cada volume tem seu próprio intervalo de leitura (locais: intervalo_local,
+    rede: intervalo_remoto) e o último resultado fica em cache; medir() só lê
+    de novo os volumes vencidos. Cada leitura roda numa thread daemon própria e
+    medir() espera no máximo `tempo_limite` segundos: um compartilhamento de
+    rede travado continua aparecendo com o último valor conhecido (ou some, se
+    nunca respondeu) sem segurar o coletor. Enquanto a leitura travada não
+    voltar, o volume não recebe outra.
+    """
+
+    def __init__(self, intervalo_local: float = 30.0, intervalo_remoto: float = 300.0,
+                 intervalo_particoes: float = 300.0, tempo_limite: float = 2.0, logger_callback=None):
+        self.log = logger_callback if logger_callback else print
+        self.intervalo_local = intervalo_local
+        self.intervalo_remoto = intervalo_remoto
+        self.intervalo_particoes = intervalo_particoes
+        self.tempo_limite = tempo_limite
+
+        self._particoes: List[Tuple[str, str, bool]] = []  # (ponto, tipo, remoto)
+        self._proxima_listagem = 0.0
+        self._cache: Dict[str, UsoVolume] = {}
+        self._pendentes: Dict[str, Tuple[threading.Thread, dict]] = {}
+        self._lentos = set()  # Volumes já avisados como lentos
+        self.ultima_medicao: Tuple[UsoVolume, ...] = ()  # Resultado do último medir(), para leitura de outras threads
+
+    def particoes(self) -> List[Tuple[str, str, bool]]:
+        """Partições relevantes, relistadas a cada `intervalo_particoes` (pendrives, unidades mapeadas...)."""
+        if time.monotonic() < self._proxima_listagem:
+            return self._particoes
+        self._proxima_listagem = time.monotonic() + self.intervalo_particoes
+
+        particoes = []
+        vistos = set()
+        try:
+            # all=True: no Linux, all=False esconde os sistemas sem dispositivo (nodev),
+            # o que inclui NFS, CIFS e SSHFS. Os virtuais são filtrados aqui.
+            for p in psutil.disk_partitions(all=True):
+                tipo = p.fstype.lower()
+                opcoes = p.opts.split(",")
+                remoto = tipo in TIPOS_REMOTOS or "remote" in opcoes
+                # Leitor de CD/DVD vazio no Windows aparece sem fstype; somente leitura nunca enche
+                if not tipo or tipo in TIPOS_IGNORADOS or "cdrom" in opcoes or "ro" in opcoes:
+                    continue
+                # Fora do Windows, um volume local de verdade vem de um dispositivo em /dev
+                if not (remoto or os.name == 'nt' or p.device.startswith("/") or tipo in TIPOS_SEM_DISPOSITIVO):
+                    continue
+                # Bind mounts e subvolumes (btrfs) repetem o mesmo dispositivo em outros pontos:
+                # fica só o primeiro. Compartilhamentos diferentes podem vir do mesmo servidor.
+                chave = (p.device, p.mountpoint) if remoto else p.device
+                if chave in vistos:
+                    continue
+                vistos.add(chave)
+                particoes.append((p.mountpoint, tipo, remoto))
+        except Exception as e:
+            self.log(f"Erro ao listar partições: {e}")
+
+        if not particoes:
+            particoes.append(("C:\\" if os.name == 'nt' else "/", "", False))
+        self._particoes = particoes
+        return particoes
+
+    def medir(self) -> Tuple[UsoVolume, ...]:
+        """Volumes conhecidos, do mais cheio para o mais vazio, lendo de novo só os vencidos."""
+        particoes = self.particoes()
+        agora = time.monotonic()
+        novas = []
+
+        for ponto, tipo, remoto in particoes:
+            if ponto in self._pendentes:
+                continue
+            anterior = self._cache.get(ponto)
+            intervalo = self.intervalo_remoto if remoto else self.intervalo_local
+            if anterior is None or agora - anterior.medido_em >= intervalo:
+                self._pendentes[ponto] = self._iniciar_leitura(ponto)
+                novas.append(self._pendentes[ponto][0])
+
+        # Espera as leituras novas juntas, com um único prazo; as que já
+        # estavam travadas de passagens anteriores não são esperadas de novo
+        prazo = time.monotonic() + self.tempo_limite
+        for thread in novas:
+            thread.join(max(0.0, prazo - time.monotonic()))
+
+        tipos = {ponto: (tipo, remoto) for ponto, tipo, remoto in particoes}
+        for ponto, (thread, resultado) in list(self._pendentes.items()):
+            if thread.is_alive():
+                if ponto not in self._lentos:
+                    self._lentos.add(ponto)
+                    self.log(f"Volume {ponto} não respondeu em {self.tempo_limite:g}s; usando a última leitura.")
+                continue
+            del self._pendentes[ponto]
+            self._lentos.discard(ponto)
+
+            if ponto not in tipos:
+                continue  # Desmontado enquanto era lido
+            if "erro" in resultado:
+                self._cache.pop(ponto, None)
+                continue
+            uso = resultado["uso"]
+            if uso.total <= 0:
+                continue
+            tipo, remoto = tipos[ponto]
+            self._cache[ponto] = UsoVolume(
+                percentual=(uso.total - uso.free) / uso.total * 100,
+                livre_gb=uso.free / (1024**3),
+                total_gb=uso.total / (1024**3),
+                ponto=ponto, tipo=tipo, remoto=remoto,
+                medido_em=time.monotonic(),
+            )
+
+        for ponto in [p for p in self._cache if p not in tipos]:
+            del self._cache[ponto]
+
+        self.ultima_medicao = tuple(sorted(self._cache.values(), key=lambda v: v.percentual, reverse=True))
+        return self.ultima_medicao
+
+    @staticmethod
+    def mais_cheio(volumes: Tuple[UsoVolume, ...]) -> Optional[UsoVolume]:
+        """Volume que pesa no score: o mais cheio entre os que não são minúsculos."""
+        relevantes = [v for v in volumes if v.total_gb >= TAMANHO_MINIMO_GB] or list(volumes)
+        return max(relevantes, key=lambda v: v.percentual, default=None)
+
+    def _iniciar_leitura(self, ponto: str) -> Tuple[threading.Thread, dict]:
+        resultado = {}
+
+        def ler():
+            try:
+                resultado["uso"] = psutil.disk_usage(ponto)
+            except Exception as e:
+                resultado["erro"] = e
+
+        # Daemon: uma leitura travada num compartilhamento de rede não impede o programa de fechar
+        thread = threading.Thread(target=ler, name=f"Volume {ponto}", daemon=True)
+        thread.start()
+        return thread, resultado
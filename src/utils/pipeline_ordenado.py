@@ -0,0 +1,65 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+def trabalhadores_padrao() -> int:
+    """Um trabalhador por núcleo (mínimo 2, para sobrepor leitura e processamento)."""
+    return max(2, os.cpu_count() or 2)
+
+def processar_em_ordem(itens: Iterable[Tuple],
+                       transformar: Callable[..., Any],
+                       escrever: Callable[[Any], None],
+                       trabalhadores: Optional[int] = None,
+                       em_voo: Optional[int] = None):
+    """
+    Pipeline de três estágios com saída na mesma ordem da entrada.
+
+    - Leitura: a thread chamadora percorre `itens` (ex.: blocos lidos do disco).
+    - Processamento: transformar(*item) roda num pool de `trabalhadores` threads.
+    - Escrita: uma thread própria chama escrever(resultado) na ordem original.
+
+    No máximo `em_voo` itens ficam entre a leitura e a escrita (a fila é
+    limitada), então a memória não depende do tamanho da entrada. Se algum
+    estágio falhar, a leitura para, o que já estava em voo é descartado e a
+    exceção é relançada aqui.
+
+    Com trabalhadores=1 não há o que sobrepor: tudo roda na thread chamadora,
+    sem criar threads (útil quando quem chama já paraleliza em outro nível).
+    """
+    trabalhadores = trabalhadores or trabalhadores_padrao()
+    if trabalhadores == 1:
+        for item in itens:
+            escrever(transformar(*item))
+        return
+
+    fila = queue.Queue(maxsize=em_voo or 2 * trabalhadores)
+    falhas = []
+
+    def escritor():
+        while True:
+            futuro = fila.get()
+            if futuro is None:
+                return
+            if falhas:
+                continue  # Só esvazia a fila para a leitura não ficar bloqueada
+            try:
+                escrever(futuro.result())
+            except BaseException as e:
+                falhas.append(e)
+
+    thread = threading.Thread(target=escritor, name="PipelineEscrita", daemon=True)
+    thread.start()
+    try:
+        with ThreadPoolExecutor(max_workers=trabalhadores) as pool:
+            for item in itens:
+                if falhas:
+                    break
+                fila.put(pool.submit(transformar, *item))
+    finally:
+        fila.put(None)
+        thread.join()
+
+    if falhas:
+        raise falhas[0]
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+from collections import deque
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional
+
+INTERVALO_AMOSTRA = 1800     # Segundos entre amostras de cada volume (30 min)
+JANELA_AMOSTRAS = 336        # Amostras na janela da tendência (7 dias)
+MINIMO_AMOSTRAS = 6          # Menos que isso não dá tendência confiável
+MINIMO_DIAS = 0.25           # Nem um intervalo menor que 6 h
+SEGUNDOS_DIA = 86400.0
+
+class TendenciaLinear:
+    """
+    Reta de mínimos quadrados (y = a + b·t) sobre uma janela deslizante.
+
+    Guarda só as somas Σt, Σy, Σt², Σty: cada amostra nova soma seus termos
+    e a que sai da janela subtrai os dela, então atualizar e consultar a reta
+    custam O(1). Os tempos são relativos a uma origem que é trazida para a
+    amostra mais antiga a cada volta completa da janela (somas recalculadas,
+    custo amortizado O(1)); assim os valores não crescem e não acumulam erro.
+    """
+
+    def __init__(self, janela: int = JANELA_AMOSTRAS):
+        self.amostras = deque()
+        self.janela = janela
+        self._origem = None
+        self._desde_recalculo = 0
+        self._n = 0
+        self._st = self._sy = self._stt = self._sty = 0.0
+
+    def adicionar(self, t: float, y: float):
+        if self._origem is None:
+            self._origem = t
+        if len(self.amostras) == self.janela:
+            self._somar(*self.amostras.popleft(), sinal=-1)
+        self.amostras.append((t, y))
+        self._somar(t, y, sinal=1)
+
+        self._desde_recalculo += 1
+        if self._desde_recalculo >= self.janela:
+            self._recalcular()
+
+    def _somar(self, t: float, y: float, sinal: int):
+        t -= self._origem
+        self._n += sinal
+        self._st += sinal * t
+        self._sy += sinal * y
+        self._stt += sinal * t * t
+        self._sty += sinal * t * y
+
+    def _recalcular(self):
+        self._origem = self.amostras[0][0]
+        self._desde_recalculo = 0
+        self._n = 0
+        self._st = self._sy = self._stt = self._sty = 0.0
+        for t, y in self.amostras:
+            self._somar(t, y, sinal=1)
+
+    @property
+    def duracao(self) -> float:
+        return self.amostras[-1][0] - self.amostras[0][0] if self.amostras else 0.0
+
+    def inclinacao(self) -> Optional[float]:
+        """b (unidades de y por unidade de t), ou None se não houver variação em t."""
+        denominador = self._n * self._stt - self._st * self._st
+        if self._n < 2 or denominador <= 0:
+            return None
+        return (self._n * self._sty - self._st * self._sy) / denominador
+
+class PrevisaoVolume(NamedTuple):
+    ponto: str
+    gb_por_dia: float               # Ritmo de crescimento do espaço usado
+    dias_ate_encher: Optional[float]  # None = não está crescendo
+
+class PrevisorVolumes:
+    """
+    Estimativa de quando cada volume vai encher, a partir do espaço usado ao longo do tempo.
+
+    registrar() é chamado a cada leitura de disco, mas cada volume só ganha uma
+    amostra a cada INTERVALO_AMOSTRA segundos. As amostras ficam em
+    logs/previsao_disco.json, então a tendência sobrevive ao fechamento do programa.
+    """
+
+    def __init__(self, caminho: str = "logs/previsao_disco.json", logger_callback=None):
+        self.log = logger_callback if logger_callback else print
+        self.caminho = caminho
+        self.tendencias: Dict[str, TendenciaLinear] = {}
+        self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return
+        limite = time.time() - JANELA_AMOSTRAS * INTERVALO_AMOSTRA
+        for ponto, amostras in dados.items():
+            tendencia = self.tendencias[ponto] = TendenciaLinear()
+            for t, y in amostras:
+                if t >= limite:
+                    tendencia.adicionar(t, y)
+
+    def salvar(self):
+        """
+        Gravação atômica das amostras (chamada junto com o histórico de métricas).
+        Volumes sem amostra dentro da janela (ex.: pendrive que não voltou) são esquecidos.
+        """
+        limite = time.time() - JANELA_AMOSTRAS * INTERVALO_AMOSTRA
+        self.tendencias = {p: t for p, t in self.tendencias.items() if t.amostras and t.amostras[-1][0] >= limite}
+        try:
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+            temporario = self.caminho + ".tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump({p: list(t.amostras) for p, t in self.tendencias.items()}, f)
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            self.log(f"Erro ao salvar previsão de disco: {e}")
+
+    def registrar(self, momento: float, volumes: Iterable) -> bool:
+        """Recebe os UsoVolume da última leitura. Retorna se alguma amostra nova entrou."""
+        novas = False
+        for v in volumes:
+            tendencia = self.tendencias.setdefault(v.ponto, TendenciaLinear())
+            if tendencia.amostras and momento - tendencia.amostras[-1][0] < INTERVALO_AMOSTRA:
+                continue
+            tendencia.adicionar(momento, v.total_gb - v.livre_gb)
+            novas = True
+        return novas
+
+    def prever(self, volumes: Iterable) -> Mapping[str, PrevisaoVolume]:
+        """Previsão para cada volume com amostras suficientes."""
+        previsoes = {}
+        for v in volumes:
+            tendencia = self.tendencias.get(v.ponto)
+            if (tendencia is None or len(tendencia.amostras) < MINIMO_AMOSTRAS
+                    or tendencia.duracao < MINIMO_DIAS * SEGUNDOS_DIA):
+                continue
+            inclinacao = tendencia.inclinacao()
+            if inclinacao is None:
+                continue
+            gb_por_dia = inclinacao * SEGUNDOS_DIA
+            dias = v.livre_gb / gb_por_dia if gb_por_dia > 0 else None
+            previsoes[v.ponto] = PrevisaoVolume(v.ponto, gb_por_dia, dias)
+        return previsoes
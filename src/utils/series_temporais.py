@@ -0,0 +1,168 @@
+import os
+import time
+import atexit
+import sqlite3
+import threading
+from array import array
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+# Janelas de histórico: nome -> (resolução em segundos, quantidade de pontos)
+JANELAS: Dict[str, Tuple[int, int]] = {
+    "hora": (10, 360),      # 1 ponto a cada 10 s na última hora
+    "dia": (300, 288),      # 1 ponto a cada 5 min nas últimas 24 h
+    "semana": (1800, 336),  # 1 ponto a cada 30 min nos últimos 7 dias
+}
+JANELAS_PERSISTIDAS = ("dia", "semana")  # A janela de 1 h vive só em memória
+
+class SerieCircular:
+    """
+    Série temporal de resolução fixa num buffer circular.
+
+    Cada posição guarda a soma e a quantidade de amostras de um intervalo
+    (slot = momento // resolução); o valor do ponto é a média. Quando o tempo
+    dá a volta no buffer, o slot antigo é sobrescrito, então a memória é
+    constante não importa quanto tempo o programa fique aberto.
+    """
+
+    def __init__(self, resolucao: int, capacidade: int):
+        self.resolucao = resolucao
+        self.capacidade = capacidade
+        self._slots = array('q', [-1]) * capacidade
+        self._soma = array('d', [0.0]) * capacidade
+        self._contagem = array('L', [0]) * capacidade
+
+    def registrar(self, momento: float, valor: float) -> int:
+        """Acumula a amostra no slot do momento. Retorna o slot."""
+        slot = int(momento // self.resolucao)
+        i = slot % self.capacidade
+        if slot < self._slots[i]:
+            return slot  # Amostra mais velha que a janela: já foi sobrescrita
+        if self._slots[i] != slot:
+            self._slots[i] = slot
+            self._soma[i] = 0.0
+            self._contagem[i] = 0
+        self._soma[i] += valor
+        self._contagem[i] += 1
+        return slot
+
+    def restaurar(self, slot: int, soma: float, contagem: int):
+        """Recoloca um slot lido do banco (ao abrir o programa)."""
+        i = slot % self.capacidade
+        if slot >= self._slots[i]:
+            self._slots[i] = slot
+            self._soma[i] = soma
+            self._contagem[i] = contagem
+
+    def dados_do_slot(self, slot: int) -> Optional[Tuple[float, int]]:
+        i = slot % self.capacidade
+        if self._slots[i] != slot:
+            return None
+        return self._soma[i], self._contagem[i]
+
+    def valores(self, agora: float) -> Tuple[Optional[float], ...]:
+        """Médias da janela que termina em `agora`, da mais antiga à mais recente (None = sem amostra)."""
+        ultimo = int(agora // self.resolucao)
+        resultado = []
+        for slot in range(ultimo - self.capacidade + 1, ultimo + 1):
+            i = slot % self.capacidade
+            if self._slots[i] == slot and self._contagem[i]:
+                resultado.append(self._soma[i] / self._contagem[i])
+            else:
+                resultado.append(None)
+        return tuple(resultado)
+
+class ArmazemMetricas:
+    """
+    Histórico das métricas do sistema (CPU, RAM, disco...) em várias resoluções.
+
+    Cada amostra entra em todas as janelas de JANELAS; as janelas de 5 min e
+    30 min são gravadas no SQLite (database/metricas.db), de modo que o gráfico
+    de 24 h / 7 dias sobrevive ao fechamento do programa. O banco também é
+    limitado: slots fora da janela são apagados a cada gravação.
+    """
+
+    def __init__(self, metricas: Iterable[str], db_path: str = "database/metricas.db", logger_callback=None):
+        self.log = logger_callback if logger_callback else print
+        self.metricas = tuple(metricas)
+        self.db_path = db_path
+        self.series: Dict[Tuple[str, str], SerieCircular] = {
+            (m, janela): SerieCircular(resolucao, capacidade)
+            for m in self.metricas for janela, (resolucao, capacidade) in JANELAS.items()
+        }
+
+        self._lock = threading.Lock()
+        self._sujos = set()  # (métrica, janela, slot) ainda não gravados
+        self._inicializar_db()
+        self._carregar()
+        atexit.register(self.salvar)
+
+    def _inicializar_db(self):
+        """Cria a tabela de rollups se não existir"""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS rollups (
+                metrica TEXT NOT NULL,
+                resolucao INTEGER NOT NULL,
+                slot INTEGER NOT NULL,
+                soma REAL NOT NULL,
+                contagem INTEGER NOT NULL,
+                PRIMARY KEY (metrica, resolucao, slot)
+            )
+        ''')
+        self.conn.commit()
+
+    def _carregar(self):
+        """Recupera do banco o histórico ainda dentro das janelas persistidas."""
+        agora = time.time()
+        for janela in JANELAS_PERSISTIDAS:
+            resolucao, capacidade = JANELAS[janela]
+            inicio = int(agora // resolucao) - capacidade + 1
+            linhas = self.conn.execute(
+                "SELECT metrica, slot, soma, contagem FROM rollups WHERE resolucao = ? AND slot >= ?",
+                (resolucao, inicio)
+            ).fetchall()
+            for metrica, slot, soma, contagem in linhas:
+                serie = self.series.get((metrica, janela))
+                if serie:
+                    serie.restaurar(slot, soma, contagem)
+
+    def registrar(self, momento: float, valores: Mapping[str, Optional[float]]):
+        """Adiciona uma amostra de cada métrica (valores None são ignorados)."""
+        with self._lock:
+            for metrica, valor in valores.items():
+                if valor is None or metrica not in self.metricas:
+                    continue
+                for janela in JANELAS:
+                    slot = self.series[(metrica, janela)].registrar(momento, valor)
+                    if janela in JANELAS_PERSISTIDAS:
+                        self._sujos.add((metrica, janela, slot))
+
+    def historico(self, agora: float = None) -> Mapping[Tuple[str, str], Tuple[Optional[float], ...]]:
+        """Cópia imutável de todas as séries: {(métrica, janela): valores}."""
+        agora = agora or time.time()
+        with self._lock:
+            return MappingProxyType({chave: serie.valores(agora) for chave, serie in self.series.items()})
+
+    def salvar(self):
+        """Grava os slots alterados e apaga os que saíram das janelas."""
+        try:
+            with self._lock:
+                linhas = []
+                for metrica, janela, slot in self._sujos:
+                    dados = self.series[(metrica, janela)].dados_do_slot(slot)
+                    if dados:
+                        linhas.append((metrica, JANELAS[janela][0], slot, dados[0], dados[1]))
+                self._sujos.clear()
+
+                self.conn.executemany("INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?)", linhas)
+                agora = time.time()
+                for janela in JANELAS_PERSISTIDAS:
+                    resolucao, capacidade = JANELAS[janela]
+                    self.conn.execute("DELETE FROM rollups WHERE resolucao = ? AND slot < ?",
+                                      (resolucao, int(agora // resolucao) - capacidade + 1))
+                self.conn.commit()
+        except sqlite3.Error as e:
+            self.log(f">> Erro ao salvar histórico de métricas: {e}")
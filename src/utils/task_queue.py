@@ -1,7 +1,33 @@
 import threading
 from concurrent.futures import ThreadPoolExecutor
 import time
-from typing import Callable, Any, List
+from typing import Callable, Any, Dict, List
+
+class OperacaoCancelada(Exception):
+    """Lançada dentro de uma tarefa quando o usuário pede o cancelamento."""
+    pass
+
+class TokenCancelamento:
+    """
+    Sinal de cancelamento compartilhado entre a interface e uma tarefa longa.
+    A tarefa chama verificar() nos pontos seguros (entre arquivos, entre lotes);
+    a interface chama cancelar() (normalmente via TaskQueue.cancel_task).
+    """
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        self._evento.set()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento.is_set()
+
+    def verificar(self):
+        """Lança OperacaoCancelada se o cancelamento foi pedido."""
+        if self._evento.is_set():
+            raise OperacaoCancelada()
 
 class TaskQueue:
     """
@@ -24,6 +50,7 @@ class TaskQueue:
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.tasks: List[Any] = [] # Lista de Future objects
         self.task_id_counter = 0
+        self.tokens: Dict[int, TokenCancelamento] = {} # Tarefas canceláveis em andamento
         self.progress_callback: Callable[[int, str, str], None] = lambda id, status, msg: print(f"Task {id}: {status} - {msg}")
         self._initialized = True
 
@@ -35,12 +62,20 @@ class TaskQueue:
         """
         Submete uma função para ser executada em uma thread separada.
         Retorna o ID da tarefa.
+
+        Com cancelavel=True a função recebe o argumento `cancelamento`
+        (TokenCancelamento) e pode ser interrompida com cancel_task(id).
         """
         self.task_id_counter += 1
         task_id = self.task_id_counter
         
         # Nome da tarefa para exibição na interface
         task_name = kwargs.pop('task_name', f"Tarefa {task_id}")
+
+        if kwargs.pop('cancelavel', False):
+            token = TokenCancelamento()
+            self.tokens[task_id] = token
+            kwargs['cancelamento'] = token
         
         # Função wrapper para gerenciar o ciclo de vida da tarefa
         def task_wrapper():
@@ -49,9 +84,14 @@ class TaskQueue:
                 result = func(*args, **kwargs)
                 self.progress_callback(task_id, "CONCLUÍDA", f"{task_name} finalizada com sucesso.")
                 return result
+            except OperacaoCancelada:
+                self.progress_callback(task_id, "CANCELADA", f"{task_name} cancelada.")
+                return None
             except Exception as e:
                 self.progress_callback(task_id, "ERRO", f"{task_name} falhou: {e}")
                 raise e
+            finally:
+                self.tokens.pop(task_id, None)
         
         future = self.executor.submit(task_wrapper)
         self.tasks.append(future)
@@ -61,6 +101,14 @@ class TaskQueue:
         
         return task_id
 
+    def cancel_task(self, task_id: int) -> bool:
+        """Pede o cancelamento de uma tarefa cancelável. Retorna False se ela já terminou."""
+        token = self.tokens.get(task_id)
+        if token is None:
+            return False
+        token.cancelar()
+        return True
+
     def get_active_tasks(self) -> List[str]:
         """Retorna uma lista de strings com o status das tarefas ativas."""
         active_tasks = []
@@ -0,0 +1,137 @@
+import time
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+class VerificacaoSaude(NamedTuple):
+    """
+    Declaração de uma verificação do score de saúde.
+
+    - sonda: faz a leitura (roda numa thread própria, pode bloquear).
+    - avaliar: recebe o valor lido (None se a sonda falhou) e retorna
+      (texto, cor, fração do peso descontada do score, de 0 a 1).
+    - peso: pontos que a verificação pode tirar do score.
+    - intervalo: segundos entre leituras.
+    - orcamento: segundos que o coletor espera pela leitura; depois disso o
+      resultado anterior continua valendo, marcado como atrasado.
+    """
+    nome: str
+    rotulo: str
+    sonda: Callable[[], Any]
+    avaliar: Callable[[Any], Tuple[str, str, float]]
+    peso: int = 10
+    intervalo: float = 60.0
+    orcamento: float = 2.0
+
+class ResultadoVerificacao(NamedTuple):
+    nome: str
+    rotulo: str
+    valor: Any
+    texto: str
+    cor: str
+    pontos: float             # Pontos descontados do score
+    peso: int
+    medido_em: Optional[float]  # time.time() da última leitura concluída
+    atrasada: bool = False      # A leitura atual estourou o orçamento
+    erro: Optional[str] = None
+
+class RegistroVerificacoes:
+    """
+    Verificações de saúde registradas e seus últimos resultados.
+
+    executar() dispara, cada uma numa thread daemon, só as verificações
+    vencidas e espera cada uma no máximo pelo seu orçamento; como rodam ao
+    mesmo tempo, a espera total é a do maior orçamento, não a soma. Uma
+    leitura que estoura o orçamento não é repetida enquanto não terminar: o
+    resultado dela é recolhido numa chamada seguinte.
+    """
+
+    def __init__(self, logger_callback=None):
+        self.log = logger_callback if logger_callback else print
+        self._verificacoes: Dict[str, VerificacaoSaude] = {}
+        self._resultados: Dict[str, ResultadoVerificacao] = {}
+        self._em_andamento: Dict[str, Tuple[threading.Thread, dict, float]] = {}
+        self._proxima: Dict[str, float] = {}
+        self._publicado = MappingProxyType({})
+        self.versao = 0  # Muda sempre que algum resultado muda
+
+    def registrar(self, verificacao: VerificacaoSaude):
+        self._verificacoes[verificacao.nome] = verificacao
+        self._proxima[verificacao.nome] = 0.0
+
+    def executar(self, forcar: bool = False, escala: float = 1.0) -> Mapping[str, ResultadoVerificacao]:
+        """
+        Roda as verificações vencidas e retorna os resultados (somente leitura).
+        escala multiplica os intervalos (ex.: 0.5 = verificar com o dobro da frequência).
+        """
+        agora = time.monotonic()
+        novas = []
+        for nome, verificacao in self._verificacoes.items():
+            if nome in self._em_andamento:
+                continue
+            if forcar or agora >= self._proxima[nome]:
+                self._em_andamento[nome] = self._iniciar(verificacao)
+                novas.append(nome)
+
+        for nome in novas:
+            thread, _, inicio = self._em_andamento[nome]
+            thread.join(max(0.0, inicio + self._verificacoes[nome].orcamento - time.monotonic()))
+
+        alterou = False
+        for nome, (thread, resultado, inicio) in list(self._em_andamento.items()):
+            verificacao = self._verificacoes[nome]
+            if thread.is_alive():
+                anterior = self._resultados.get(nome)
+                if anterior is None or not anterior.atrasada:
+                    self.log(f"Verificação '{nome}' passou de {verificacao.orcamento:g}s; usando o último resultado.")
+                    self._resultados[nome] = self._atrasada(verificacao, anterior)
+                    alterou = True
+                continue
+
+            del self._em_andamento[nome]
+            self._proxima[nome] = time.monotonic() + verificacao.intervalo * escala
+            novo = self._avaliar(verificacao, resultado)
+            anterior = self._resultados.get(nome)
+            if anterior is None or anterior[:7] != novo[:7] or anterior.atrasada or anterior.erro != novo.erro:
+                alterou = True
+            self._resultados[nome] = novo
+
+        if alterou:
+            self.versao += 1
+            self._publicado = MappingProxyType(dict(self._resultados))
+        return self._publicado
+
+    def _iniciar(self, verificacao: VerificacaoSaude) -> Tuple[threading.Thread, dict, float]:
+        resultado = {}
+
+        def medir():
+            try:
+                resultado["valor"] = verificacao.sonda()
+            except Exception as e:
+                resultado["erro"] = e
+
+        thread = threading.Thread(target=medir, name=f"Verificacao {verificacao.nome}", daemon=True)
+        thread.start()
+        return thread, resultado, time.monotonic()
+
+    def _avaliar(self, verificacao: VerificacaoSaude, resultado: dict) -> ResultadoVerificacao:
+        valor = resultado.get("valor")
+        erro = None
+        if "erro" in resultado:
+            erro = f"Erro ao capturar {verificacao.nome}: {resultado['erro']}"
+            self.log(erro)
+        try:
+            texto, cor, fracao = verificacao.avaliar(valor)
+        except Exception as e:
+            erro = f"Erro ao avaliar {verificacao.nome}: {e}"
+            self.log(erro)
+            texto, cor, fracao = "❓ Erro", "gray", 0.0
+        return ResultadoVerificacao(verificacao.nome, verificacao.rotulo, valor, texto, cor,
+                                    verificacao.peso * fracao, verificacao.peso, time.time(), erro=erro)
+
+    def _atrasada(self, verificacao: VerificacaoSaude,
+                  anterior: Optional[ResultadoVerificacao]) -> ResultadoVerificacao:
+        if anterior is None:
+            return ResultadoVerificacao(verificacao.nome, verificacao.rotulo, None, "⏳ Medindo...", "gray",
+                                        0.0, verificacao.peso, None, atrasada=True)
+        return anterior._replace(atrasada=True)
@@ -0,0 +1,25 @@
+import os
+import pytest
+from src.modules.system_tools import SystemTools
+from src.utils.hash_engine import HashEngine
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    """Pasta temporária que também é o diretório atual (logs/ e database/ ficam nela)."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def ferramentas():
+    """SystemTools sem o HashCache em disco e com log silencioso."""
+    return SystemTools(logger_callback=lambda *_: None,
+                       hash_engine=HashEngine(max_workers=4, logger_callback=lambda *_: None))
+
+
+def escrever(caminho, dados: bytes):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "wb") as f:
+        f.write(dados)
+    return str(caminho)
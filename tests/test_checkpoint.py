@@ -0,0 +1,68 @@
+import os
+import json
+from src.utils.checkpoint import Checkpoint
+
+
+def _checkpoint(pasta, **kwargs):
+    return Checkpoint("teste", "chave", pasta=str(pasta / "checkpoints"), **kwargs)
+
+
+def test_salvar_e_carregar(pasta):
+    _checkpoint(pasta).salvar({"pendentes": [1, 2]}, forcar=True)
+    assert _checkpoint(pasta).carregar() == {"pendentes": [1, 2]}
+    assert not os.path.exists(_checkpoint(pasta).caminho + ".tmp")
+
+
+def test_salvar_respeita_intervalo(pasta):
+    checkpoint = _checkpoint(pasta, intervalo=3600)
+    assert not checkpoint.salvar({"n": 1})
+    assert checkpoint.salvar({"n": 2}, forcar=True)
+    assert not checkpoint.salvar({"n": 3})
+    assert _checkpoint(pasta).carregar() == {"n": 2}
+
+
+def test_checkpoint_vencido_ou_de_outra_chave_e_descartado(pasta):
+    checkpoint = _checkpoint(pasta, validade=60)
+    checkpoint.salvar({"n": 1}, forcar=True)
+    with open(checkpoint.caminho, encoding="utf-8") as f:
+        dados = json.load(f)
+    dados["salvo_em"] -= 120
+    with open(checkpoint.caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f)
+
+    assert checkpoint.carregar() is None
+    assert not os.path.exists(checkpoint.caminho)
+
+    checkpoint.salvar({"n": 1}, forcar=True)
+    outro = Checkpoint("teste", "outra", pasta=str(pasta / "checkpoints"))
+    outro.caminho = checkpoint.caminho  # Colisão de nome de arquivo
+    assert outro.carregar() is None
+
+
+def test_falha_na_gravacao_preserva_o_checkpoint_anterior(pasta):
+    checkpoint = _checkpoint(pasta)
+    checkpoint.salvar({"n": 1}, forcar=True)
+    try:
+        checkpoint.salvar({"n": object()}, forcar=True)  # Não serializável: falha no meio do json.dump
+    except TypeError:
+        pass
+    assert _checkpoint(pasta).carregar() == {"n": 1}
+
+
+def test_diario_de_anotacoes(pasta):
+    checkpoint = _checkpoint(pasta)
+    checkpoint.salvar({"n": 0}, forcar=True)
+    checkpoint.anotar({"passo": 1})
+    checkpoint.anotar({"passo": 2})
+    checkpoint.fechar()
+    with open(checkpoint.caminho_diario, "a", encoding="utf-8") as f:
+        f.write('{"passo": 3')  # Linha cortada por uma queda
+
+    assert _checkpoint(pasta).anotacoes() == [{"passo": 1}, {"passo": 2}]
+
+    checkpoint.salvar({"n": 2}, forcar=True)  # Estado novo já inclui as anotações
+    assert _checkpoint(pasta).anotacoes() == []
+
+    checkpoint.anotar({"passo": 3})
+    checkpoint.remover()
+    assert not os.path.exists(checkpoint.caminho) and not os.path.exists(checkpoint.caminho_diario)
@@ -0,0 +1,69 @@
+import os
+import pyzipper
+import pytest
+from src.modules.security import SecurityTools
+from src.utils import compressao_cofre
+from src.utils.compressao_cofre import PRESETS_COFRE, TAMANHO_AMOSTRA, vale_comprimir
+from tests.conftest import escrever
+
+SENHA = "senha-do-cofre"
+
+
+def _texto(tamanho):
+    linhas = b"".join(b"linha %d: o rato roeu a roupa do rei de Roma\n" % i for i in range(tamanho // 40 + 1))
+    return linhas[:tamanho]
+
+
+@pytest.fixture
+def pasta_alvo(pasta, monkeypatch):
+    # Limite baixo para o caminho "comprimido pelo escritor" rodar sem arquivos enormes
+    monkeypatch.setattr(compressao_cofre, "LIMITE_EM_MEMORIA", 256 * 1024)
+    alvo = pasta / "documentos"
+    conteudos = {
+        "pequeno.txt": _texto(5000),
+        "grande.txt": _texto(600 * 1024),
+        "aleatorio.bin": os.urandom(300 * 1024),
+        "foto.jpg": _texto(5000),  # Extensão já comprimida: gravada como está
+        "sub/vazio.txt": b"",
+    }
+    for nome, dados in conteudos.items():
+        escrever(alvo / nome, dados)
+    return alvo, conteudos
+
+
+def _abrir_cofre(caminho):
+    with pyzipper.AESZipFile(caminho) as zf:
+        zf.setpassword(SENHA.encode())
+        return {i.filename.split("/", 1)[1]: (zf.read(i), i.compress_type, i.compress_size) for i in zf.infolist()}
+
+
+@pytest.mark.parametrize("preset", list(PRESETS_COFRE))
+def test_cofre_abre_com_o_conteudo_original(pasta_alvo, preset):
+    alvo, conteudos = pasta_alvo
+    assert SecurityTools(logger_callback=lambda *_: None).criar_pasta_cofre(str(alvo), SENHA, preset=preset,
+                                                                            trabalhadores=2)
+    membros = _abrir_cofre(f"{alvo}_COFRE.zip")
+
+    assert {nome: dados for nome, (dados, _, _) in membros.items()} == conteudos
+    assert membros["foto.jpg"][1] == membros["aleatorio.bin"][1] == pyzipper.ZIP_STORED
+    assert membros["pequeno.txt"][1] == membros["grande.txt"][1] == PRESETS_COFRE[preset].compressao
+
+
+def test_nivel_do_preset_vale_tambem_para_arquivos_grandes(pasta_alvo):
+    alvo, _ = pasta_alvo
+    ferramenta = SecurityTools(logger_callback=lambda *_: None)
+    tamanhos = {}
+    for preset in ("rapido", "equilibrado"):
+        ferramenta.criar_pasta_cofre(str(alvo), SENHA, preset=preset)
+        tamanhos[preset] = _abrir_cofre(f"{alvo}_COFRE.zip")["grande.txt"][2]
+        os.remove(f"{alvo}_COFRE.zip")
+    assert tamanhos["equilibrado"] < tamanhos["rapido"]
+
+
+def test_amostra_do_meio_e_do_fim(pasta):
+    preset = PRESETS_COFRE["equilibrado"]
+    # Cabeçalho de texto na frente de dados aleatórios: só a amostra do início diria que comprime
+    disfarcado = escrever(pasta / "dados.bin", _texto(TAMANHO_AMOSTRA) + os.urandom(20 * TAMANHO_AMOSTRA))
+    texto = escrever(pasta / "log.txt", _texto(20 * TAMANHO_AMOSTRA))
+    assert not vale_comprimir(disfarcado, preset)
+    assert vale_comprimir(texto, preset)
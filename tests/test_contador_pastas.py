@@ -0,0 +1,15 @@
+from src.modules.monitor import MonitorSistema
+from src.utils.contador_pastas import ContadorPastas
+from tests.conftest import escrever
+
+
+def test_so_arquivos_temporarios_contam(pasta):
+    raiz = pasta / "temp"
+    escrever(raiz / "instalador.tmp", b"x" * 10)
+    escrever(raiz / "sub" / "navegador.CACHE", b"x" * 20)
+    escrever(raiz / "sub" / "tmpa1b2c3", b"x" * 30)
+    escrever(raiz / "foto.jpg", b"x" * 1000)
+    escrever(raiz / "sub" / "relatorio.pdf", b"x" * 1000)
+
+    contador = ContadorPastas(filtro=MonitorSistema._is_temp_file, logger_callback=lambda *_: None)
+    assert contador.medir([str(raiz)]) == (60, 3)
@@ -0,0 +1,133 @@
+import os
+import pytest
+from src.modules.system_tools import BLOCO_PARCIAL, TAMANHO_MINIMO
+from src.utils.task_queue import OperacaoCancelada, TokenCancelamento
+from tests.conftest import escrever
+
+
+def _grupos(ferramentas, raiz, **kwargs):
+    return sorted(sorted(os.path.basename(p) for p in grupo)
+                  for _, grupo in ferramentas.iterar_duplicados(str(raiz), **kwargs))
+
+
+def _interromper_apos_primeiro_grupo(ferramentas, raiz):
+    token = TokenCancelamento()
+    encontrados = []
+    with pytest.raises(OperacaoCancelada):
+        for _, grupo in ferramentas.iterar_duplicados(str(raiz), token):
+            encontrados.append(grupo)
+            token.cancelar()
+    return encontrados
+
+
+@pytest.fixture
+def dois_pares(pasta):
+    """a1 = a2 e b1 = b2, todos de 200 KB, com o primeiro bloco diferente entre os pares."""
+    raiz = pasta / "dados"
+    for par in ("a", "b"):
+        conteudo = os.urandom(200 * 1024)
+        escrever(raiz / f"{par}1", conteudo)
+        escrever(raiz / f"{par}2", conteudo)
+    return raiz
+
+
+def test_tamanho_unico_nunca_e_lido(pasta, ferramentas, monkeypatch):
+    escrever(pasta / "a", b"x" * 5000)
+    escrever(pasta / "b", b"x" * 6000)
+    lidos = []
+    monkeypatch.setattr(ferramentas, "_hash_parcial", lambda p, *a, **k: lidos.append(p))
+    monkeypatch.setattr(ferramentas, "_hash_file", lambda p: lidos.append(p))
+
+    assert _grupos(ferramentas, pasta) == []
+    assert lidos == []
+
+
+def test_arquivos_pequenos_ignorados(pasta, ferramentas):
+    escrever(pasta / "a", b"x" * TAMANHO_MINIMO)
+    escrever(pasta / "b", b"x" * TAMANHO_MINIMO)
+    assert _grupos(ferramentas, pasta) == []
+
+
+def test_pequenos_resolvidos_so_com_hash_parcial(pasta, ferramentas, monkeypatch):
+    conteudo = os.urandom(2 * BLOCO_PARCIAL)
+    escrever(pasta / "a", conteudo)
+    escrever(pasta / "sub" / "b", conteudo)
+    escrever(pasta / "c", os.urandom(2 * BLOCO_PARCIAL))
+    completos = []
+    monkeypatch.setattr(ferramentas, "_hash_file", lambda p: completos.append(p))
+
+    assert _grupos(ferramentas, pasta) == [["a", "b"]]
+    assert completos == []
+
+
+def test_hash_completo_separa_meio_diferente(pasta, ferramentas):
+    inicio, fim = os.urandom(BLOCO_PARCIAL), os.urandom(BLOCO_PARCIAL)
+    escrever(pasta / "a", inicio + b"1" * 100_000 + fim)
+    escrever(pasta / "b", inicio + b"1" * 100_000 + fim)
+    escrever(pasta / "c", inicio + b"2" * 100_000 + fim)  # Mesmo parcial, conteúdo diferente
+
+    assert _grupos(ferramentas, pasta) == [["a", "b"]]
+
+
+def test_hash_completo_so_para_quem_colide_no_parcial(pasta, ferramentas, monkeypatch):
+    tamanho = 3 * BLOCO_PARCIAL
+    igual = os.urandom(tamanho)
+    escrever(pasta / "a", igual)
+    escrever(pasta / "b", igual)
+    escrever(pasta / "c", os.urandom(tamanho))
+    completos = []
+    original = ferramentas._hash_file
+    monkeypatch.setattr(ferramentas, "_hash_file", lambda p: completos.append(p) or original(p))
+
+    assert _grupos(ferramentas, pasta) == [["a", "b"]]
+    assert sorted(os.path.basename(p) for p in completos) == ["a", "b"]
+
+
+def test_busca_concluida_remove_checkpoint(pasta, ferramentas):
+    igual = os.urandom(5000)
+    escrever(pasta / "dados" / "a", igual)
+    escrever(pasta / "dados" / "b", igual)
+
+    assert _grupos(ferramentas, pasta / "dados") == [["a", "b"]]
+    assert not os.listdir(pasta / "logs" / "checkpoints")
+
+
+def test_retomada_nao_repete_grupo_de_tamanho_pendente(dois_pares, ferramentas):
+    assert len(_interromper_apos_primeiro_grupo(ferramentas, dois_pares)) == 1
+    assert _grupos(ferramentas, dois_pares) == [["a1", "a2"], ["b1", "b2"]]
+
+
+def test_retomada_usa_checkpoint_sem_varrer_de_novo(dois_pares, ferramentas, monkeypatch):
+    _interromper_apos_primeiro_grupo(ferramentas, dois_pares)
+    monkeypatch.setattr(ferramentas, "_agrupar_por_tamanho", lambda *a: pytest.fail("varreu de novo"))
+    assert ferramentas.busca_pendente(str(dois_pares))
+    assert _grupos(ferramentas, dois_pares) == [["a1", "a2"], ["b1", "b2"]]
+
+
+def test_pasta_alterada_ou_busca_nova_descarta_checkpoint(dois_pares, ferramentas):
+    _interromper_apos_primeiro_grupo(ferramentas, dois_pares)
+    escrever(dois_pares / "a3", open(dois_pares / "a1", "rb").read())
+    os.utime(dois_pares, ns=(0, 0))  # Garante mtime diferente mesmo em sistemas com resolução grosseira
+    assert _grupos(ferramentas, dois_pares) == [["a1", "a2", "a3"], ["b1", "b2"]]
+
+    _interromper_apos_primeiro_grupo(ferramentas, dois_pares)
+    os.remove(dois_pares / "b2")  # Sem mudar o mtime registrado, só retomar=False percebe
+    os.utime(dois_pares, ns=(0, 0))
+    assert _grupos(ferramentas, dois_pares, retomar=False) == [["a1", "a2", "a3"]]
+
+
+def test_retomada_descarta_arquivo_alterado_depois_da_interrupcao(pasta, ferramentas, monkeypatch):
+    raiz = pasta / "d"
+    for par, tamanho in (("a", 200 * 1024), ("b", 300 * 1024)):  # Tamanhos diferentes: o 1º grupo vai para o diário
+        conteudo = os.urandom(tamanho)
+        escrever(raiz / "sub" / f"{par}1", conteudo)
+        escrever(raiz / "sub" / f"{par}2", conteudo)
+    primeiro = _interromper_apos_primeiro_grupo(ferramentas, raiz)[0]
+    with open(primeiro[1], "r+b") as f:
+        f.seek(100_000)
+        f.write(b"conteudo novo")  # Editar o arquivo não muda o mtime da raiz
+    monkeypatch.setattr(ferramentas, "_agrupar_por_tamanho", lambda *a: pytest.fail("varreu de novo"))
+
+    grupos = _grupos(ferramentas, raiz)
+    assert os.path.basename(primeiro[1]) not in sum(grupos, [])
+    assert len(grupos) == 1
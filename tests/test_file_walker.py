@@ -0,0 +1,53 @@
+import os
+import pytest
+from src.utils.file_walker import LINKS_ARQUIVOS, LINKS_IGNORAR, LINKS_SEGUIR, percorrer_arquivos
+from tests.conftest import escrever
+
+
+@pytest.fixture
+def arvore(pasta):
+    """raiz/a.txt, raiz/b.log, raiz/sub/c.txt, raiz/sub/fundo/d.txt, raiz/.git/e"""
+    raiz = pasta / "raiz"
+    for relativo in ("a.txt", "b.log", "sub/c.txt", "sub/fundo/d.txt", ".git/e"):
+        escrever(raiz / relativo, b"x")
+    return str(raiz)
+
+
+def _nomes(raiz, **kwargs):
+    return [os.path.relpath(e.path, raiz).replace(os.sep, "/") for e in percorrer_arquivos(raiz, **kwargs)]
+
+
+def test_percorre_tudo_em_ordem(arvore):
+    # Os arquivos de cada pasta saem antes do conteúdo das subpastas
+    assert _nomes(arvore, ordenar=True) == ["a.txt", "b.log", ".git/e", "sub/c.txt", "sub/fundo/d.txt"]
+
+
+def test_ignorar_pula_arquivos_e_pastas(arvore):
+    assert _nomes(arvore, ignorar=[".git", "*.log"], ordenar=True) == ["a.txt", "sub/c.txt", "sub/fundo/d.txt"]
+
+
+def test_profundidade_maxima_e_pastas_antes_do_conteudo(arvore):
+    assert _nomes(arvore, ignorar=[".git"], profundidade_maxima=0, ordenar=True) == ["a.txt", "b.log"]
+    assert _nomes(arvore, ignorar=[".git"], profundidade_maxima=1, incluir_pastas=True, ordenar=True) == [
+        "a.txt", "b.log", "sub", "sub/c.txt", "sub/fundo"]
+
+
+def test_erro_na_raiz_vai_para_ao_erro(pasta):
+    erros = []
+    assert _nomes(str(pasta / "nao_existe"), ao_erro=erros.append) == []
+    assert len(erros) == 1 and isinstance(erros[0], FileNotFoundError)
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt", reason="links simbólicos exigem POSIX aqui")
+def test_politicas_de_links(arvore):
+    os.symlink(os.path.join(arvore, "a.txt"), os.path.join(arvore, "link_arquivo"))
+    os.symlink(os.path.join(arvore, "sub"), os.path.join(arvore, "link_pasta"))
+    os.symlink(arvore, os.path.join(arvore, "sub", "ciclo"))
+    base = ["a.txt", "b.log", "sub/c.txt", "sub/fundo/d.txt"]
+
+    assert _nomes(arvore, ignorar=[".git"], links=LINKS_IGNORAR, ordenar=True) == base
+    assert _nomes(arvore, ignorar=[".git"], links=LINKS_ARQUIVOS, ordenar=True) == [
+        "a.txt", "b.log", "link_arquivo", "sub/c.txt", "sub/fundo/d.txt"]
+    # Seguindo links, cada pasta é visitada uma vez só (sem ciclo e sem repetir sub/ pelo link)
+    assert _nomes(arvore, ignorar=[".git"], links=LINKS_SEGUIR, ordenar=True) == [
+        "a.txt", "b.log", "link_arquivo", "link_pasta/c.txt", "link_pasta/fundo/d.txt"]
@@ -0,0 +1,117 @@
+import os
+import shutil
+import pytest
+from cryptography.fernet import Fernet
+from src.modules.security import (SecurityTools, TAMANHO_BLOCO, TAMANHO_CABECALHO, TAMANHO_CABECALHO_LOTE,
+                                  TAMANHO_TAG)
+from src.utils import descriptografar_arquivo as standalone
+
+SENHA = "senha-de-teste"
+TAMANHOS = [0, 1000, 2 * TAMANHO_BLOCO, TAMANHO_BLOCO + 1]  # Vazio, um bloco, múltiplo exato, um byte a mais
+BLOCO_CIFRADO = TAMANHO_BLOCO + TAMANHO_TAG
+
+
+@pytest.fixture
+def ferramenta():
+    return SecurityTools(logger_callback=lambda *_: None)
+
+
+def _original(pasta, tamanho, nome="arquivo.bin"):
+    dados = os.urandom(tamanho)
+    caminho = pasta / nome
+    caminho.write_bytes(dados)
+    return str(caminho), dados
+
+
+def _v1(pasta, ferramenta, dados):
+    """O formato antigo: salt + token Fernet, como as versões anteriores gravavam."""
+    chave, salt = ferramenta._gerar_chave_da_senha(SENHA)
+    caminho = pasta / "antigo.bin.enc"
+    caminho.write_bytes(salt + Fernet(chave).encrypt(dados))
+    return str(caminho)
+
+
+def _v2(pasta, ferramenta, tamanho):
+    caminho, dados = _original(pasta, tamanho)
+    assert ferramenta.criptografar_arquivo(caminho, SENHA, apagar_original=True)
+    return caminho + ".enc", dados
+
+
+def _v3(pasta, ferramenta, tamanho):
+    caminho, dados = _original(pasta, tamanho)
+    assert ferramenta.criptografar_lote([caminho], SENHA, apagar_original=True) == []
+    return caminho + ".enc", dados
+
+
+def _abrir(ferramenta, enc, senha=SENHA):
+    """Descriptografa pelo SecurityTools e pelo script avulso; retorna os dois conteúdos (None = falhou)."""
+    resultados = []
+    saida = enc[:-len(".enc")]
+    resultados.append(open(saida, "rb").read() if ferramenta.descriptografar_arquivo(enc, senha) else None)
+    if os.path.exists(saida):
+        os.remove(saida)
+
+    pasta_avulso = os.path.join(os.path.dirname(enc), "avulso")
+    os.makedirs(pasta_avulso, exist_ok=True)
+    sucesso, resultado = standalone.descriptografar(enc, senha, pasta_avulso)
+    resultados.append(open(resultado, "rb").read() if sucesso else None)
+    shutil.rmtree(pasta_avulso)
+    assert not [f for f in os.listdir(os.path.dirname(enc)) if f.endswith(".tmp")]
+    return resultados
+
+
+@pytest.mark.parametrize("tamanho", TAMANHOS)
+def test_v1_continua_legivel(pasta, ferramenta, tamanho):
+    dados = os.urandom(tamanho)
+    assert _abrir(ferramenta, _v1(pasta, ferramenta, dados)) == [dados, dados]
+
+
+@pytest.mark.parametrize("gerar", [_v2, _v3])
+@pytest.mark.parametrize("tamanho", TAMANHOS)
+def test_ida_e_volta(pasta, ferramenta, gerar, tamanho):
+    enc, dados = gerar(pasta, ferramenta, tamanho)
+    assert _abrir(ferramenta, enc) == [dados, dados]
+
+
+def test_senha_errada(pasta, ferramenta):
+    for enc in (_v1(pasta, ferramenta, b"abc" * 1000), _v2(pasta, ferramenta, 1000)[0]):
+        assert _abrir(ferramenta, enc, "outra") == [None, None]
+    (pasta / "arquivo.bin.enc").unlink()
+    assert _abrir(ferramenta, _v3(pasta, ferramenta, 1000)[0], "outra") == [None, None]
+
+
+def _alterar(enc, alteracao):
+    with open(enc, "rb") as f:
+        conteudo = f.read()
+    with open(enc, "wb") as f:
+        f.write(alteracao(conteudo))
+
+
+
+@pytest.mark.parametrize("gerar", [_v2, _v3])
+@pytest.mark.parametrize("alteracao", [
+    # Troca a ordem dos dois primeiros blocos
+    lambda c, h: c[:h] + c[h + BLOCO_CIFRADO:h + 2 * BLOCO_CIFRADO] + c[h:h + BLOCO_CIFRADO] + c[h + 2 * BLOCO_CIFRADO:],
+    # Corta o último bloco inteiro: o penúltimo não foi cifrado como final
+    lambda c, h: c[:h + 2 * BLOCO_CIFRADO],
+    # Um bit do cabeçalho (prefixo do nonce) — ele é autenticado em todos os blocos
+    lambda c, h: c[:h - 1] + bytes([c[h - 1] ^ 1]) + c[h:],
+    # Um bit do meio de um bloco
+    lambda c, h: c[:h + 10] + bytes([c[h + 10] ^ 1]) + c[h + 11:],
+], ids=["troca_de_blocos", "truncado_no_limite", "cabecalho", "conteudo"])
+def test_adulteracao_e_detectada(pasta, ferramenta, gerar, alteracao):
+    enc, _ = gerar(pasta, ferramenta, 2 * TAMANHO_BLOCO + 100)
+    tamanho_cabecalho = TAMANHO_CABECALHO if gerar is _v2 else TAMANHO_CABECALHO_LOTE
+    _alterar(enc, lambda c: alteracao(c, tamanho_cabecalho))
+    assert _abrir(ferramenta, enc) == [None, None]
+
+
+def test_versao_desconhecida_tem_erro_claro(pasta, ferramenta):
+    enc, _ = _v2(pasta, ferramenta, 1000)
+    _alterar(enc, lambda c: c[:4] + bytes([9]) + c[5:])
+    mensagens = []
+    ferramenta.log = mensagens.append
+    assert not ferramenta.descriptografar_arquivo(enc, SENHA)
+    assert "Versão 9" in mensagens[-1]
+    assert standalone.descriptografar(enc, SENHA, str(pasta)) == (
+        False, "Versão 9 do formato .enc não suportada por este descriptografador.")
@@ -0,0 +1,133 @@
+import os
+import time
+import hashlib
+import threading
+import pytest
+from src.utils import hash_engine
+from src.utils.hash_engine import HashEngine
+from tests.conftest import escrever
+
+
+def _engine(**kwargs):
+    return HashEngine(logger_callback=lambda *_: None, **kwargs)
+
+
+def test_cache_de_dispositivo_limitado(pasta, monkeypatch):
+    monkeypatch.setattr(hash_engine, "MAXIMO_PASTAS_DISPOSITIVO", 3)
+    engine = _engine()
+    for i in range(10):
+        conteudo = b"x" * (i + 1)
+        caminho = escrever(pasta / f"d{i}" / "f", conteudo)
+        assert engine.hash_arquivo(caminho) == hashlib.sha256(conteudo).hexdigest()
+
+    assert [os.path.basename(p) for p in engine._dispositivo_por_pasta] == ["d7", "d8", "d9"]
+
+
+def test_expurgo_do_cache_verifica_um_lote_por_vez(pasta):
+    from src.utils.hash_cache import HashCache
+    HashCache._instance = None
+    try:
+        cache = HashCache(db_path=str(pasta / "cache.db"))
+        engine = _engine(cache=cache)
+        caminhos = [escrever(pasta / f"f{i}", b"x" * i) for i in range(1, 8)]
+        for caminho in caminhos:
+            engine.hash_arquivo(caminho)
+        cache.salvar()
+        for caminho in caminhos:
+            os.remove(caminho)
+
+        assert [cache.limpar_obsoletos(limite=3) for _ in range(4)] == [3, 3, 1, 0]
+        assert cache.conn.execute("SELECT count(*) FROM file_hashes").fetchone()[0] == 0
+    finally:
+        HashCache._instance = None
+
+
+def test_erro_ao_salvar_cache_vai_para_o_log(pasta, monkeypatch):
+    import sqlite3
+    from src.utils.hash_cache import HashCache
+    HashCache._instance = None
+    mensagens = []
+    try:
+        cache = HashCache(db_path=str(pasta / "cache.db"), logger_callback=mensagens.append)
+
+        def falhar():
+            raise sqlite3.OperationalError("disco cheio")
+
+        monkeypatch.setattr(cache, "_gravar_pendentes", falhar)
+        cache.salvar()
+        assert mensagens == [">> Erro ao salvar cache de hashes: disco cheio"]
+    finally:
+        HashCache._instance = None
+
+
+def test_fila_de_trabalho_puxa_a_entrada_aos_poucos():
+    from src.utils.hash_engine import FilaDeTrabalho
+    puxados = []
+
+    def entrada():
+        for i in range(1000):
+            puxados.append(i)
+            yield i
+
+    fila = FilaDeTrabalho(entrada())
+    assert next(fila) == 0
+    fila.adicionar("extra")
+    assert next(fila) == "extra"
+    assert next(fila) == 1
+    assert len(puxados) == 2
+
+
+def test_mmap_e_buffer_dao_o_mesmo_hash(pasta):
+    conteudo = os.urandom(300_000)
+    caminho = escrever(pasta / "f", conteudo)
+    vazio = escrever(pasta / "vazio", b"")
+    engine = _engine()
+    for usar_mmap in (True, False):
+        for arquivo, dados in ((caminho, conteudo), (vazio, b"")):
+            hasher = hashlib.sha256()
+            with open(arquivo, "rb") as afile:
+                engine._ler_para_hasher(afile, hasher, usar_mmap=usar_mmap)
+            assert hasher.hexdigest() == hashlib.sha256(dados).hexdigest()
+
+
+def test_arquivo_encolhido_durante_o_mmap_vira_erro(pasta, monkeypatch):
+    monkeypatch.setattr(hash_engine, "BLOCO_MMAP", 4096)
+    caminho = escrever(pasta / "f", b"x" * 16384)
+
+    class Truncador:
+        def update(self, dados):
+            os.truncate(caminho, 100)
+
+    with open(caminho, "rb") as afile:
+        with pytest.raises(OSError, match="alterado"):
+            _engine()._ler_para_hasher(afile, Truncador(), usar_mmap=True)
+
+
+def test_mapear_cancelado_nao_espera_a_fila(monkeypatch):
+    from src.utils.task_queue import OperacaoCancelada, TokenCancelamento
+    monkeypatch.setattr(hash_engine, "INTERVALO_CANCELAMENTO", 0.01)
+    token = TokenCancelamento()
+    liberar = threading.Event()
+    iniciados = []
+
+    def lento(item):
+        iniciados.append(item)
+        liberar.wait(5)
+        return item
+
+    engine = _engine(max_workers=2, max_pendentes=50)
+    resultados = engine.mapear(lento, range(50), token)
+    token.cancelar()
+    inicio = time.monotonic()
+    with pytest.raises(OperacaoCancelada):
+        next(resultados)
+    liberar.set()
+    assert time.monotonic() - inicio < 1
+    assert len(iniciados) <= 2  # As tarefas que não começaram foram descartadas
+
+
+def test_mmap_so_quando_pedido(pasta, monkeypatch):
+    monkeypatch.setattr(hash_engine.mmap, "mmap", lambda *a, **k: pytest.fail("mapeou sem usar_mmap=True"))
+    conteudo = os.urandom(3 * hash_engine.BUFFER_LEITURA + 7)
+    caminho = escrever(pasta / "grande", conteudo)
+    assert _engine().hash_arquivo(caminho) == hashlib.sha256(conteudo).hexdigest()
@@ -0,0 +1,39 @@
+import os
+from tests.conftest import escrever
+
+
+def _com_hashes(ferramentas, monkeypatch, pasta, hashes):
+    """Cria uma imagem falsa por nome; o dHash de cada uma é o valor dado."""
+    for nome in hashes:
+        escrever(pasta / nome, nome.encode())
+    monkeypatch.setattr(ferramentas.image_tools, "hash_perceptual",
+                        lambda caminho: hashes[os.path.basename(caminho)])
+
+
+def _reproduzir(fluxo):
+    """Aplica o fluxo como a UI faz: chave repetida substitui, lista vazia remove."""
+    grupos = {}
+    for chave, caminhos in fluxo:
+        if caminhos:
+            grupos[chave] = caminhos
+        else:
+            grupos.pop(chave, None)
+    return sorted(sorted(os.path.basename(c) for c in g) for g in grupos.values())
+
+
+def test_vizinhos_agrupados_e_distantes_separados(pasta, ferramentas, monkeypatch):
+    _com_hashes(ferramentas, monkeypatch, pasta, {
+        "a.jpg": 0b0, "b.jpg": 0b111, "c.png": 0xFFFF0000, "d.png": 0xFFFF0001, "e.jpg": 0xF0F0F0F0F0,
+    })
+    assert _reproduzir(ferramentas.iterar_imagens_similares(str(pasta), intervalo=1)) == [
+        ["a.jpg", "b.jpg"], ["c.png", "d.png"]]
+
+
+def test_grupos_que_se_juntam_nao_ficam_duplicados(pasta, ferramentas, monkeypatch):
+    # x e y estão longe (10 bits), mas z fica a 5 de cada um e junta tudo num grupo só
+    _com_hashes(ferramentas, monkeypatch, pasta, {
+        "x.jpg": 0b0, "x2.jpg": 0b1, "y.jpg": 0b1111111111, "y2.jpg": 0b1111111110, "z.jpg": 0b11111,
+    })
+    fluxo = list(ferramentas.iterar_imagens_similares(str(pasta), intervalo=1))
+    assert _reproduzir(fluxo) == [["x.jpg", "x2.jpg", "y.jpg", "y2.jpg", "z.jpg"]]
+    assert len(ferramentas.localizar_imagens_similares(str(pasta))) == 1
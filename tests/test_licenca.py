@@ -0,0 +1,34 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from src.modules.auth import ServicoLicenca
+
+
+@pytest.fixture
+def servico(pasta):
+    ServicoLicenca._instance = None
+    yield ServicoLicenca(caminho_licenca=str(pasta / "license.key"), caminho_trial=str(pasta / "trial.json"))
+    ServicoLicenca._instance = None
+
+
+def _gravar_trial(pasta, conteudo):
+    with open(pasta / "trial.json", "w", encoding="utf-8") as f:
+        f.write(conteudo)
+
+
+def test_sem_arquivo_de_trial_nao_conta_dias(servico):
+    assert servico.estado() == ("trial", {"status": "trial_ativo", "dias_restantes": None})
+
+
+def test_trial_lido_do_arquivo_e_relido_quando_muda(servico, pasta):
+    inicio = datetime.now() - timedelta(days=10, hours=1)
+    _gravar_trial(pasta, json.dumps({"data_inicio": inicio.isoformat(), "trial_dias": 30}))
+    assert servico.estado() == ("trial", {"status": "trial_ativo", "dias_restantes": 19})
+
+    _gravar_trial(pasta, json.dumps({"data_inicio": (inicio - timedelta(days=30)).isoformat()}))
+    assert servico.estado() == ("invalid", {"status": "trial_expirado", "dias_restantes": 0})
+
+
+def test_arquivo_de_trial_ilegivel(servico, pasta):
+    _gravar_trial(pasta, "{corrompido")
+    assert servico.estado() == ("invalid", {"status": "erro", "dias_restantes": 0})
@@ -0,0 +1,42 @@
+import contextlib
+from types import SimpleNamespace
+import psutil
+from src.utils import monitor_processos
+from src.utils.monitor_processos import MonitorProcessos
+
+
+class ProcessoFalso:
+    def __init__(self, pid, nome, cpu, memoria_mb, nega=()):
+        self.pid, self.nome, self.cpu, self.memoria_mb, self.nega = pid, nome, cpu, memoria_mb, nega
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def cpu_times(self):
+        if "cpu" in self.nega:
+            raise psutil.AccessDenied(self.pid)
+        return SimpleNamespace(user=self.cpu, system=0.0)
+
+    def memory_info(self):
+        if "memoria" in self.nega:
+            raise psutil.AccessDenied(self.pid)
+        return SimpleNamespace(rss=self.memoria_mb * 1024**2)
+
+    def name(self):
+        return self.nome
+
+
+def test_processo_protegido_aparece_no_ranking_que_pode_ser_lido(monkeypatch):
+    processos = [
+        ProcessoFalso(1, "sistema", 0.0, 10, nega=("memoria",)),
+        ProcessoFalso(2, "navegador", 0.0, 500),
+        ProcessoFalso(3, "antivirus", 0.0, 800, nega=("cpu",)),
+    ]
+    monkeypatch.setattr(monitor_processos.psutil, "process_iter", lambda: iter(processos))
+    monitor = MonitorProcessos(fatias=1)
+    monitor.amostrar()
+    processos[0].cpu, processos[1].cpu = 2.0, 1.0
+
+    top_cpu, top_memoria = monitor.amostrar()
+    assert [(p.nome, p.memoria_mb) for p in top_cpu] == [("sistema", 0.0), ("navegador", 500)]
+    assert [p.nome for p in top_memoria] == ["antivirus", "navegador"]
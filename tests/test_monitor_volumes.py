@@ -0,0 +1,35 @@
+import os
+import pytest
+from types import SimpleNamespace
+from src.utils import monitor_volumes
+from src.utils.monitor_volumes import MonitorVolumes
+
+
+def _particao(device, ponto, tipo, opcoes="rw"):
+    return SimpleNamespace(device=device, mountpoint=ponto, fstype=tipo, opts=opcoes)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="filtro de dispositivos de sistemas POSIX")
+def test_inclui_volumes_de_rede_e_ignora_virtuais_repetidos_e_somente_leitura(monkeypatch):
+    particoes = [
+        _particao("/dev/sda1", "/", "ext4"),
+        _particao("proc", "/proc", "proc"),
+        _particao("cgroup2", "/sys/fs/cgroup", "cgroup2"),
+        _particao("servidor:/export", "/mnt/nfs", "nfs4"),
+        _particao("//servidor/publico", "/mnt/smb", "cifs"),
+        _particao("eu@servidor:", "/mnt/ssh", "fuse.sshfs"),
+        _particao("rpool/home", "/home", "zfs"),
+        _particao("gvfsd-fuse", "/run/user/1000/gvfs", "fuse.gvfsd-fuse"),
+        _particao("algumfs", "/mnt/estranho", "desconhecido"),
+        _particao("/dev/sda1", "/var/lib/docker", "ext4"),           # Bind mount do mesmo disco
+        _particao("/dev/sdb1", "/dados", "btrfs"),
+        _particao("/dev/sdb1", "/home/snapshots", "btrfs"),          # Subvolume do mesmo disco
+        _particao("/dev/sdc1", "/mnt/cdrom-iso", "ext4", "ro,relatime"),
+        _particao("servidor:/outro", "/mnt/nfs2", "nfs4"),           # Mesmo servidor, outro compartilhamento
+    ]
+    monkeypatch.setattr(monitor_volumes.psutil, "disk_partitions", lambda all=False: particoes if all else particoes[:1])
+
+    assert MonitorVolumes(logger_callback=lambda *_: None).particoes() == [
+        ("/", "ext4", False), ("/mnt/nfs", "nfs4", True), ("/mnt/smb", "cifs", True),
+        ("/mnt/ssh", "fuse.sshfs", True), ("/home", "zfs", False), ("/dados", "btrfs", False),
+        ("/mnt/nfs2", "nfs4", True)]
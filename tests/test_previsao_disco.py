@@ -0,0 +1,32 @@
+import json
+import time
+from types import SimpleNamespace
+from src.utils.previsao_disco import INTERVALO_AMOSTRA, JANELA_AMOSTRAS, SEGUNDOS_DIA, PrevisorVolumes
+
+
+def _volume(ponto, usado_gb, total_gb=100.0):
+    return SimpleNamespace(ponto=ponto, total_gb=total_gb, livre_gb=total_gb - usado_gb)
+
+
+def test_tendencia_preve_quando_enche(pasta):
+    previsor = PrevisorVolumes(caminho=str(pasta / "previsao.json"), logger_callback=lambda *_: None)
+    inicio = time.time() - 10 * SEGUNDOS_DIA
+    for dia in range(10):
+        previsor.registrar(inicio + dia * SEGUNDOS_DIA, [_volume("/", 50 + 2 * dia)])
+
+    previsao = previsor.prever([_volume("/", 68)])["/"]
+    assert abs(previsao.gb_por_dia - 2) < 1e-6
+    assert abs(previsao.dias_ate_encher - 16) < 1e-6
+
+
+def test_volume_sem_amostras_na_janela_e_esquecido_ao_salvar(pasta):
+    caminho = pasta / "previsao.json"
+    previsor = PrevisorVolumes(caminho=str(caminho), logger_callback=lambda *_: None)
+    agora = time.time()
+    previsor.registrar(agora - JANELA_AMOSTRAS * INTERVALO_AMOSTRA - 60, [_volume("/mnt/pendrive", 1)])
+    previsor.registrar(agora, [_volume("/", 10)])
+    previsor.salvar()
+
+    with open(caminho, encoding="utf-8") as f:
+        assert list(json.load(f)) == ["/"]
+    assert list(previsor.tendencias) == ["/"]